@@ -0,0 +1,80 @@
+"""
+Coalescing of task list clicks by the EventBus.
+
+Publishes bursts of random status, update and delete events for a few tasks
+to a subscriber that takes a fixed time per batch (the storage transaction)
+and per event, the way the PyQt window saves them. Prints the bus metrics:
+how many events were merged, the batch sizes and the latency from a click to
+the end of its batch.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.event_bus --events 2000 --tasks 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+from ..output.events import EventBus, EventType, IPubSubSubscriber, TaskWidgetEvent
+
+
+class SlowSubscriber(IPubSubSubscriber):
+    def __init__(self, batch_seconds: float, event_seconds: float):
+        self.batch_seconds = batch_seconds
+        self.event_seconds = event_seconds
+
+    async def notify(self, events: list[TaskWidgetEvent]):
+        await asyncio.sleep(self.batch_seconds + self.event_seconds * len(events))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    bus = EventBus(max_size=args.queue_size)
+    bus.subscribers.append(SlowSubscriber(args.batch_ms / 1000, args.event_ms / 1000))
+    bus_task = asyncio.create_task(bus.run())
+
+    for number in range(args.events):
+        event = rng.choices(list(EventType), weights=[1, 10, 30])[0]
+        await bus.publish(TaskWidgetEvent(id=rng.randint(1, args.tasks), event=event))
+        if number % args.burst == 0:
+            await asyncio.sleep(args.pause_ms / 1000)
+
+    # Until the last batch is handled, not just taken off the queue.
+    while bus.handled + bus.coalesced < bus.published:
+        await asyncio.sleep(args.pause_ms / 1000)
+    bus_task.cancel()
+    return bus.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventBus coalescing benchmark.")
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument(
+        "--tasks", type=int, default=20, help="Number of task ids clicked."
+    )
+    parser.add_argument(
+        "--burst", type=int, default=10, help="Events published between pauses."
+    )
+    parser.add_argument("--pause-ms", type=float, default=1.0)
+    parser.add_argument(
+        "--batch-ms", type=float, default=5.0, help="Time of one storage transaction."
+    )
+    parser.add_argument(
+        "--event-ms", type=float, default=0.2, help="Time to handle one event."
+    )
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        json.dumps(
+            {"events": args.events, "tasks": args.tasks, **asyncio.run(run(args))}
+        ),
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
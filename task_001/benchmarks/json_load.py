@@ -0,0 +1,97 @@
+"""
+Eager vs streaming JSONStorage reads on a large file.
+
+Generates a task file (skipped if it already exists), then reports for both
+modes the time and peak memory of the first lookup, of two lookups in a row
+and of a filtered listing, with the storage's file reads: full loads, loads
+skipped because the cached file was unchanged, and streamed reads.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.json_load --tasks 2500000 --file /tmp/tasks.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+import time
+import tracemalloc
+
+from ..models.task import TaskStatus
+from ..storage.json import JSONStorage, LoadStats
+
+statuses = [status.value for status in TaskStatus]
+
+
+def generate(file_path: Path, size: int) -> None:
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write('{\n  "counter": %d,\n  "tasks": {' % size)
+        for idx in range(1, size + 1):
+            task = {
+                "description": f"Task number {idx}",
+                "status": statuses[idx % len(statuses)],
+                "createdAt": float(idx),
+                "updatedAt": float(idx),
+                "id": idx,
+            }
+            f.write(("," if idx > 1 else "") + f'\n    "{idx}": ' + json.dumps(task))
+        f.write("\n  }\n}\n")
+
+
+async def operate(file_path: Path, lazy_load: bool, operation: str) -> LoadStats:
+    storage = JSONStorage(file_location=str(file_path), lazy_load=lazy_load)
+    match operation:
+        case "get_first":
+            await storage.get_by_idx(1)
+        case "get_twice":
+            await storage.get_by_idx(1)
+            await storage.get_by_idx(2)
+        case "list_done":
+            async for _ in storage.iter_tasks(TaskStatus.done.value):
+                pass
+    return storage.stats
+
+
+async def run(file_path: Path, lazy_load: bool, operation: str) -> dict:
+    started = time.perf_counter()
+    stats = await operate(file_path, lazy_load, operation)
+    elapsed = time.perf_counter() - started
+
+    # Measured separately, tracing slows everything down.
+    tracemalloc.start()
+    await operate(file_path, lazy_load, operation)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": "lazy" if lazy_load else "eager",
+        "operation": operation,
+        "seconds": round(elapsed, 4),
+        "peak_bytes": peak,
+        **asdict(stats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON load benchmark.")
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument(
+        "--file", type=Path, default=Path("/tmp/task_001_benchmark.json")
+    )
+    args = parser.parse_args()
+
+    file_path = args.file.absolute()
+    if not file_path.exists():
+        generate(file_path, args.tasks)
+    print(json.dumps({"file_bytes": os.path.getsize(file_path)}))
+
+    for operation in ["get_first", "get_twice", "list_done"]:
+        for lazy_load in [False, True]:
+            print(json.dumps(asyncio.run(run(file_path, lazy_load, operation))))
+
+
+if __name__ == "__main__":
+    main()
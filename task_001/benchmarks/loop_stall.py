@@ -0,0 +1,95 @@
+"""
+Event loop stalls caused by JSONStorage file I/O.
+
+A heartbeat coroutine wakes up every millisecond while the storage loads a
+large file and then changes a few tasks, the way GUI clicks do. Reports for
+both modes how late the heartbeat woke up: the time the loop (and a window
+running on it) could not react.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.loop_stall --tasks 200000 --changes 10
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import shutil
+import statistics
+import tempfile
+import time
+
+from .json_load import generate
+from ..models.task import TaskStatus
+from ..storage.json import JSONStorage
+
+INTERVAL = 0.001
+# One frame at 60 Hz.
+FRAME = 1 / 60
+
+
+async def heartbeat(stalls: list[float], stopped: asyncio.Event) -> None:
+    while not stopped.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(INTERVAL)
+        stalls.append(max(time.perf_counter() - started - INTERVAL, 0))
+
+
+async def run(file_path: Path, offload_io: bool, changes: int) -> dict:
+    storage = JSONStorage(file_location=str(file_path), offload_io=offload_io)
+    stalls: list[float] = []
+    stopped = asyncio.Event()
+    heartbeat_task = asyncio.create_task(heartbeat(stalls, stopped))
+    await asyncio.sleep(INTERVAL * 10)
+
+    started = time.perf_counter()
+    await storage.load()
+    for idx in range(1, changes + 1):
+        task = await storage.get_by_idx(idx)
+        task.status = TaskStatus.done.value
+        task.updatedAt = time.time()
+        await storage.update_by_idx(idx, task)
+    elapsed = time.perf_counter() - started
+
+    stopped.set()
+    await heartbeat_task
+
+    return {
+        "mode": "thread" if offload_io else "loop",
+        "seconds": round(elapsed, 4),
+        "max_stall_ms": round(max(stalls) * 1000, 2),
+        "p99_stall_ms": round(
+            statistics.quantiles(stalls, n=100, method="inclusive")[98] * 1000, 2
+        ),
+        "total_stall_ms": round(sum(stalls) * 1000, 2),
+        "dropped_frames": sum(int(stall // FRAME) for stall in stalls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event loop stall benchmark.")
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--changes", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "source.json"
+        generate(source, args.tasks)
+
+        for offload_io in [False, True]:
+            file_path = Path(directory) / f"tasks-{offload_io}.json"
+            shutil.copy(source, file_path)
+            print(
+                json.dumps(
+                    {
+                        "tasks": args.tasks,
+                        **asyncio.run(run(file_path, offload_io, args.changes)),
+                    }
+                ),
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
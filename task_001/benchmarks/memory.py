@@ -0,0 +1,86 @@
+"""
+Memory used by a loaded task list.
+
+Compares the current Task model with the previous one (a regular dataclass
+with a per-instance __dict__ and a separate status string per task).
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.memory --sizes 10000 100000 1000000
+"""
+
+import argparse
+from dataclasses import dataclass
+import gc
+import json
+import tracemalloc
+
+from ..models.task import Task, TaskStatus
+
+
+@dataclass
+class LegacyTask:
+    description: str
+    status: str
+    createdAt: float
+    updatedAt: float
+    id: int
+
+
+statuses = [status.value for status in TaskStatus]
+
+
+def _decoded(value: str) -> str:
+    # json.load creates a new string object for every value it decodes.
+    return json.loads(json.dumps(value))
+
+
+def build(task_type: type, size: int) -> dict[str, object]:
+    return {
+        str(idx): task_type(
+            description=f"Task number {idx}",
+            status=_decoded(statuses[idx % len(statuses)]),
+            createdAt=float(idx),
+            updatedAt=float(idx),
+            id=idx,
+        )
+        for idx in range(1, size + 1)
+    }
+
+
+def measure(task_type: type, size: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    tasks = build(task_type, size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task list memory benchmark.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        legacy = measure(LegacyTask, size)
+        current = measure(Task, size)
+        print(
+            json.dumps(
+                {
+                    "size": size,
+                    "legacy_bytes": legacy,
+                    "current_bytes": current,
+                    "legacy_bytes_per_task": round(legacy / size, 1),
+                    "current_bytes_per_task": round(current / size, 1),
+                    "saved": round(1 - current / legacy, 3),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
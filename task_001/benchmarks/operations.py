@@ -0,0 +1,186 @@
+"""
+TaskManager operations on different storage backends.
+
+For every backend and list size, fills a new list, then times create_task,
+list_tasks, change_status, update_task and delete_task one call at a time.
+Output goes to a NullOutput, so only TaskManager and the storage are measured.
+Prints one JSON line per backend, size and operation with latency
+percentiles, throughput, and the peak memory allocated while running the
+operation (from a second, traced pass).
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.operations --sizes 1000 10000 100000 --operations 100
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Coroutine
+
+from .json_load import generate, statuses
+from ..core.tasks import TaskManager
+from ..input.iinput import IInput
+from ..models.task import Task
+from ..output.null import NullOutput
+from ..storage.in_memory import InMemoryStorage
+from ..storage.istorage import IStorage
+from ..storage.json import JSONStorage
+
+backends = ["in-memory", "json"]
+operations = [
+    "create_task",
+    "list_tasks",
+    "change_status",
+    "update_task",
+    "delete_task",
+]
+
+
+async def seed(backend: str, size: int, directory: Path) -> IStorage:
+    match backend:
+        case "json":
+            file_path = directory / f"tasks-{size}.json"
+            generate(file_path, size)
+            return JSONStorage(file_location=str(file_path))
+        case _:
+            storage = InMemoryStorage()
+            await storage.load(
+                size,
+                {
+                    str(idx): Task(
+                        description=f"Task number {idx}",
+                        status=statuses[idx % len(statuses)],
+                        createdAt=float(idx),
+                        updatedAt=float(idx),
+                        id=idx,
+                    )
+                    for idx in range(1, size + 1)
+                },
+            )
+            return storage
+
+
+def calls(
+    task_manager: TaskManager, operation: str, size: int, count: int, rng: random.Random
+) -> list[Callable[[], Coroutine]]:
+    match operation:
+        case "create_task":
+            return [lambda: task_manager.create_task("New task") for _ in range(count)]
+        case "list_tasks":
+            return [lambda: task_manager.list_tasks() for _ in range(count)]
+        case "change_status":
+            return [
+                lambda idx=idx: task_manager.change_status(idx, rng.choice(statuses))
+                for idx in rng.choices(range(1, size + 1), k=count)
+            ]
+        case "update_task":
+            return [
+                lambda idx=idx: task_manager.update_task(idx, f"Updated task {idx}")
+                for idx in rng.choices(range(1, size + 1), k=count)
+            ]
+        case _:
+            return [
+                lambda idx=idx: task_manager.delete_task(idx)
+                for idx in rng.sample(range(1, size + 1), k=min(count, size))
+            ]
+
+
+def percentile(latencies: list[float], percent: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1]
+
+
+async def run(
+    backend: str, size: int, args: argparse.Namespace, traced: bool
+) -> dict[str, dict]:
+    results = {}
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = await seed(backend, size, Path(directory))
+        task_manager = TaskManager(
+            storage_manager=storage, output_manager=NullOutput(), input_manager=IInput()
+        )
+        # The first call reads the file, that is measured by json_load.
+        await storage.load()
+
+        for operation in operations:
+            count = args.lists if operation == "list_tasks" else args.operations
+            pending = calls(task_manager, operation, size, count, rng)
+
+            if traced:
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                for call in pending:
+                    await call()
+                _, peak = tracemalloc.get_traced_memory()
+                results[operation] = {"peak_bytes": peak - base}
+                continue
+
+            latencies = []
+            started = time.perf_counter()
+            for call in pending:
+                call_started = time.perf_counter()
+                await call()
+                latencies.append(time.perf_counter() - call_started)
+            elapsed = time.perf_counter() - started
+
+            results[operation] = {
+                "ops": len(latencies),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+                "p90_ms": round(percentile(latencies, 90) * 1000, 4),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+                "max_ms": round(max(latencies) * 1000, 4),
+                "ops_per_sec": round(len(latencies) / elapsed, 1),
+            }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskManager operations benchmark.")
+    parser.add_argument("--backends", nargs="+", choices=backends, default=backends)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--operations", type=int, default=100, help="Calls per operation."
+    )
+    parser.add_argument("--lists", type=int, default=10, help="Calls of list_tasks.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        for size in args.sizes:
+            timings = asyncio.run(run(backend, size, args, traced=False))
+
+            # Measured separately, tracing slows everything down.
+            tracemalloc.start()
+            memory = asyncio.run(run(backend, size, args, traced=True))
+            tracemalloc.stop()
+
+            for operation in operations:
+                print(
+                    json.dumps(
+                        {
+                            "backend": backend,
+                            "tasks": size,
+                            "operation": operation,
+                            **timings[operation],
+                            **memory[operation],
+                        }
+                    ),
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Import time of a task-cli start.
+
+Creates the configured input, output and storage managers in a fresh
+interpreter under `python -X importtime` and reports the time spent importing
+on top of a bare interpreter, and the slowest modules. Fails if a backend
+that was not selected got imported or the import time is over the budget.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.startup --storage-type json --budget-ms 60
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that only the given backend may import.
+backend_modules = {
+    "pyqt": ["PyQt6", "qasync", "task_001.output.pyqt"],
+    "cli": ["argparse", "task_001.input.cli", "task_001.output.cli"],
+    "json": ["task_001.storage.json"],
+    "journal": ["task_001.storage.journal"],
+    "sqlite": ["sqlite3", "task_001.storage.sqlite"],
+    "binary": ["mmap", "task_001.storage.binary"],
+    "sharded-json": ["multiprocessing", "task_001.storage.sharded"],
+}
+
+script = """
+from task_001 import entrypoint
+
+entrypoint.config["DEFAULT"].update({settings!r})
+entrypoint._get_output_manager()
+entrypoint._get_input_manager()
+entrypoint.get_storage_manager()
+"""
+
+
+def import_times(code: str) -> dict[str, tuple[int, int]]:
+    """Module name -> (self, cumulative) import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import time benchmark.")
+    parser.add_argument("--input-type", default="cli")
+    parser.add_argument("--output-type", default="cli")
+    parser.add_argument("--storage-type", default="json")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    settings = {
+        "input-type": args.input_type,
+        "output-type": args.output_type,
+        "storage-type": args.storage_type,
+    }
+    code = script.format(settings=settings)
+
+    added = []
+    for _ in range(args.runs):
+        bare = sum(self_us for self_us, _ in import_times("pass").values())
+        times = import_times(code)
+        added.append(sum(self_us for self_us, _ in times.values()) - bare)
+
+    selected = set(settings.values())
+    unexpected = sorted(
+        module
+        for backend, modules in backend_modules.items()
+        if backend not in selected
+        for module in modules
+        if module in times
+    )
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[
+        : args.top
+    ]
+    import_ms = statistics.median(added) / 1000
+
+    print(
+        json.dumps(
+            {
+                **settings,
+                "import_ms": round(import_ms, 2),
+                "modules": len(times),
+                "unexpected_imports": unexpected,
+                "slowest_ms": {
+                    name: round(self_us / 1000, 2) for name, (self_us, _) in slowest
+                },
+            }
+        )
+    )
+
+    if unexpected:
+        raise SystemExit(
+            f"Imported modules of unused backends: {', '.join(unexpected)}"
+        )
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        raise SystemExit(
+            f"Imports took {import_ms:.1f} ms, budget is {args.budget_ms} ms."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Several processes changing the same JSON task file at once.
+
+Every worker adds tasks and increments a shared counter task (stored in its
+description) with read, change, update cycles that are retried on conflict.
+Fails if any add or increment was lost.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.stress_locking --processes 8 --operations 50
+"""
+
+import argparse
+import asyncio
+import json
+from multiprocessing import Pool
+from pathlib import Path
+import tempfile
+import time
+
+from ..models.task import BaseTask, TaskConflict, TaskStatus
+from ..storage.json import JSONStorage
+
+
+def new_task(description: str) -> BaseTask:
+    now = time.time()
+    return BaseTask(
+        description=description,
+        status=TaskStatus.planned.value,
+        createdAt=now,
+        updatedAt=now,
+    )
+
+
+async def work(file_path: Path, worker: int, operations: int) -> dict:
+    storage = JSONStorage(file_location=str(file_path), flush_window=0)
+    conflicts = 0
+
+    for operation in range(operations):
+        await storage.add(new_task(f"worker {worker} task {operation}"))
+
+        while True:
+            task = await storage.get_by_idx(1)
+            task.description = str(int(task.description) + 1)
+            task.updatedAt = time.time()
+            try:
+                await storage.update_by_idx(1, task)
+            except TaskConflict:
+                conflicts += 1
+                continue
+            break
+
+    return {"conflicts": conflicts, "contended": storage.lock.contended}
+
+
+def run_worker(args: tuple[Path, int, int]) -> dict:
+    return asyncio.run(work(*args))
+
+
+async def check(file_path: Path) -> tuple[int, int]:
+    storage = JSONStorage(file_location=str(file_path))
+    tasks = await storage.load()
+    return int(tasks["1"].description), len(tasks) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent writers stress test.")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = Path(directory) / "tasks.json"
+        asyncio.run(JSONStorage(file_location=str(file_path)).add(new_task("0")))
+
+        started = time.perf_counter()
+        with Pool(args.processes) as pool:
+            results = pool.map(
+                run_worker,
+                [
+                    (file_path, worker, args.operations)
+                    for worker in range(args.processes)
+                ],
+            )
+        elapsed = time.perf_counter() - started
+
+        counter, added = asyncio.run(check(file_path))
+
+    expected = args.processes * args.operations
+    print(
+        json.dumps(
+            {
+                "processes": args.processes,
+                "operations": args.operations,
+                "seconds": round(elapsed, 4),
+                "counter": counter,
+                "added": added,
+                "expected": expected,
+                "conflicts": sum(result["conflicts"] for result in results),
+                "contended": sum(result["contended"] for result in results),
+            }
+        )
+    )
+
+    if counter != expected or added != expected:
+        raise SystemExit("Lost updates.")
+
+
+if __name__ == "__main__":
+    main()
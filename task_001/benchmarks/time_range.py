@@ -0,0 +1,116 @@
+"""
+Time range queries with and without the timestamp indexes.
+
+Fills every backend with tasks updated over the last `--days` days and
+asks for the ones updated in the last `--hours` hours, through the storage's
+iter_tasks_by_time and through the IStorage default that scans every task.
+Prints one JSON line per backend with the matching tasks and the average time
+of both.
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.time_range --tasks 100000 --hours 1
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import random
+import tempfile
+import time
+
+from .json_load import statuses
+from ..models.task import BaseTask
+from ..storage.in_memory import InMemoryStorage
+from ..storage.istorage import IStorage
+from ..storage.sqlite import SQLiteStorage
+
+backends = ["memory", "sqlite"]
+
+
+def open_storage(backend: str, directory: Path) -> IStorage:
+    match backend:
+        case "sqlite":
+            return SQLiteStorage(file_location=str(directory / "tasks.sqlite3"))
+        case _:
+            return InMemoryStorage()
+
+
+async def fill(storage: IStorage, tasks: int, days: float, seed: int) -> None:
+    rng = random.Random(seed)
+    now = time.time()
+
+    async def generate():
+        for idx in range(tasks):
+            created_at = now - rng.random() * days * 86400
+            yield BaseTask(
+                description=f"Task number {idx}",
+                status=statuses[idx % len(statuses)],
+                createdAt=created_at,
+                updatedAt=created_at + rng.random() * (now - created_at),
+            )
+
+    add_task = asyncio.create_task(storage.add_many(generate()))
+    await add_task
+
+
+async def measure(query, repeat: int) -> tuple[int, float]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        found = [task async for task in query()]
+    return len(found), (time.perf_counter() - started) / repeat
+
+
+async def run(backend: str, directory: Path, args: argparse.Namespace) -> dict:
+    storage = open_storage(backend, directory)
+    fill_task = asyncio.create_task(fill(storage, args.tasks, args.days, args.seed))
+    await fill_task
+
+    since = time.time() - args.hours * 3600
+    # The first indexed query builds the in-memory index.
+    [task async for task in storage.iter_tasks_by_time("updatedAt", since=since)]
+
+    found, indexed = await measure(
+        lambda: storage.iter_tasks_by_time("updatedAt", since=since), args.repeat
+    )
+    _, scanned = await measure(
+        lambda: IStorage.iter_tasks_by_time(storage, "updatedAt", since=since),
+        args.repeat,
+    )
+    return {
+        "backend": backend,
+        "found": found,
+        "indexed_ms": round(indexed * 1000, 3),
+        "scan_ms": round(scanned * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time range query benchmark.")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument(
+        "--days", type=float, default=365, help="Tasks are spread over this many days."
+    )
+    parser.add_argument(
+        "--hours",
+        type=float,
+        default=1,
+        help="Query the tasks updated in the last N hours.",
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", choices=backends, default=backends)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            result = asyncio.run(run(backend, Path(directory), args))
+            print(
+                json.dumps({"tasks": args.tasks, "hours": args.hours, **result}),
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
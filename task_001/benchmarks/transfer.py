@@ -0,0 +1,126 @@
+"""
+Import and export of large NDJSON files.
+
+Writes a file with the given number of tasks, imports it through
+TaskManager.import_tasks into a new list of every backend and exports it
+again. Prints one JSON line per backend and direction with the time, rows
+per second and, with --memory, the peak memory allocated meanwhile (tracing
+slows everything down).
+
+Run from the repository root:
+
+python3 -m task_001.benchmarks.transfer --rows 1000000 --backends sqlite
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+from .json_load import statuses
+from ..core.tasks import TaskManager
+from ..input.iinput import IInput
+from ..output.null import NullOutput
+from ..storage.istorage import IStorage
+from ..storage.json import JSONStorage
+from ..storage.sqlite import SQLiteStorage
+
+backends = ["json", "sqlite"]
+
+
+def generate(file_path: Path, rows: int) -> None:
+    with open(file_path, "w", encoding="utf-8") as f:
+        for idx in range(1, rows + 1):
+            f.write(
+                json.dumps(
+                    {
+                        "description": f"Task number {idx}",
+                        "status": statuses[idx % len(statuses)],
+                        "createdAt": float(idx),
+                        "updatedAt": float(idx),
+                    }
+                )
+                + "\n"
+            )
+
+
+def open_storage(backend: str, directory: Path) -> IStorage:
+    match backend:
+        case "sqlite":
+            return SQLiteStorage(file_location=str(directory / "tasks.sqlite3"))
+        case _:
+            return JSONStorage(file_location=str(directory / "tasks.json"))
+
+
+async def run(backend: str, source: Path, directory: Path, memory: bool) -> list[dict]:
+    task_manager = TaskManager(
+        storage_manager=open_storage(backend, directory),
+        output_manager=NullOutput(),
+        input_manager=IInput(),
+    )
+
+    results = []
+    for direction in ["import", "export"]:
+        if memory:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        if direction == "import":
+            with open(source, "r", encoding="utf-8") as f:
+                await task_manager.import_tasks(f, "ndjson")
+        else:
+            with open(directory / "export.ndjson", "w", encoding="utf-8") as f:
+                await task_manager.export_tasks(f, "ndjson")
+        elapsed = time.perf_counter() - started
+
+        result = {
+            "backend": backend,
+            "direction": direction,
+            "seconds": round(elapsed, 3),
+        }
+        if memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["peak_bytes"] = peak
+        results.append(result)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and export benchmark.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--backends", nargs="+", choices=backends, default=backends)
+    parser.add_argument(
+        "--memory", action="store_true", help="Also trace the peak memory."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "source.ndjson"
+        generate(source, args.rows)
+
+        for backend in args.backends:
+            backend_directory = Path(directory) / backend
+            os.mkdir(backend_directory)
+            for result in asyncio.run(
+                run(backend, source, backend_directory, args.memory)
+            ):
+                print(
+                    json.dumps(
+                        {
+                            "rows": args.rows,
+                            **result,
+                            "rows_per_sec": round(args.rows / result["seconds"], 1),
+                        }
+                    ),
+                    flush=True,
+                )
+
+
+if __name__ == "__main__":
+    main()
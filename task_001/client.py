@@ -0,0 +1,98 @@
+"""
+task-cli front end.
+
+Sends the command to a running daemon (see daemon.py) and prints its output.
+Without a daemon, when the PyQt UI is configured, for batches, imports,
+exports and when profiling, the command runs in this process instead. Only the standard library is imported
+before that decision is made.
+"""
+
+import configparser
+import json
+import os
+from pathlib import Path
+import socket
+import sys
+
+
+def _read_config() -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read(Path(os.path.dirname(os.path.realpath(__file__))) / "config.ini")
+    return config
+
+
+def _connect(socket_path: Path) -> socket.socket | None:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    return client
+
+
+def send(client: socket.socket, argv: list[str]) -> int:
+    """Run a command in the daemon, printing its output as it arrives. Returns the exit code."""
+    client.sendall(json.dumps({"argv": argv}).encode("utf-8") + b"\n")
+
+    with client.makefile("rb") as responses:
+        for line in responses:
+            response = json.loads(line)
+            if "code" in response:
+                return response["code"]
+            stream = sys.stdout if "output" in response else sys.stderr
+            stream.write(response.get("output", response.get("error", "")))
+            stream.flush()
+    raise ConnectionError("Daemon closed the connection.")
+
+
+def _command(argv: list[str]) -> str | None:
+    """The command name, after the global options."""
+    args = iter(argv)
+    for arg in args:
+        if arg == "--list":
+            next(args, None)
+        elif not arg.startswith("--list="):
+            return arg
+    return None
+
+
+def main():
+    config = _read_config()
+    uses_cli = (
+        config["DEFAULT"]["input-type"] == config["DEFAULT"]["output-type"] == "cli"
+    )
+    socket_path = Path(os.path.dirname(os.path.realpath(__file__))) / config[
+        "DEFAULT"
+    ].get("daemon-socket", "data/task-cli.sock")
+
+    # Profiling measures the work done in this process. Batches, imports and
+    # exports use this process's stdin, stdout and working directory, and are
+    # single calls anyway.
+    in_process = (
+        config["DEFAULT"].getboolean("profile", False)
+        or any(arg.startswith("--profile") for arg in sys.argv[1:])
+        or _command(sys.argv[1:]) in ["batch", "import", "export"]
+    )
+
+    client = _connect(socket_path) if uses_cli and not in_process else None
+    if not client:
+        from .entrypoint import run
+
+        run()
+        return
+
+    with client:
+        try:
+            code = send(client, sys.argv[1:])
+        except BrokenPipeError:
+            # The reader is gone, e.g. `task-cli list | head`. Closing the
+            # connection stops the command in the daemon.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+            return
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Named task lists.
+
+Every list is a storage of its own next to `file-location`: with the default
+data/uncategorized.json, the list "work" is data/work.json (data/work.sqlite3
+with the sqlite storage, ...) with its search index in data/work.json.index.
+Lists are opened on first use, and the least recently used ones are unloaded
+once more than `max_open` are open.
+
+data/lists.catalog.json    {"lists": {"<name>": {"<status>": count, ...} | null}}
+
+The catalog holds the number of tasks of every status per list, so counts
+over all lists don't open them. Changes to the counts are kept in memory and
+added to the catalog under data/lists.catalog.json.lock `flush_window`
+seconds after the first of them, at the end of a batch and when the process
+is done. Meanwhile data/lists.catalog.json.<pid>.pending marks that the
+process holds changes; one left behind by a process that is gone means they
+were lost, and every list is counted again the next time the lists are
+shown. A list changed while missing from the catalog (e.g. one created
+before it) is added as null, and counted when the lists are shown.
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import re
+from typing import Callable
+
+from .search import SearchIndex
+from ..storage.files import atomic_write_json
+from ..storage.istorage import IStorage
+from ..storage.locking import FileLock
+
+LIST_NAME = re.compile(r"[\w-]+")
+
+
+@dataclass
+class TaskList:
+    name: str
+    storage: IStorage
+    search_index: SearchIndex
+
+
+class ListCatalog:
+    def __init__(
+        self,
+        *,
+        file_location: str | None = None,
+        flush_window: float = 1.0,
+    ):
+        self.file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+            if file_location
+            else None
+        )
+        self.lock = (
+            FileLock(self.file_path.with_name(f"{self.file_path.name}.lock"))
+            if self.file_path
+            else None
+        )
+
+        self.flush_window = flush_window
+        self.marker_path = (
+            self.file_path.with_name(f"{self.file_path.name}.{os.getpid()}.pending")
+            if self.file_path
+            else None
+        )
+
+        # list -> status -> count, as last read and written by this process
+        self.counts: dict[str, dict[str, int] | None] = {}
+        # Count changes not in the catalog yet.
+        self._pending: dict[str, dict[str, int]] = {}
+        self._in_batch = False
+        self._flusher: asyncio.Task | None = None
+
+    def _read(self) -> dict[str, dict[str, int] | None]:
+        if not self.file_path:
+            return self.counts
+
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                return json.load(f)["lists"]
+        except FileNotFoundError:
+            return {}
+
+    async def _write(
+        self,
+        changes: dict[str, dict[str, int]],
+        counted: dict[str, dict[str, int]] | None = None,
+    ) -> None:
+        """Add `changes` to the stored counts and replace those of `counted` lists."""
+        if self.lock:
+            lock_task = asyncio.create_task(self.lock.acquire())
+            await lock_task
+        try:
+            counts = self._read()
+            for name, statuses in changes.items():
+                if counts.get(name) is None:
+                    # Counting the storage here would race with changes made
+                    # meanwhile, so it is left to `TaskLists.counts`.
+                    counts[name] = None
+                    continue
+                list_counts = counts[name]
+                for status, change in statuses.items():
+                    list_counts[status] = list_counts.get(status, 0) + change
+            counts.update(counted or {})
+
+            if self.file_path:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write_json(self.file_path, {"lists": counts})
+            self.counts = counts
+        finally:
+            if self.lock:
+                self.lock.release()
+
+    def begin(self) -> None:
+        self._in_batch = True
+
+    async def commit(self) -> None:
+        self._in_batch = False
+        flush_task = asyncio.create_task(self.flush())
+        await flush_task
+
+    async def flush(self) -> None:
+        """Add the changes held in memory to the catalog now."""
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        if not self._pending:
+            self._clear_marker()
+            return
+
+        changes, self._pending = self._pending, {}
+        try:
+            write_task = asyncio.create_task(self._write(changes))
+            await write_task
+        except BaseException:
+            for name, statuses in changes.items():
+                self._add_pending(name, statuses)
+            raise
+        self._clear_marker()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_window)
+        self._flusher = None
+        flush_task = asyncio.create_task(self.flush())
+        await flush_task
+
+    def _clear_marker(self) -> None:
+        if self.marker_path and not self._pending:
+            self.marker_path.unlink(missing_ok=True)
+
+    def _add_pending(self, name: str, changes: dict[str, int]) -> None:
+        if not self._pending and self.marker_path:
+            self.marker_path.parent.mkdir(parents=True, exist_ok=True)
+            self.marker_path.touch()
+
+        list_changes = self._pending.setdefault(name, {})
+        for status, change in changes.items():
+            list_changes[status] = list_changes.get(status, 0) + change
+
+    async def count(self, name: str, changes: dict[str, int]) -> None:
+        """Add `changes` (status -> number of tasks) to the counts of a list."""
+        self._add_pending(name, changes)
+        if not self._in_batch and not self._flusher:
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    def lost_changes(self) -> list[Path]:
+        """Markers of processes that ended with changes not in the catalog."""
+        if not self.file_path:
+            return []
+
+        lost = []
+        for path in self.file_path.parent.glob(f"{self.file_path.name}.*.pending"):
+            pid = path.name.removeprefix(f"{self.file_path.name}.").removesuffix(
+                ".pending"
+            )
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                lost.append(path)
+            except PermissionError:
+                # Running under another user.
+                pass
+        return lost
+
+    async def set_counts(self, counted: dict[str, dict[str, int]]) -> None:
+        # Already part of the new counts.
+        for name in counted:
+            self._pending.pop(name, None)
+        write_task = asyncio.create_task(self._write({}, counted))
+        await write_task
+        self._clear_marker()
+
+    def read(self) -> dict[str, dict[str, int] | None]:
+        """Stored counts with the changes not written yet, None for lists to be counted."""
+        self.counts = self._read()
+        counts = {
+            name: dict(statuses) if statuses is not None else None
+            for name, statuses in self.counts.items()
+        }
+        for name, statuses in self._pending.items():
+            list_counts = counts.get(name)
+            if list_counts is None:
+                counts[name] = None
+                continue
+            for status, change in statuses.items():
+                list_counts[status] = list_counts.get(status, 0) + change
+        return counts
+
+
+class TaskLists:
+    def __init__(
+        self,
+        *,
+        open_storage: Callable[[str], IStorage],
+        open_search_index: Callable[[str], SearchIndex],
+        catalog: ListCatalog | None = None,
+        default: str = "uncategorized",
+        max_open: int | None = 8,
+    ):
+        self.open_storage = open_storage
+        self.open_search_index = open_search_index
+        self.catalog = catalog or ListCatalog()
+        self.default = default
+        # None keeps every list open, e.g. for in-memory storages.
+        self.max_open = max_open
+
+        # Open lists, the most recently used last.
+        self.lists: OrderedDict[str, TaskList] = OrderedDict()
+        self.evictions = 0
+
+    def open(self, name: str) -> TaskList:
+        if name in self.lists:
+            self.lists.move_to_end(name)
+            return self.lists[name]
+
+        if not LIST_NAME.fullmatch(name):
+            raise ValueError(
+                f'Invalid list name "{name}", use letters, digits, "_" and "-".'
+            )
+
+        task_list = TaskList(
+            name, self.open_storage(name), self.open_search_index(name)
+        )
+        self.lists[name] = task_list
+        return task_list
+
+    async def trim(self) -> None:
+        """Unload the least recently used lists over `max_open`."""
+        if self.max_open is None:
+            return
+
+        # The most recently used list stays open.
+        while len(self.lists) > max(self.max_open, 1):
+            _, task_list = self.lists.popitem(last=False)
+            unload_task = asyncio.create_task(task_list.storage.unload())
+            await unload_task
+            self.evictions += 1
+
+    async def _count(self, name: str) -> dict[str, int]:
+        task_list = self.lists.get(name)
+        storage = task_list.storage if task_list else self.open_storage(name)
+
+        counts: dict[str, int] = {}
+        try:
+            async for task in storage.iter_tasks():
+                counts[task.status] = counts.get(task.status, 0) + 1
+        finally:
+            if not task_list:
+                unload_task = asyncio.create_task(storage.unload())
+                await unload_task
+        return counts
+
+    async def close(self) -> None:
+        """Add the count changes still held to the catalog."""
+        flush_task = asyncio.create_task(self.catalog.flush())
+        await flush_task
+
+    async def counts(self, *, recount: bool = False) -> dict[str, dict[str, int]]:
+        """list -> status -> count, for every known and every open list."""
+        lost = self.catalog.lost_changes()
+        recount = recount or bool(lost)
+
+        counts = self.catalog.read()
+        names = sorted(set(counts) | set(self.lists) | {self.default})
+
+        counted: dict[str, dict[str, int]] = {}
+        for name in names:
+            if recount or counts.get(name) is None:
+                count_task = asyncio.create_task(self._count(name))
+                counted[name] = await count_task
+        if counted:
+            write_task = asyncio.create_task(self.catalog.set_counts(counted))
+            await write_task
+            counts = self.catalog.read()
+        for path in lost:
+            path.unlink(missing_ok=True)
+        return {name: counts.get(name) or {} for name in names}
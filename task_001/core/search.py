@@ -0,0 +1,289 @@
+"""
+Inverted index over task descriptions.
+
+Files next to the task list:
+
+uncategorized.json.index       {"documents": {"<id>": [token, ...]}}
+uncategorized.json.index.log   one change per line, applied on top of the index:
+                               {"id": int, "tokens": [token, ...]}
+                               {"id": int, "tokens": null} for a deleted task
+
+Changes are only appended to the log. The index is read and updated with
+the log when searching, and written back once the log gets long. A loaded
+index replays the lines other processes appended to the log since, and is
+read again once another process wrote or removed the index file.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+import re
+from typing import Iterable
+
+from ..storage.files import atomic_write_json
+from ..storage.istorage import IStorage
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> set[str]:
+    return set(TOKEN.findall(text.casefold()))
+
+
+class SearchIndex:
+    def __init__(
+        self, *, file_location: str | None = None, compact_threshold: int = 1000
+    ):
+        self.file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+            if file_location
+            else None
+        )
+        self.compact_threshold = compact_threshold
+
+        self.loaded = False
+        self.postings: dict[str, set[int]] = {}
+        self.documents: dict[int, set[str]] = {}
+        # Log lines held back until commit, None outside of a batch.
+        self._pending: list[str] | None = None
+        # Index file and log as last read: (inode, size, mtime) of the index,
+        # inode of the log and the end of its last complete line.
+        self._index_state: tuple[int, int, int] | None = None
+        self._log_inode: int | None = None
+        self._log_offset = 0
+
+    @property
+    def log_path(self) -> Path | None:
+        return (
+            self.file_path.with_name(f"{self.file_path.name}.log")
+            if self.file_path
+            else None
+        )
+
+    @property
+    def compacting_path(self) -> Path | None:
+        return (
+            self.file_path.with_name(f"{self.file_path.name}.log.compacting")
+            if self.file_path
+            else None
+        )
+
+    def _set(self, idx: int, tokens: set[str] | None) -> None:
+        for token in self.documents.pop(idx, ()):
+            ids = self.postings[token]
+            ids.discard(idx)
+            if not ids:
+                del self.postings[token]
+
+        if tokens is None:
+            return
+
+        self.documents[idx] = tokens
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(idx)
+
+    def _append(self, idx: int, tokens: set[str] | None) -> None:
+        if not self.log_path:
+            return
+
+        line = (
+            json.dumps(
+                {"id": idx, "tokens": sorted(tokens) if tokens is not None else None}
+            )
+            + "\n"
+        )
+        if self._pending is not None:
+            self._pending.append(line)
+            return
+
+        self._write_log([line])
+
+    def _write_log(self, lines: list[str]) -> None:
+        if not self.log_path or not lines:
+            return
+
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def begin(self) -> None:
+        if self._pending is None:
+            self._pending = []
+
+    def commit(self) -> None:
+        if self._pending is None:
+            return
+
+        lines, self._pending = self._pending, None
+        self._write_log(lines)
+
+    def clear(self) -> None:
+        """Drop the index, it is built again from the storage on the next search."""
+        self.loaded = False
+        self.postings = {}
+        self.documents = {}
+        if self._pending is not None:
+            self._pending = []
+
+        for path in [self.file_path, self.log_path, self.compacting_path]:
+            if path:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _replay(self, path: Path, start: int = 0) -> tuple[int, int]:
+        """Apply the complete lines after byte `start`. Returns the records and their end."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return 0, start
+
+        # A line still being appended is read the next time.
+        end = data.rfind(b"\n") + 1
+        records = 0
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records += 1
+            tokens = record["tokens"]
+            self._set(record["id"], set(tokens) if tokens is not None else None)
+        return records, start + end
+
+    def _stat(self, path: Path) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _catch_up(self) -> bool:
+        """Replay what other processes appended, False if the index has to be read again."""
+        if not self.file_path or not self.log_path:
+            return True
+        if self._stat(self.file_path) != self._index_state:
+            return False
+
+        log = self._stat(self.log_path)
+        if log is None:
+            # Taken away for a compaction.
+            return self._log_inode is None
+        inode, size, _ = log
+        if self._log_inode is None:
+            self._log_offset = 0
+        elif inode != self._log_inode or size < self._log_offset:
+            return False
+
+        if size > self._log_offset:
+            # Lines this process appended are applied again, which changes nothing.
+            _, self._log_offset = self._replay(self.log_path, self._log_offset)
+        self._log_inode = inode
+        return True
+
+    def _remember_files(self) -> None:
+        if not self.file_path or not self.log_path:
+            return
+
+        self._index_state = self._stat(self.file_path)
+        log = self._stat(self.log_path)
+        self._log_inode = log[0] if log else None
+
+    def _store(self) -> None:
+        if not self.file_path:
+            return
+
+        atomic_write_json(
+            self.file_path,
+            {
+                "documents": {
+                    str(idx): sorted(tokens) for idx, tokens in self.documents.items()
+                }
+            },
+        )
+
+    async def _rebuild(self, storage: IStorage) -> None:
+        self.postings = {}
+        self.documents = {}
+        async for task in storage.iter_tasks():
+            self._set(task.id, tokenize(task.description))
+
+    async def load(self, storage: IStorage) -> None:
+        if self.loaded:
+            if self._catch_up():
+                return
+            self.loaded = False
+            self.postings = {}
+            self.documents = {}
+
+        if not self.file_path or not self.log_path or not self.compacting_path:
+            rebuild_task = asyncio.create_task(self._rebuild(storage))
+            await rebuild_task
+            self.loaded = True
+            return
+
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = None
+
+        # Left behind by a compaction that did not finish, everything in it is
+        # older than the log.
+        interrupted = self.compacting_path.exists()
+
+        if data is None:
+            # The task list already holds every change the log could add.
+            if not interrupted and self.log_path.exists():
+                os.replace(self.log_path, self.compacting_path)
+            rebuild_task = asyncio.create_task(self._rebuild(storage))
+            await rebuild_task
+            compact = True
+        else:
+            for idx, tokens in data["documents"].items():
+                self._set(int(idx), set(tokens))
+            compacting_records, _ = self._replay(self.compacting_path)
+            log_records, self._log_offset = self._replay(self.log_path)
+            compact = (
+                interrupted or compacting_records + log_records > self.compact_threshold
+            )
+            if compact and not interrupted and self.log_path.exists():
+                os.replace(self.log_path, self.compacting_path)
+                # Picks up changes appended since the log was read.
+                self._replay(self.compacting_path)
+
+        self.loaded = True
+
+        if compact:
+            self._store()
+            if self.compacting_path.exists():
+                os.remove(self.compacting_path)
+            self._log_offset = 0
+        self._remember_files()
+
+    def index(self, idx: int, description: str) -> None:
+        tokens = tokenize(description)
+        if self.loaded:
+            self._set(idx, tokens)
+        self._append(idx, tokens)
+
+    def remove(self, idx: int) -> None:
+        if self.loaded:
+            self._set(idx, None)
+        self._append(idx, None)
+
+    async def search(self, storage: IStorage, query: str) -> list[int]:
+        load_task = asyncio.create_task(self.load(storage))
+        await load_task
+
+        return sorted(self._match(tokenize(query)))
+
+    def _match(self, tokens: Iterable[str]) -> set[int]:
+        ids = sorted((self.postings.get(token, set()) for token in tokens), key=len)
+        if not ids:
+            return set()
+        return ids[0].intersection(*ids[1:])
@@ -1,45 +1,222 @@
 import time
 import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, TextIO
 
-from ..input.cli import CLIInput
 from ..input.iinput import IInput
 
 
-from ..models.task import BaseTask, TaskNotFound, TaskStatus, Task
-from ..output.cli import CLIOutput
+from ..models.task import BaseTask, TaskConflict, TaskNotFound, TaskStatus, Task
+from .lists import TaskLists
+from .search import SearchIndex
+from .transfer import parse_task, read_records, write_tasks
 from ..output.ioutput import IOutput
 from ..storage.istorage import IStorage
-from ..storage.in_memory import InMemoryStorage
+
+# list_tasks orders -> task time it sorts by
+sort_fields = {"created": "createdAt", "updated": "updatedAt"}
 
 
 class TaskManager:
     def __init__(
         self,
         *,
-        storage_manager: IStorage,
+        storage_manager: IStorage | None = None,
         output_manager: IOutput,
-        input_manager: IInput
+        input_manager: IInput,
+        search_index: SearchIndex | None = None,
+        lists: TaskLists | None = None,
+        conflict_retries: int = 3,
     ):
-        self.storage_manager = storage_manager
+        """Works on `storage_manager`, or on the default of `lists` and the lists selected later."""
         self.output_manager = output_manager
         self.input_manager = input_manager
+        self.lists = lists
+        self.conflict_retries = conflict_retries
+
+        if lists:
+            current = lists.open(lists.default)
+            self.list_name: str | None = current.name
+            self.storage_manager = current.storage
+            self.search_index = current.search_index
+        elif storage_manager:
+            self.list_name = None
+            self.storage_manager = storage_manager
+            self.search_index = search_index or SearchIndex()
+        else:
+            raise ValueError("Either a storage manager or task lists are needed.")
+        self._in_batch = False
 
         self.input_manager.set_list_handler(self.list_tasks)
         self.input_manager.set_add_handler(self.create_task)
         self.input_manager.set_status_handler(self.change_status)
         self.input_manager.set_update_handler(self.update_task)
         self.input_manager.set_delete_handler(self.delete_task)
+        self.input_manager.set_search_handler(self.search_tasks)
+        self.input_manager.set_import_handler(self.import_tasks)
+        self.input_manager.set_export_handler(self.export_tasks)
+        self.input_manager.set_refresh_handler(self.refresh)
+        self.input_manager.set_select_list_handler(self.select_list)
+        self.input_manager.set_lists_handler(self.list_lists)
+        self.input_manager.set_begin_handler(self.begin)
+        self.input_manager.set_commit_handler(self.commit)
+        self.input_manager.set_error_handler(self.output_manager.error)
 
-    async def list_tasks(self, status: TaskStatus | None = None) -> None:
-        storage_task = asyncio.create_task(self.storage_manager.load())
-        tasks = await storage_task
-        tasks_list = [
-            task for task in enumerate(tasks.values()) if not status or task[1].status == status
-        ]
+    async def refresh(self) -> None:
+        poll_task = asyncio.create_task(self.storage_manager.poll_changes())
+        changes = await poll_task
+        if not changes:
+            return
+
+        output_task = asyncio.create_task(self.output_manager.tasks_changed(changes))
+        await output_task
+
+    async def select_list(self, name: str | None) -> bool:
+        """Work on the list `name` from now on, the default one for None."""
+        if not self.lists:
+            if name is None:
+                return True
+            output_task = asyncio.create_task(
+                self.output_manager.error("This storage has a single task list.")
+            )
+            await output_task
+            return False
+
+        name = name or self.lists.default
+        if name == self.list_name:
+            return True
+
+        try:
+            selected = self.lists.open(name)
+        except ValueError as e:
+            output_task = asyncio.create_task(self.output_manager.error(str(e)))
+            await output_task
+            return False
+
+        if self._in_batch:
+            # The batch goes on in the selected list.
+            commit_task = asyncio.create_task(self._commit_list())
+            await commit_task
+
+        self.list_name = selected.name
+        self.storage_manager = selected.storage
+        self.search_index = selected.search_index
+
+        if self._in_batch:
+            begin_task = asyncio.create_task(self._begin_list())
+            await begin_task
+
+        trim_task = asyncio.create_task(self.lists.trim())
+        await trim_task
+        return True
 
-        output_task = asyncio.create_task(self.output_manager.tasks_list(tasks_list))
+    async def list_lists(self, recount: bool = False) -> None:
+        if not self.lists:
+            output_task = asyncio.create_task(
+                self.output_manager.error("This storage has a single task list.")
+            )
+            await output_task
+            return
+
+        counts_task = asyncio.create_task(self.lists.counts(recount=recount))
+        counts = await counts_task
+
+        output_task = asyncio.create_task(
+            self.output_manager.task_lists(counts, self.list_name)
+        )
         await output_task
 
+    async def _count(self, changes: dict[str, int]) -> None:
+        if not self.lists or not self.list_name:
+            return
+
+        count_task = asyncio.create_task(
+            self.lists.catalog.count(self.list_name, changes)
+        )
+        await count_task
+
+    async def _begin_list(self) -> None:
+        begin_task = asyncio.create_task(self.storage_manager.begin())
+        await begin_task
+        self.search_index.begin()
+
+    async def _commit_list(self) -> None:
+        commit_task = asyncio.create_task(self.storage_manager.commit())
+        await commit_task
+        self.search_index.commit()
+
+    async def begin(self) -> None:
+        begin_task = asyncio.create_task(self._begin_list())
+        await begin_task
+        if self.lists:
+            self.lists.catalog.begin()
+        self._in_batch = True
+
+    async def commit(self) -> None:
+        self._in_batch = False
+        commit_task = asyncio.create_task(self._commit_list())
+        await commit_task
+        if self.lists:
+            commit_task = asyncio.create_task(self.lists.catalog.commit())
+            await commit_task
+
+    async def _task_rows(
+        self, tasks_iterator: AsyncIterator[Task], limit: int | None
+    ) -> AsyncIterator[tuple[int, Task]]:
+        if limit is not None and limit <= 0:
+            return
+
+        count = 0
+        async with aclosing(tasks_iterator) as tasks:
+            async for task in tasks:
+                yield task.id, task
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    async def list_tasks(
+        self,
+        status: TaskStatus | str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+        sort: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> None:
+        """In id order, or by the time `sort` names. `since` and `until` bound
+        that time, the update time without `sort`."""
+        if isinstance(status, TaskStatus):
+            status = status.value
+
+        if sort or since is not None or until is not None:
+            tasks_iterator = self.storage_manager.iter_tasks_by_time(
+                sort_fields[sort or "updated"], status, since=since, until=until
+            )
+        else:
+            tasks_iterator = self.storage_manager.iter_tasks(status, after=after)
+
+        async with aclosing(self._task_rows(tasks_iterator, limit)) as tasks:
+            output_task = asyncio.create_task(self.output_manager.tasks_stream(tasks))
+            await output_task
+
+    async def _found_task_rows(self, ids: list[int]) -> AsyncIterator[tuple[int, Task]]:
+        for idx in ids:
+            try:
+                storage_task = asyncio.create_task(self.storage_manager.get_by_idx(idx))
+                yield idx, await storage_task
+            except TaskNotFound:
+                continue
+
+    async def search_tasks(self, query: str) -> None:
+        search_task = asyncio.create_task(
+            self.search_index.search(self.storage_manager, query)
+        )
+        ids = await search_task
+
+        async with aclosing(self._found_task_rows(ids)) as tasks:
+            output_task = asyncio.create_task(self.output_manager.tasks_stream(tasks))
+            await output_task
+
     async def create_task(self, description: str):
         storage_task = asyncio.create_task(
             self.storage_manager.add(
@@ -52,27 +229,112 @@ class TaskManager:
             )
         )
         idx, task = await storage_task
+        self.search_index.index(idx, task.description)
 
-        output_task = asyncio.create_task(self.output_manager.task_added_success(idx, task))
+        count_task = asyncio.create_task(self._count({task.status: 1}))
+        await count_task
+
+        output_task = asyncio.create_task(
+            self.output_manager.task_added_success(idx, task)
+        )
         await output_task
 
-    async def change_status(self, idx: int, status: str) -> None:
-        try:
-            storage_task = asyncio.create_task(self.storage_manager.get_by_idx(idx))
-            task = await storage_task
-        except TaskNotFound:
-            output_task = asyncio.create_task(
-                self.output_manager.error_task_not_found(idx)
+    async def _parsed_tasks(
+        self, f: TextIO, format: str, counts: dict[str, int]
+    ) -> AsyncIterator[BaseTask]:
+        now = time.time()
+        for number, record in read_records(f, format):
+            try:
+                task = parse_task(record, now)
+            except ValueError as e:
+                output_task = asyncio.create_task(
+                    self.output_manager.error(f"Line {number} skipped: {e}")
+                )
+                await output_task
+                continue
+
+            counts[task.status] = counts.get(task.status, 0) + 1
+            yield task
+
+    async def import_tasks(self, f: TextIO, format: str) -> None:
+        counts: dict[str, int] = {}
+        storage_task = asyncio.create_task(
+            self.storage_manager.add_many(self._parsed_tasks(f, format, counts))
+        )
+        added = await storage_task
+
+        # Built again on the next search instead of logging every task.
+        self.search_index.clear()
+        count_task = asyncio.create_task(self._count(counts))
+        await count_task
+
+        output_task = asyncio.create_task(self.output_manager.tasks_imported(added))
+        await output_task
+
+    async def export_tasks(
+        self, f: TextIO, format: str, status: str | None = None
+    ) -> None:
+        async with aclosing(self.storage_manager.iter_tasks(status)) as tasks:
+            write_task = asyncio.create_task(write_tasks(tasks, f, format))
+            written = await write_task
+
+        output_task = asyncio.create_task(self.output_manager.tasks_exported(written))
+        await output_task
+
+    async def _modify_task(
+        self, idx: int, apply: Callable[[Task], None]
+    ) -> Task | None:
+        """Read the task, apply the change and store it.
+
+        When someone else changed the task in between, the change is applied
+        again to their version.
+        """
+        for _ in range(self.conflict_retries + 1):
+            try:
+                storage_task = asyncio.create_task(self.storage_manager.get_by_idx(idx))
+                task = await storage_task
+
+                apply(task)
+                task.updatedAt = time.time()
+
+                storage_task = asyncio.create_task(
+                    self.storage_manager.update_by_idx(idx, task)
+                )
+                await storage_task
+            except TaskNotFound:
+                output_task = asyncio.create_task(
+                    self.output_manager.error_task_not_found(idx)
+                )
+                await output_task
+                return None
+            except TaskConflict:
+                continue
+            else:
+                return task
+
+        output_task = asyncio.create_task(
+            self.output_manager.error(
+                f'Task "{idx}" kept changing, gave up after {self.conflict_retries + 1} attempts.'
             )
-            await output_task
-        else:
+        )
+        await output_task
+        return None
+
+    async def change_status(self, idx: int, status: str) -> None:
+        previous = status
+
+        def apply(task: Task):
+            nonlocal previous
+            previous = task.status
             task.status = status
-            task.updatedAt = time.time()
 
-            storage_task = asyncio.create_task(
-                self.storage_manager.update_by_idx(idx, task)
-            )
-            await storage_task
+        modify_task = asyncio.create_task(self._modify_task(idx, apply))
+        task = await modify_task
+
+        if task:
+            if previous != status:
+                count_task = asyncio.create_task(self._count({previous: -1, status: 1}))
+                await count_task
 
             output_task = asyncio.create_task(
                 self.output_manager.task_status_updated_success(idx, task)
@@ -80,29 +342,28 @@ class TaskManager:
             await output_task
 
     async def update_task(self, idx: int, description: str) -> None:
-        try:
-            storage_task = asyncio.create_task(self.storage_manager.get_by_idx(idx))
-            task = await storage_task
-        except TaskNotFound:
-            output_task = asyncio.create_task(
-                self.output_manager.error_task_not_found(idx)
-            )
-            await output_task
-        else:
+        def apply(task: Task):
             task.description = description
-            task.updatedAt = time.time()
 
-            storage_task = asyncio.create_task(
-                self.storage_manager.update_by_idx(idx, task)
-            )
-            await storage_task
+        modify_task = asyncio.create_task(self._modify_task(idx, apply))
+        task = await modify_task
+
+        if task:
+            self.search_index.index(idx, description)
+
             output_task = asyncio.create_task(
                 self.output_manager.task_updated_success(idx, task)
             )
             await output_task
 
     async def delete_task(self, idx: int) -> None:
+        status = None
         try:
+            if self.lists:
+                # Its status is taken off the counts of the list.
+                storage_task = asyncio.create_task(self.storage_manager.get_by_idx(idx))
+                status = (await storage_task).status
+
             storage_task = asyncio.create_task(self.storage_manager.delete_by_idx(idx))
             await storage_task
         except TaskNotFound:
@@ -111,6 +372,11 @@ class TaskManager:
             )
             await output_task
         else:
+            self.search_index.remove(idx)
+            if status:
+                count_task = asyncio.create_task(self._count({status: -1}))
+                await count_task
+
             output_task = asyncio.create_task(
                 self.output_manager.task_deleted_success(idx)
             )
@@ -118,6 +384,9 @@ class TaskManager:
 
 
 if __name__ == "__main__":
+    from ..input.cli import CLIInput
+    from ..output.cli import CLIOutput
+    from ..storage.in_memory import InMemoryStorage
 
     async def test():
         task_manager = TaskManager(
@@ -0,0 +1,92 @@
+"""
+Task import and export formats.
+
+ndjson    one JSON object per line:
+          {"id": 1, "description": "...", "status": "todo", "createdAt": 1700000000.0, "updatedAt": 1700000000.0}
+csv       a header line, then one task per line:
+          id,description,status,createdAt,updatedAt
+
+Exports have every field. Imports only need a description: the status
+defaults to todo and missing times to the time of the import. Imported
+tasks get new ids, so an id in the file is ignored.
+
+Both directions go one task at a time, the file is never held in memory.
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import AsyncIterator, Iterator, TextIO
+
+from ..models.task import BaseTask, Task, TaskStatus
+
+FORMATS = ["ndjson", "csv"]
+FIELDS = ["id", "description", "status", "createdAt", "updatedAt"]
+
+
+def detect_format(file: str) -> str:
+    """Format by file extension, ndjson for stdin/stdout and unknown extensions."""
+    return "csv" if Path(file).suffix.lower() == ".csv" else "ndjson"
+
+
+def read_records(f: TextIO, format: str) -> Iterator[tuple[int, str | dict]]:
+    """Line number and raw record, an NDJSON line or a CSV row."""
+    if format == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(f, start=1):
+        if line.strip():
+            yield number, line
+
+
+def parse_task(record: str | dict, now: float) -> BaseTask:
+    """Raises ValueError for records that are not a task."""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}.")
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object.")
+
+    description = record.get("description")
+    if not isinstance(description, str) or not description:
+        raise ValueError("Missing description.")
+
+    status = record.get("status") or TaskStatus.planned.value
+    if status not in [task_status.value for task_status in TaskStatus]:
+        raise ValueError(f'Unknown status "{status}".')
+
+    try:
+        created_at = float(record.get("createdAt") or now)
+        updated_at = float(record.get("updatedAt") or created_at)
+    except (TypeError, ValueError):
+        raise ValueError("Times must be numbers.")
+
+    return BaseTask(
+        description=description,
+        status=status,
+        createdAt=created_at,
+        updatedAt=updated_at,
+    )
+
+
+async def write_tasks(tasks: AsyncIterator[Task], f: TextIO, format: str) -> int:
+    written = 0
+    if format == "csv":
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        async for task in tasks:
+            writer.writerow(
+                [task.id, task.description, task.status, task.createdAt, task.updatedAt]
+            )
+            written += 1
+        return written
+
+    async for task in tasks:
+        f.write(json.dumps({field: getattr(task, field) for field in FIELDS}) + "\n")
+        written += 1
+    return written
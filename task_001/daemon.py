@@ -0,0 +1,192 @@
+"""
+Resident task-cli server.
+
+Keeps recently used task lists loaded and runs task-cli commands sent over a Unix socket
+(`daemon-socket` in config.ini). One JSON object per line in both directions:
+
+request   {"argv": ["list", "--limit", "5"]}
+response  {"output": "..."} and {"error": "..."} for stdout and stderr as they
+          are written, then {"code": 0} once the command is done
+
+A connection can send any number of requests. Commands run one at a time.
+
+Start it from the repository root:
+
+python3 -m task_001.daemon
+"""
+
+import asyncio
+from contextlib import redirect_stderr, redirect_stdout
+import io
+import json
+import os
+from pathlib import Path
+import signal
+import socket
+
+from .core.tasks import TaskManager
+from .entrypoint import config, get_task_lists
+from .input.cli import CLIInput
+from .output.cli import CLIOutput
+
+# Output is sent to the client in chunks of about this many characters.
+CHUNK_SIZE = 1 << 16
+
+
+def get_socket_path() -> Path:
+    return Path(os.path.dirname(os.path.realpath(__file__))) / config["DEFAULT"].get(
+        "daemon-socket", "data/task-cli.sock"
+    )
+
+
+def _is_running(socket_path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+class _ClientStream(io.TextIOBase):
+    """stdout or stderr of a command, sent to the client as `{key: chunk}` lines."""
+
+    def __init__(self, writer: asyncio.StreamWriter, key: str):
+        self.writer = writer
+        self.key = key
+        self._buffer: list[str] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if self.writer.is_closing():
+            raise BrokenPipeError("The client is gone.")
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if not self._buffer or self.writer.is_closing():
+            return
+        chunk = "".join(self._buffer)
+        self._buffer = []
+        self._size = 0
+        self.writer.write(json.dumps({self.key: chunk}).encode("utf-8") + b"\n")
+
+    async def drain(self) -> None:
+        """Wait while the client is behind on reading."""
+        try:
+            await self.writer.drain()
+        except ConnectionError as e:
+            raise BrokenPipeError("The client is gone.") from e
+
+
+class Daemon:
+    def __init__(self, *, socket_path: Path):
+        self.socket_path = socket_path
+
+        task_lists = get_task_lists()
+        if not task_lists:
+            raise ValueError(
+                f"Unknown storage type {config['DEFAULT']['storage-type']}"
+            )
+
+        self.task_lists = task_lists
+        self.input_manager = CLIInput()
+        TaskManager(
+            input_manager=self.input_manager,
+            output_manager=CLIOutput(),
+            lists=task_lists,
+        )
+        # Output is captured by swapping sys.stdout, so commands can't overlap.
+        self._running = asyncio.Lock()
+
+    async def execute(self, argv: list[str], writer: asyncio.StreamWriter) -> int:
+        output = _ClientStream(writer, "output")
+        error = _ClientStream(writer, "error")
+        code = 0
+
+        async with self._running:
+            with redirect_stdout(output), redirect_stderr(error):
+                try:
+                    # Awaited directly: a SystemExit that leaves a task stops
+                    # the event loop.
+                    await self.input_manager.run(argv)
+                except SystemExit as e:
+                    # argparse exits on --help and on invalid arguments.
+                    code = e.code if isinstance(e.code, int) else 1
+                except Exception as e:
+                    print(f"Error: {e}")
+                    code = 1
+                finally:
+                    output.flush()
+                    error.flush()
+
+        return code
+
+    async def _serve_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    argv = json.loads(line)["argv"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    writer.write(
+                        json.dumps({"error": "Invalid request.\n"}).encode("utf-8")
+                        + b"\n"
+                    )
+                    code = 2
+                else:
+                    execute_task = asyncio.create_task(self.execute(argv, writer))
+                    code = await execute_task
+
+                writer.write(json.dumps({"code": code}).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        if self.socket_path.exists():
+            if _is_running(self.socket_path):
+                raise RuntimeError(
+                    f"A daemon is already listening on {self.socket_path}"
+                )
+            # Left behind by a daemon that was killed.
+            os.remove(self.socket_path)
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = await asyncio.start_unix_server(
+            self._serve_client, path=str(self.socket_path)
+        )
+
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stopped.set)
+
+        try:
+            async with server:
+                await stopped.wait()
+        finally:
+            if self.socket_path.exists():
+                os.remove(self.socket_path)
+            close_task = asyncio.create_task(self.task_lists.close())
+            await close_task
+
+
+async def main():
+    daemon = Daemon(socket_path=get_socket_path())
+    print(f"Listening on {daemon.socket_path}")
+    serve_task = asyncio.create_task(daemon.serve())
+    await serve_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,19 +3,19 @@ from enum import Enum
 import configparser
 import os
 from pathlib import Path
+import sys
+from typing import Callable
 
 
 from .input.iinput import IInput
 from .output.ioutput import IOutput
 from .storage.istorage import IStorage
 
-from .input.cli import CLIInput
-from .storage.json import JSONStorage
-from .storage.in_memory import InMemoryStorage
-from .output.cli import CLIOutput
-from .output.pyqt import PyQtInputOutput
+from .core.lists import ListCatalog, TaskLists
+from .core.search import SearchIndex
 from .core.tasks import TaskManager
-
+from . import profiling
+from .profiling import phase
 
 config = configparser.ConfigParser()
 config.read(Path(os.path.dirname(os.path.realpath(__file__))) / "config.ini")
@@ -24,6 +24,10 @@ config.read(Path(os.path.dirname(os.path.realpath(__file__))) / "config.ini")
 class StorageType(Enum):
     json = "json"
     in_memory = "in-memory"
+    journal = "journal"
+    sqlite = "sqlite"
+    binary = "binary"
+    sharded_json = "sharded-json"
 
 
 class InputType(Enum):
@@ -35,55 +39,190 @@ class OutputType(Enum):
     cli = "cli"
     pyqt = "pyqt"
 
+
 pyqt_manager = None
 
+
 def get_pyqt_manager():
     global pyqt_manager
 
     if not pyqt_manager:
-        pyqt_manager = PyQtInputOutput()
+        from .output.pyqt import PyQtInputOutput
+
+        pyqt_manager = PyQtInputOutput(
+            refresh_interval=config["DEFAULT"].getfloat("gui-refresh-interval", 1.0),
+            event_queue_size=config["DEFAULT"].getint("gui-event-queue-size", 256),
+        )
     return pyqt_manager
 
+
+# Backends are imported by their factory, so only the configured ones are
+# loaded. PyQt6 alone takes longer to import than a whole CLI command.
+
+
+def _cli_output() -> IOutput:
+    from .output.cli import CLIOutput
+
+    return CLIOutput()
+
+
+def _cli_input() -> IInput:
+    from .input.cli import CLIInput
+
+    return CLIInput()
+
+
+def _json_storage(file_location: str) -> IStorage:
+    from .storage.json import JSONStorage
+
+    return JSONStorage(
+        file_location=file_location,
+        validate_cache=config["DEFAULT"].getboolean("json-validated-cache", True),
+        flush_window=config["DEFAULT"].getfloat("json-flush-window", 0.005),
+        lazy_load=config["DEFAULT"].getboolean("json-lazy-load", False),
+        # On by default for the GUI, whose events are handled on the same loop.
+        offload_io=config["DEFAULT"].getboolean(
+            "json-offload-io",
+            InputType.pyqt.value in [get_input_type(), get_output_type()],
+        ),
+    )
+
+
+def _in_memory_storage(file_location: str) -> IStorage:
+    from .storage.in_memory import InMemoryStorage
+
+    return InMemoryStorage()
+
+
+def _journal_storage(file_location: str) -> IStorage:
+    from .storage.journal import JournalStorage
+
+    return JournalStorage(
+        file_location=file_location,
+        compact_threshold=config["DEFAULT"].getint("journal-compact-threshold", 1000),
+    )
+
+
+def _sqlite_storage(file_location: str) -> IStorage:
+    from .storage.sqlite import SQLiteStorage
+
+    return SQLiteStorage(file_location=str(Path(file_location).with_suffix(".sqlite3")))
+
+
+def _binary_storage(file_location: str) -> IStorage:
+    from .storage.binary import BinaryStorage
+
+    return BinaryStorage(file_location=str(Path(file_location).with_suffix(".tasks")))
+
+
+def _sharded_json_storage(file_location: str) -> IStorage:
+    from .storage.sharded import ShardExecutor, ShardedJSONStorage
+
+    return ShardedJSONStorage(
+        file_location=file_location,
+        shards=config["DEFAULT"].getint("shards", 8),
+        executor=ShardExecutor(config["DEFAULT"].get("shard-executor", "thread")),
+        flush_window=config["DEFAULT"].getfloat("json-flush-window", 0.005),
+    )
+
+
+output_managers: dict[str, Callable[[], IOutput]] = {
+    OutputType.cli.value: _cli_output,
+    OutputType.pyqt.value: get_pyqt_manager,
+}
+
+input_managers: dict[str, Callable[[], IInput]] = {
+    InputType.cli.value: _cli_input,
+    InputType.pyqt.value: get_pyqt_manager,
+}
+
+# Called with the file location of a task list.
+storage_managers: dict[str, Callable[[str], IStorage]] = {
+    StorageType.json.value: _json_storage,
+    StorageType.in_memory.value: _in_memory_storage,
+    StorageType.journal.value: _journal_storage,
+    StorageType.sqlite.value: _sqlite_storage,
+    StorageType.binary.value: _binary_storage,
+    StorageType.sharded_json.value: _sharded_json_storage,
+}
+
 get_output_type = lambda: config["DEFAULT"]["output-type"]
 
 
 def _get_output_manager() -> IOutput | None:
-    output_type = get_output_type()
-    match output_type:
-        case OutputType.cli.value:
-            return CLIOutput()
-        case OutputType.pyqt.value:
-            return get_pyqt_manager()
+    factory = output_managers.get(get_output_type())
+    return factory() if factory else None
 
 
 get_input_type = lambda: config["DEFAULT"]["input-type"]
 
 
 def _get_input_manager() -> IInput | None:
-    input_type = get_input_type()
-    match input_type:
-        case InputType.cli.value:
-            return CLIInput()
-        case InputType.pyqt.value:
-            return get_pyqt_manager()
+    factory = input_managers.get(get_input_type())
+    return factory() if factory else None
 
-output_manager = _get_output_manager()
-input_manager = _get_input_manager()
 
 get_storage_type = lambda: config["DEFAULT"]["storage-type"]
 
 
-def _get_storage_manager() -> IStorage | None:
-    storage_type = get_storage_type()
-    match storage_type:
-        case StorageType.json.value:
-            return JSONStorage(file_location=config["DEFAULT"]["file-location"])
-        case StorageType.in_memory.value:
-            return InMemoryStorage()
+def get_list_location(name: str) -> str:
+    """`file-location` of the task list `name`."""
+    file_location = Path(config["DEFAULT"]["file-location"])
+    return str(file_location.with_name(f"{name}{file_location.suffix}"))
+
+
+def get_storage_manager(file_location: str | None = None) -> IStorage | None:
+    factory = storage_managers.get(get_storage_type())
+    return (
+        factory(file_location or config["DEFAULT"]["file-location"])
+        if factory
+        else None
+    )
+
+
+def get_search_index(file_location: str | None = None) -> SearchIndex:
+    return SearchIndex(
+        file_location=(
+            None
+            if get_storage_type() == StorageType.in_memory.value
+            else (file_location or config["DEFAULT"]["file-location"]) + ".index"
+        )
+    )
+
+
+def get_task_lists() -> TaskLists | None:
+    if get_storage_type() not in storage_managers:
+        return None
+
+    in_memory = get_storage_type() == StorageType.in_memory.value
+    return TaskLists(
+        open_storage=lambda name: get_storage_manager(get_list_location(name)),
+        open_search_index=lambda name: get_search_index(get_list_location(name)),
+        catalog=ListCatalog(
+            file_location=(
+                None
+                if in_memory
+                else str(
+                    Path(config["DEFAULT"]["file-location"]).with_name(
+                        "lists.catalog.json"
+                    )
+                )
+            ),
+            flush_window=config["DEFAULT"].getfloat(
+                "lists-catalog-flush-interval", 1.0
+            ),
+        ),
+        default=Path(config["DEFAULT"]["file-location"]).stem,
+        # In-memory lists would be lost.
+        max_open=None if in_memory else config["DEFAULT"].getint("lists-max-open", 8),
+    )
 
 
 async def main():
-    storage_manager = _get_storage_manager()
+    with phase("setup"):
+        output_manager = _get_output_manager()
+        input_manager = _get_input_manager()
+        task_lists = get_task_lists()
 
     if not output_manager:
         print("Failed to load output manager. Closing application")
@@ -96,29 +235,92 @@ async def main():
         await output_task
         exit()
 
-    if not storage_manager:
+    if not task_lists:
         output_task = asyncio.create_task(
             output_manager.error("Failed to load storage manager. Closing application")
         )
         await output_task
         exit()
 
+    if profiling.active:
+        output_manager = profiling.active.wrap(output_manager, "output")
+        input_manager = profiling.active.wrap(input_manager, "input")
+        open_storage = task_lists.open_storage
+        task_lists.open_storage = lambda name: profiling.active.wrap(
+            open_storage(name), "storage"
+        )
+
     TaskManager(
-        storage_manager=storage_manager,
         input_manager=input_manager,
         output_manager=output_manager,
+        lists=task_lists,
     )
 
-    start_task = asyncio.create_task(input_manager.start())
-    await start_task
-
-if InputType.pyqt.value in [get_input_type(), get_output_type()]:
-    if not pyqt_manager:
-        raise Exception('pyqt_manager was not initialized.')
-    import qasync
-    with qasync.QEventLoop(pyqt_manager.application) as loop:
-        asyncio.set_event_loop(loop)
-        loop.create_task(main())
-        loop.run_forever()
-else:
-    asyncio.run(main())
+    with phase("command"):
+        start_task = asyncio.create_task(input_manager.start())
+        await start_task
+
+    if get_input_type() != InputType.pyqt.value:
+        # The GUI keeps running after start, its counts are written by the catalog.
+        close_task = asyncio.create_task(task_lists.close())
+        await close_task
+
+
+def _profile_options(argv: list[str]) -> tuple[bool, str | None, list[str]]:
+    """Take --profile and --profile-output FILE out of the command line."""
+    profile = config["DEFAULT"].getboolean("profile", False)
+    output = config["DEFAULT"].get("profile-output")
+    rest = []
+
+    args = iter(argv)
+    for arg in args:
+        if arg == "--profile":
+            profile = True
+        elif arg == "--profile-output":
+            output = next(args, None)
+        elif arg.startswith("--profile-output="):
+            output = arg.removeprefix("--profile-output=")
+        else:
+            rest.append(arg)
+
+    return profile or bool(output), output, rest
+
+
+def _run_app():
+    if InputType.pyqt.value in [get_input_type(), get_output_type()]:
+        import qasync
+
+        with qasync.QEventLoop(get_pyqt_manager().application) as loop:
+            asyncio.set_event_loop(loop)
+            loop.create_task(main())
+            loop.run_forever()
+    else:
+        asyncio.run(main())
+
+
+def run():
+    profile, profile_output, sys.argv[1:] = _profile_options(sys.argv[1:])
+    if not profile:
+        _run_app()
+        return
+
+    profiling.active = profiling.Profiler()
+    profiler = None
+    if profile_output:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    try:
+        if profiler:
+            profiler.runcall(_run_app)
+        else:
+            _run_app()
+    finally:
+        profiling.active.report()
+        if profiler:
+            profiler.dump_stats(profile_output)
+            print(f"cProfile stats written to {profile_output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    run()
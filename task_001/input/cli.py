@@ -1,12 +1,20 @@
 import argparse
 import asyncio
+from datetime import datetime
+import json
+import os
+import re
+import shlex
+import sys
+import time
 from types import CoroutineType
-from typing import Any, Callable
+from typing import Any, Callable, TextIO
 
 from .iinput import IInput
 
+from ..core.transfer import FORMATS, detect_format
 from ..models.task import TaskStatus
-
+from ..profiling import phase
 
 task_statuses = {
     "done": TaskStatus.done,
@@ -14,9 +22,15 @@ task_statuses = {
     "in-progress": TaskStatus.in_progress,
 }
 
+# Durations like 90s, 15m, 1h, 2d or 1w, counted back from now.
+RELATIVE_TIME = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+time_units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
 
 class CLIInput(IInput):
     def __init__(self):
+        # Given with --list to the running command, batch lines use it by default.
+        self.list_name: str | None = None
         self._setup_program()
 
     def _parse_task_status(self, key: str | None) -> str | None:
@@ -28,6 +42,27 @@ class CLIInput(IInput):
 
         return key
 
+    def _parse_time(self, value: str | None) -> float | None:
+        """A duration ago, a local ISO date and time or a Unix timestamp."""
+        if value is None:
+            return None
+
+        relative = RELATIVE_TIME.fullmatch(value)
+        if relative:
+            return time.time() - float(relative[1]) * time_units[relative[2]]
+
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            raise ValueError(
+                f"Failed to parse time {value}, use e.g. 1h, 2d, 2024-05-01 or 2024-05-01T14:30"
+            )
+
     async def _parse_index(self, index: str) -> int | None:
         try:
             return int(index)
@@ -51,7 +86,18 @@ class CLIInput(IInput):
         )
 
     def set_list_handler(
-        self, callback: Callable[[TaskStatus | None], CoroutineType[Any, Any, None]]
+        self,
+        callback: Callable[
+            [
+                str | None,
+                int | None,
+                int | None,
+                str | None,
+                float | None,
+                float | None,
+            ],
+            CoroutineType[Any, Any, None],
+        ],
     ) -> None:
         self.__list_handler = callback
 
@@ -60,12 +106,63 @@ class CLIInput(IInput):
         subparser.add_argument(
             "status", choices=["done", "todo", "in-progress"], nargs="?", default=None
         )
-        subparser.set_defaults(func=lambda status, **kwargs: self._list_tasks(status))
+        subparser.add_argument(
+            "--limit", type=int, default=None, help="Show at most this many tasks."
+        )
+        subparser.add_argument(
+            "--after", type=int, default=None, help="Start after this task id."
+        )
+        subparser.add_argument(
+            "--sort",
+            choices=["created", "updated"],
+            default=None,
+            help="Order by creation or update time instead of id.",
+        )
+        subparser.add_argument(
+            "--since",
+            default=None,
+            help=(
+                "Only tasks created (with --sort created) or updated at or after this time: "
+                "a duration ago (30m, 1h, 2d, 1w), an ISO date and time or a Unix timestamp."
+            ),
+        )
+        subparser.add_argument(
+            "--until", default=None, help="Only tasks before this time, as --since."
+        )
+        subparser.set_defaults(
+            func=lambda status, after, limit, sort, since, until, **kwargs: self._list_tasks(
+                status, after, limit, sort, since, until
+            )
+        )
 
-    async def _list_tasks(self, status: str | None = None):
+    async def _list_tasks(
+        self,
+        status: str | None = None,
+        after: int | None = None,
+        limit: int | None = None,
+        sort: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+    ):
         parsed_status = self._parse_task_status(status)
 
-        handler_task = asyncio.create_task(self.__list_handler(parsed_status))
+        try:
+            if after is not None and (sort or since or until):
+                raise ValueError(
+                    "--after pages in id order, use --since with --sort instead."
+                )
+            since_time = self._parse_time(since)
+            until_time = self._parse_time(until)
+        except ValueError as e:
+            output_task = asyncio.create_task(self.__error_handler(str(e)))
+            await output_task
+            return
+
+        handler_task = asyncio.create_task(
+            self.__list_handler(
+                parsed_status, after, limit, sort, since_time, until_time
+            )
+        )
         await handler_task
 
     def set_update_handler(
@@ -151,6 +248,227 @@ class CLIInput(IInput):
             handler_task = asyncio.create_task(self.__delete_handler(idx))
             await handler_task
 
+    def set_search_handler(
+        self, callback: Callable[[str], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__search_handler = callback
+
+    def __setup_search_command(self) -> None:
+        subparser = self.subparsers.add_parser(
+            "search", help="Find tasks with all of the words in their description."
+        )
+        subparser.add_argument("terms", nargs="+")
+        subparser.set_defaults(
+            func=lambda terms, **kwargs: self.__search_handler(" ".join(terms))
+        )
+
+    def set_import_handler(
+        self, callback: Callable[[TextIO, str], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__import_handler = callback
+
+    def __setup_import_command(self) -> None:
+        subparser = self.subparsers.add_parser(
+            "import",
+            help="Add tasks from an NDJSON or CSV file.",
+            description=(
+                "Needs a description per task, status and times are optional. "
+                "Imported tasks get new ids."
+            ),
+        )
+        subparser.add_argument(
+            "file", nargs="?", default="-", help="Read from this file instead of stdin."
+        )
+        subparser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Default: csv for .csv files, else ndjson.",
+        )
+        subparser.set_defaults(
+            func=lambda file, format, **kwargs: self._import_tasks(file, format)
+        )
+
+    async def _import_tasks(self, file: str, format: str | None):
+        f = sys.stdin if file == "-" else open(file, "r", encoding="utf-8", newline="")
+        try:
+            handler_task = asyncio.create_task(
+                self.__import_handler(f, format or detect_format(file))
+            )
+            await handler_task
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+    def set_export_handler(
+        self,
+        callback: Callable[[TextIO, str, str | None], CoroutineType[Any, Any, None]],
+    ) -> None:
+        self.__export_handler = callback
+
+    def __setup_export_command(self) -> None:
+        subparser = self.subparsers.add_parser(
+            "export", help="Write the tasks as NDJSON or CSV."
+        )
+        subparser.add_argument(
+            "file", nargs="?", default="-", help="Write to this file instead of stdout."
+        )
+        subparser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Default: csv for .csv files, else ndjson.",
+        )
+        subparser.add_argument(
+            "--status",
+            choices=["done", "todo", "in-progress"],
+            default=None,
+            help="Only tasks with this status.",
+        )
+        subparser.set_defaults(
+            func=lambda file, format, status, **kwargs: self._export_tasks(
+                file, format, status
+            )
+        )
+
+    async def _export_tasks(self, file: str, format: str | None, status: str | None):
+        parsed_status = self._parse_task_status(status)
+        f = sys.stdout if file == "-" else open(file, "w", encoding="utf-8", newline="")
+        try:
+            handler_task = asyncio.create_task(
+                self.__export_handler(f, format or detect_format(file), parsed_status)
+            )
+            await handler_task
+            f.flush()
+        except BrokenPipeError:
+            # As in CLIOutput.tasks_stream, e.g. `task-cli export | head`.
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        finally:
+            if f is not sys.stdout:
+                f.close()
+
+    def set_select_list_handler(
+        self, callback: Callable[[str | None], CoroutineType[Any, Any, bool]]
+    ) -> None:
+        self.__select_list_handler = callback
+
+    def set_lists_handler(
+        self, callback: Callable[[bool], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__lists_handler = callback
+
+    def __setup_lists_command(self) -> None:
+        subparser = self.subparsers.add_parser(
+            "lists", help="Show the task lists with their number of tasks."
+        )
+        subparser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Count the tasks of every list again instead of reading the catalog.",
+        )
+        subparser.set_defaults(
+            func=lambda recount, **kwargs: self.__lists_handler(recount)
+        )
+
+    def set_begin_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__begin_handler = callback
+
+    def set_commit_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__commit_handler = callback
+
+    def __setup_batch_command(self) -> None:
+        subparser = self.subparsers.add_parser(
+            "batch",
+            help="Run commands from a file or stdin, one per line.",
+            description=(
+                'Each line is a command as typed after task-cli (e.g. add "Buy milk") '
+                "or a JSON list of arguments. Empty lines and lines starting with # are skipped."
+            ),
+        )
+        subparser.add_argument(
+            "file", nargs="?", default="-", help="Read from this file instead of stdin."
+        )
+        subparser.add_argument(
+            "--commit-every",
+            type=int,
+            default=None,
+            help="Write changes after every N commands, not only at the end.",
+        )
+        subparser.set_defaults(
+            func=lambda file, commit_every, **kwargs: self._run_batch(
+                file, commit_every
+            )
+        )
+
+    def _parse_batch_line(self, line: str) -> list[str]:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return []
+        if line.startswith("["):
+            argv = json.loads(line)
+            if not isinstance(argv, list):
+                raise ValueError("Expected a list of arguments.")
+            return [str(arg) for arg in argv]
+        return shlex.split(line)
+
+    async def _run_command(self, number: int, line: str) -> bool:
+        try:
+            argv = self._parse_batch_line(line)
+            if argv[:1] == ["batch"]:
+                raise ValueError("Batches can't be nested.")
+            with phase("parse arguments"):
+                args = self.parser.parse_args(argv) if argv else None
+        except (ValueError, SystemExit) as e:
+            # argparse has already printed why it exits.
+            message = f": {e}" if isinstance(e, ValueError) else ""
+            output_task = asyncio.create_task(
+                self.__error_handler(f"Line {number} skipped{message}")
+            )
+            await output_task
+            return False
+
+        if not args or "func" not in args:
+            return False
+
+        select_task = asyncio.create_task(
+            self.__select_list_handler(args.list_name or self.list_name)
+        )
+        if not await select_task:
+            return False
+
+        command_task = asyncio.create_task(args.func(**args.__dict__))
+        await command_task
+        return True
+
+    async def _run_batch(self, file: str, commit_every: int | None):
+        lines = sys.stdin if file == "-" else open(file, "r", encoding="utf-8")
+        commands = 0
+
+        begin_task = asyncio.create_task(self.__begin_handler())
+        await begin_task
+        try:
+            for number, line in enumerate(lines, start=1):
+                command_task = asyncio.create_task(self._run_command(number, line))
+                if not await command_task:
+                    continue
+
+                commands += 1
+                if commit_every and commands % commit_every == 0:
+                    commit_task = asyncio.create_task(self.__commit_handler())
+                    await commit_task
+                    begin_task = asyncio.create_task(self.__begin_handler())
+                    await begin_task
+        finally:
+            commit_task = asyncio.create_task(self.__commit_handler())
+            await commit_task
+            if lines is not sys.stdin:
+                lines.close()
+
     def set_error_handler(
         self, callback: Callable[[str], CoroutineType[Any, Any, None]]
     ) -> None:
@@ -162,19 +480,42 @@ class CLIInput(IInput):
             description="A simple TODO list.",
         )
 
+        self.parser.add_argument(
+            "--list",
+            dest="list_name",
+            metavar="NAME",
+            default=None,
+            help="Task list to work on, created on first use. The default list when missing.",
+        )
+
         self.subparsers = self.parser.add_subparsers(help="Task actions.")
 
         self.__setup_add_command()
+        self.__setup_batch_command()
         self.__setup_delete_command()
+        self.__setup_export_command()
+        self.__setup_import_command()
         self.__setup_list_command()
+        self.__setup_lists_command()
         self.__setup_mark_done_command()
         self.__setup_mark_in_progress_command()
         self.__setup_mark_todo_command()
+        self.__setup_search_command()
         self.__setup_update_command()
 
-    async def start(self):
-        args = self.parser.parse_args()
-        if "func" in args:
-            await args.func(**args.__dict__)
-        else:
+    async def run(self, argv: list[str]) -> None:
+        with phase("parse arguments"):
+            args = self.parser.parse_args(argv)
+        if "func" not in args:
             self.parser.print_help()
+            return
+
+        self.list_name = args.list_name
+        # Also when missing, the daemon keeps the list of the previous command.
+        select_task = asyncio.create_task(self.__select_list_handler(args.list_name))
+        if await select_task:
+            await args.func(**args.__dict__)
+
+    async def start(self):
+        run_task = asyncio.create_task(self.run(sys.argv[1:]))
+        await run_task
@@ -1,8 +1,6 @@
 from abc import ABC
 from types import CoroutineType
-from typing import Any, Callable
-
-from ..models.task import TaskStatus
+from typing import Any, Callable, TextIO
 
 
 class IInput(ABC):
@@ -11,7 +9,18 @@ class IInput(ABC):
     ) -> None: ...
 
     def set_list_handler(
-        self, callback: Callable[[TaskStatus | None], CoroutineType[Any, Any, None]]
+        self,
+        callback: Callable[
+            [
+                str | None,
+                int | None,
+                int | None,
+                str | None,
+                float | None,
+                float | None,
+            ],
+            CoroutineType[Any, Any, None],
+        ],
     ) -> None: ...
 
     def set_update_handler(
@@ -26,6 +35,39 @@ class IInput(ABC):
         self, callback: Callable[[int], CoroutineType[Any, Any, None]]
     ) -> None: ...
 
+    def set_search_handler(
+        self, callback: Callable[[str], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
+    def set_import_handler(
+        self, callback: Callable[[TextIO, str], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
+    def set_export_handler(
+        self,
+        callback: Callable[[TextIO, str, str | None], CoroutineType[Any, Any, None]],
+    ) -> None: ...
+
+    def set_refresh_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
+    def set_select_list_handler(
+        self, callback: Callable[[str | None], CoroutineType[Any, Any, bool]]
+    ) -> None: ...
+
+    def set_lists_handler(
+        self, callback: Callable[[bool], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
+    def set_begin_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
+    def set_commit_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None: ...
+
     def set_error_handler(
         self, callback: Callable[[str], CoroutineType[Any, Any, None]]
     ) -> None: ...
@@ -1,24 +1,34 @@
 from dataclasses import dataclass
 from enum import Enum
+import sys
 
 
 class TaskNotFound(Exception):
     """Task index out of bound."""
 
 
+class TaskConflict(Exception):
+    """Task was changed by someone else after it was read."""
+
+
 class TaskStatus(Enum):
     done = "done"
     in_progress = "in-progress"
     planned = "todo"
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseTask:
     description: str
     status: str
     createdAt: float
     updatedAt: float
 
-@dataclass
+    def __post_init__(self):
+        # Statuses decoded from storage are separate copies of a few strings.
+        self.status = sys.intern(self.status)
+
+
+@dataclass(slots=True)
 class Task(BaseTask):
     id: int
@@ -1,4 +1,8 @@
 import asyncio
+import os
+import sys
+from typing import AsyncIterator
+
 from .ioutput import IOutput
 from ..models.task import TaskStatus, Task
 
@@ -15,15 +19,48 @@ class CLIOutput(IOutput):
             case _:
                 return "Unknown status"
 
+    def _format_task(self, idx: int, task: Task) -> str:
+        return f"{idx} - {self._format_task_status(task.status)} - {task.description}"
+
     async def tasks_list(self, tasks_list: list[tuple[int, Task]]):
-        print(
-            "\n".join(
-                [
-                    f"{idx} - {self._format_task_status(task.status)} - {task.description}"
-                    for idx, task in tasks_list
+        print("\n".join([self._format_task(idx, task) for idx, task in tasks_list]))
+
+    async def tasks_stream(self, tasks: AsyncIterator[tuple[int, Task]]):
+        # In the daemon stdout goes to a client, which may read slower than
+        # tasks are listed.
+        drain = getattr(sys.stdout, "drain", None)
+        try:
+            async for idx, task in tasks:
+                print(self._format_task(idx, task))
+                if drain:
+                    await drain()
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader is gone, e.g. `task-cli list | head`. Point stdout at
+            # devnull so the flush at exit doesn't fail again.
+            if sys.stdout is sys.__stdout__:
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+
+    async def tasks_imported(self, count: int):
+        print(f"Tasks imported successfully ({count} tasks)")
+
+    async def tasks_exported(self, count: int):
+        # stdout may be the export itself.
+        print(f"Tasks exported successfully ({count} tasks)", file=sys.stderr)
+
+    async def task_lists(self, counts: dict[str, dict[str, int]], current: str | None):
+        for name, statuses in counts.items():
+            details = ", ".join(
+                f"{self._format_task_status(status.value)} {statuses.get(status.value, 0)}"
+                for status in [
+                    TaskStatus.planned,
+                    TaskStatus.in_progress,
+                    TaskStatus.done,
                 ]
             )
-        )
+            marker = "*" if name == current else " "
+            print(f"{marker} {name} - {sum(statuses.values())} tasks ({details})")
 
     async def task_added_success(self, id: int, task: Task):
         print(f"Task added successfully (ID: {id})")
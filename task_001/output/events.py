@@ -0,0 +1,174 @@
+"""
+Events published by the task list buttons.
+
+Events wait in the EventBus until its subscribers are free. Events for the
+same task and of the same type are merged while they wait, so only the last
+one is handled (several status clicks save one status), and a delete drops
+the waiting changes of its task. Everything that piled up while the previous
+batch was handled is given to the subscribers as the next batch. A batch that
+fails is reported to `on_error` and the next one is handled as usual.
+"""
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+import statistics
+import time
+from typing import Awaitable, Callable
+
+from .. import profiling
+from ..models.task import Task
+
+
+class EventType(Enum):
+    delete = 1
+    update = 2
+    status = 3
+
+
+@dataclass
+class TaskWidgetEvent:
+    id: int
+    event: EventType
+    task: Task | None = None
+
+
+class IPubSubSubscriber(ABC):
+    @abstractmethod
+    async def notify(self, events: list[TaskWidgetEvent]): ...
+
+
+class EventBus:
+    def __init__(
+        self,
+        max_size: int = 256,
+        latency_samples: int = 1000,
+        on_error: Callable[[Exception], Awaitable[None]] | None = None,
+    ):
+        self.subscribers: list[IPubSubSubscriber] = []
+        # Without it failures go to the event loop's exception handler.
+        self.on_error = on_error
+        # Publishers wait while this many events are waiting.
+        self.max_size = max_size
+        # (task id, event type) -> event and when the first of the merged events was published
+        self.pending: dict[tuple[int, EventType], tuple[TaskWidgetEvent, float]] = {}
+        self.changed = asyncio.Condition()
+
+        self.published = 0
+        self.coalesced = 0
+        self.handled = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.max_depth = 0
+        # A batch is being handled.
+        self.running = False
+        # Seconds from publishing to the end of the batch, of the last events
+        self.latencies: deque[float] = deque(maxlen=latency_samples)
+
+    async def publish(self, event: TaskWidgetEvent) -> None:
+        async with self.changed:
+            self.published += 1
+            key = (event.id, event.event)
+            if (event.id, EventType.delete) in self.pending:
+                # The task is deleted anyway.
+                self.coalesced += 1
+                return
+
+            if key not in self.pending:
+                await self.changed.wait_for(lambda: len(self.pending) < self.max_size)
+
+            if event.event is EventType.delete:
+                for superseded in [
+                    (event.id, EventType.update),
+                    (event.id, EventType.status),
+                ]:
+                    if superseded in self.pending:
+                        del self.pending[superseded]
+                        self.coalesced += 1
+
+            if key in self.pending:
+                self.coalesced += 1
+                published_at = self.pending.pop(key)[1]
+            else:
+                published_at = time.perf_counter()
+            self.pending[key] = (event, published_at)
+
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.changed.notify_all()
+
+    async def run(self) -> None:
+        """Hand waiting events to the subscribers until cancelled."""
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: bool(self.pending))
+                batch = list(self.pending.values())
+                self.pending = {}
+                self.running = True
+                self.changed.notify_all()
+
+            events = [event for event, _ in batch]
+            try:
+                notify_task = asyncio.create_task(self._notify(events))
+                await notify_task
+            except Exception as exc:
+                self.failed_batches += 1
+                report_task = asyncio.create_task(self._report(exc))
+                await report_task
+            finally:
+                async with self.changed:
+                    self.running = False
+                    self.changed.notify_all()
+
+            finished = time.perf_counter()
+            self.batches += 1
+            self.handled += len(batch)
+            for _, published_at in batch:
+                self.latencies.append(finished - published_at)
+                if profiling.active:
+                    profiling.active.record("events.latency", finished - published_at)
+
+    async def join(self) -> None:
+        """Wait until every published event is handled."""
+        async with self.changed:
+            await self.changed.wait_for(lambda: not self.pending and not self.running)
+
+    async def _notify(self, events: list[TaskWidgetEvent]) -> None:
+        with profiling.phase("events.batch"):
+            await asyncio.gather(
+                *[subscriber.notify(events) for subscriber in self.subscribers]
+            )
+
+    async def _report(self, exc: Exception) -> None:
+        if not self.on_error:
+            asyncio.get_running_loop().call_exception_handler(
+                {"message": "Handling an event batch failed", "exception": exc}
+            )
+            return
+
+        try:
+            error_task = asyncio.create_task(self.on_error(exc))
+            await error_task
+        except Exception as error_exc:
+            asyncio.get_running_loop().call_exception_handler(
+                {
+                    "message": "Reporting a failed event batch failed",
+                    "exception": error_exc,
+                }
+            )
+
+    def metrics(self) -> dict[str, float]:
+        latencies = sorted(self.latencies)
+        return {
+            "depth": len(self.pending),
+            "max_depth": self.max_depth,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "handled": self.handled,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": self.handled / self.batches if self.batches else 0,
+            "p50_latency_ms": statistics.median(latencies) * 1000 if latencies else 0,
+            "max_latency_ms": latencies[-1] * 1000 if latencies else 0,
+        }
@@ -1,11 +1,32 @@
 from abc import ABC, abstractmethod
+import asyncio
+from typing import AsyncIterator
+
 from ..models.task import Task
+from ..storage.istorage import TaskChanges
 
 
 class IOutput(ABC):
     @abstractmethod
     async def tasks_list(self, tasks_list: list[tuple[int, Task]]): ...
 
+    async def tasks_stream(self, tasks: AsyncIterator[tuple[int, Task]]):
+        tasks_list = [task async for task in tasks]
+        output_task = asyncio.create_task(self.tasks_list(tasks_list))
+        await output_task
+
+    async def tasks_changed(self, changes: TaskChanges):
+        """Tasks changed by someone else, e.g. another task-cli process."""
+
+    async def tasks_imported(self, count: int):
+        """Number of tasks added by an import."""
+
+    async def tasks_exported(self, count: int):
+        """Number of tasks written by an export."""
+
+    async def task_lists(self, counts: dict[str, dict[str, int]], current: str | None):
+        """Names of the task lists with their number of tasks per status."""
+
     @abstractmethod
     async def task_added_success(self, id: int, task: Task): ...
 
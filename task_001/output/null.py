@@ -0,0 +1,42 @@
+from typing import AsyncIterator
+
+from .ioutput import IOutput
+from ..models.task import Task
+
+
+class NullOutput(IOutput):
+    """Discards everything. Listings are still read to the end."""
+
+    async def tasks_list(self, tasks_list: list[tuple[int, Task]]):
+        pass
+
+    async def tasks_stream(self, tasks: AsyncIterator[tuple[int, Task]]):
+        async for _ in tasks:
+            pass
+
+    async def task_added_success(self, id: int, task: Task):
+        pass
+
+    async def task_updated_success(self, id: int, task: Task):
+        pass
+
+    async def task_status_updated_success(self, id: int, task: Task):
+        pass
+
+    async def task_deleted_success(self, id: int):
+        pass
+
+    async def error(self, text: str):
+        pass
+
+    async def error_task_status_not_found(self, key: str):
+        pass
+
+    async def error_index_type(self, index: str):
+        pass
+
+    async def error_storage_type(self, storage_type: str):
+        pass
+
+    async def error_task_not_found(self, index: int):
+        pass
@@ -1,146 +1,401 @@
-from abc import ABC, abstractmethod
 import asyncio
-from dataclasses import dataclass
-from enum import Enum
+from bisect import bisect_left
+from dataclasses import replace
 import sys
 from types import CoroutineType
 from typing import Any, Callable
-from PyQt6.QtWidgets import QLabel, QApplication, QScrollArea, QSizePolicy, QHBoxLayout, QVBoxLayout, QWidget, QPushButton, QComboBox, QMessageBox, QInputDialog
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QSizePolicy,
+    QHBoxLayout,
+    QVBoxLayout,
+    QWidget,
+    QPushButton,
+    QComboBox,
+    QMessageBox,
+    QInputDialog,
+    QListView,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+    QStyleOptionViewItem,
+)
+from PyQt6.QtCore import (
+    QAbstractItemModel,
+    QAbstractListModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QRect,
+    QSize,
+    Qt,
+    QTimer,
+)
+from PyQt6.QtGui import QMouseEvent, QPainter, QPalette
 from ..input.iinput import IInput
 
+from .events import EventBus, EventType, IPubSubSubscriber, TaskWidgetEvent
 from .ioutput import IOutput
 
 from ..models.task import Task, TaskStatus
-
-class EventType(Enum):
-    delete = 1
-    update = 2
-    status = 3
-
-@dataclass
-class TaskWidgetEvent:
-    id: int
-    event: EventType
-    task: Task | None = None
-
-class IPubSubSubscriber(ABC):
-    @abstractmethod
-    async def notify(self, event: TaskWidgetEvent): ...
-
-class PubSub:
-    subscribers: list[IPubSubSubscriber] = []
-
-    @classmethod
-    async def notify(cls, event: TaskWidgetEvent):
-        await asyncio.gather(*[subscriber.notify(event) for subscriber in cls.subscribers])
-
-class TaskWidget(QWidget):
-    def __init__(self, task: Task, parent: QWidget | None = None, flags: Qt.WindowType = Qt.WindowType.Widget):
-        super().__init__(parent, flags)
-
-        self.task = task
-        self.draw()
-
-    async def _delete_task_clicked(self):
-        response = QMessageBox.question(None, "The task will be deleted.", "Do you want to proceed?", QMessageBox.StandardButton.Yes, QMessageBox.StandardButton.No)
+from ..storage.istorage import TaskChanges
+
+
+class TaskListModel(QAbstractListModel):
+    """Tasks shown in the list, one row per task.
+
+    Ids are kept sorted for every status, so showing one status only swaps
+    the list the rows come from.
+    """
+
+    TaskRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+
+        self.tasks: dict[int, Task] = {}
+        self.ids: list[int] = []
+        # status -> sorted ids of the tasks in that status
+        self.status_ids: dict[str, list[int]] = {}
+        # id -> status the task is filed under in status_ids. Tasks are
+        # changed in place before the update arrives, so it can't be read
+        # back from the task itself.
+        self.indexed_status: dict[int, str] = {}
+        self.status_filter: str | None = None
+        # ids of the rows shown, one of the lists above
+        self.visible: list[int] = self.ids
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.visible)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        task = self.tasks[self.visible[index.row()]]
+        match role:
+            case Qt.ItemDataRole.DisplayRole:
+                return format_task(task)
+            case TaskListModel.TaskRole:
+                return task
+
+    def get(self, idx: int) -> Task | None:
+        return self.tasks.get(idx)
+
+    def _status_list(self, status: str) -> list[int]:
+        return self.status_ids.setdefault(status, [])
+
+    def _insert(self, ids: list[int], idx: int) -> None:
+        row = bisect_left(ids, idx)
+        shown = ids is self.visible
+        if shown:
+            self.beginInsertRows(QModelIndex(), row, row)
+        ids.insert(row, idx)
+        if shown:
+            self.endInsertRows()
+
+    def _remove(self, ids: list[int], idx: int) -> None:
+        row = bisect_left(ids, idx)
+        if row == len(ids) or ids[row] != idx:
+            return
+
+        shown = ids is self.visible
+        if shown:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del ids[row]
+        if shown:
+            self.endRemoveRows()
+
+    def set_filter(self, status: str | None) -> None:
+        self.beginResetModel()
+        self.status_filter = status
+        self.visible = self._status_list(status) if status else self.ids
+        self.endResetModel()
+
+    def set_tasks(self, tasks: list[Task]) -> None:
+        self.beginResetModel()
+        self.tasks = {task.id: task for task in tasks}
+        self.ids.clear()
+        self.ids.extend(sorted(self.tasks))
+        for ids in self.status_ids.values():
+            ids.clear()
+        self.indexed_status = {}
+        for idx in self.ids:
+            status = self.tasks[idx].status
+            self._status_list(status).append(idx)
+            self.indexed_status[idx] = status
+        self.endResetModel()
+
+    def add(self, task: Task) -> None:
+        if task.id in self.tasks:
+            # Already shown, e.g. added here and then reported by a refresh.
+            self.update(task)
+            return
+
+        self.tasks[task.id] = task
+        self.indexed_status[task.id] = task.status
+        self._insert(self.ids, task.id)
+        self._insert(self._status_list(task.status), task.id)
+
+    def update(self, task: Task) -> None:
+        if task.id not in self.tasks:
+            return
+
+        self.tasks[task.id] = task
+        status = self.indexed_status[task.id]
+        if status != task.status:
+            self.indexed_status[task.id] = task.status
+            self._remove(self._status_list(status), task.id)
+            self._insert(self._status_list(task.status), task.id)
+
+        row = bisect_left(self.visible, task.id)
+        if row < len(self.visible) and self.visible[row] == task.id:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def remove(self, idx: int) -> None:
+        if self.tasks.pop(idx, None) is None:
+            return
+
+        self._remove(self.ids, idx)
+        self._remove(self._status_list(self.indexed_status.pop(idx)), idx)
+
+
+def format_task(task: Task) -> str:
+    return f"{task.status}: {task.description}"
+
+
+class TaskDelegate(QStyledItemDelegate):
+    """Paints a task with its buttons. No widgets are created per task.
+
+    Rows have a fixed height, so the view only lays out and paints the
+    visible ones.
+    """
+
+    BUTTONS = ["Edit", "In progress", "Done", "Delete"]
+    BUTTONS_WIDTH = 140
+    BUTTON_HEIGHT = 26
+    PADDING = 8
+    ROW_HEIGHT = 2 * PADDING + len(BUTTONS) * BUTTON_HEIGHT
+
+    def __init__(
+        self,
+        publish: Callable[[TaskWidgetEvent], CoroutineType[Any, Any, None]],
+        parent: QObject | None = None,
+    ):
+        super().__init__(parent)
+        self.publish = publish
+
+        # (row, button) held down by the mouse
+        self._pressed: tuple[int, str] | None = None
+
+    def _button_rects(self, rect: QRect) -> list[tuple[str, QRect]]:
+        left = rect.right() - self.BUTTONS_WIDTH + self.PADDING
+        width = self.BUTTONS_WIDTH - 2 * self.PADDING
+        return [
+            (
+                button,
+                QRect(
+                    left,
+                    rect.top() + self.PADDING + i * self.BUTTON_HEIGHT,
+                    width,
+                    self.BUTTON_HEIGHT,
+                ),
+            )
+            for i, button in enumerate(self.BUTTONS)
+        ]
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(
+        self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex
+    ) -> None:
+        style = option.widget.style() if option.widget else QApplication.style()
+
+        background = QStyleOptionViewItem(option)
+        self.initStyleOption(background, index)
+        background.text = ""
+        style.drawControl(
+            QStyle.ControlElement.CE_ItemViewItem, background, painter, option.widget
+        )
+
+        painter.save()
+        text_rect = option.rect.adjusted(
+            self.PADDING, self.PADDING, -self.BUTTONS_WIDTH, -self.PADDING
+        )
+        painter.setPen(option.palette.color(QPalette.ColorRole.Text))
+        painter.drawText(
+            text_rect,
+            (Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop).value
+            | Qt.TextFlag.TextWordWrap.value,
+            index.data(Qt.ItemDataRole.DisplayRole),
+        )
+        painter.setPen(option.palette.color(QPalette.ColorRole.Mid))
+        painter.drawLine(option.rect.bottomLeft(), option.rect.bottomRight())
+        painter.restore()
+
+        for button, rect in self._button_rects(option.rect):
+            button_option = QStyleOptionButton()
+            button_option.rect = rect
+            button_option.text = button
+            button_option.state = QStyle.StateFlag.State_Enabled | (
+                QStyle.StateFlag.State_Sunken
+                if self._pressed == (index.row(), button)
+                else QStyle.StateFlag.State_Raised
+            )
+            style.drawControl(
+                QStyle.ControlElement.CE_PushButton,
+                button_option,
+                painter,
+                option.widget,
+            )
+
+    def _button_at(
+        self, event: QMouseEvent, option: QStyleOptionViewItem
+    ) -> str | None:
+        position = event.position().toPoint()
+        for button, rect in self._button_rects(option.rect):
+            if rect.contains(position):
+                return button
+        return None
+
+    def editorEvent(
+        self,
+        event: QEvent,
+        model: QAbstractItemModel,
+        option: QStyleOptionViewItem,
+        index: QModelIndex,
+    ) -> bool:
+        if (
+            not isinstance(event, QMouseEvent)
+            or event.button() != Qt.MouseButton.LeftButton
+        ):
+            return False
+
+        button = self._button_at(event, option)
+        match event.type():
+            case QEvent.Type.MouseButtonPress:
+                self._pressed = (index.row(), button) if button else None
+            case QEvent.Type.MouseButtonRelease:
+                clicked = button and self._pressed == (index.row(), button)
+                self._pressed = None
+                if clicked:
+                    task = index.data(TaskListModel.TaskRole)
+                    asyncio.create_task(self._button_clicked(button, task))
+            case _:
+                return False
+
+        # Repaint the row for the pressed look.
+        model.dataChanged.emit(index, index)
+        return button is not None
+
+    async def _button_clicked(self, button: str, task: Task):
+        match button:
+            case "Edit":
+                await self._update_task_clicked(task)
+            case "In progress":
+                await self._change_status_clicked(task, TaskStatus.in_progress.value)
+            case "Done":
+                await self._change_status_clicked(task, TaskStatus.done.value)
+            case "Delete":
+                await self._delete_task_clicked(task)
+
+    async def _delete_task_clicked(self, task: Task):
+        response = QMessageBox.question(
+            None,
+            "The task will be deleted.",
+            "Do you want to proceed?",
+            QMessageBox.StandardButton.Yes,
+            QMessageBox.StandardButton.No,
+        )
 
         if response == QMessageBox.StandardButton.Yes:
-            notify_task = asyncio.create_task(PubSub.notify(TaskWidgetEvent(
-                id=self.task.id,
-                event=EventType.delete
-            )))
-            await notify_task
-
-    async def _update_task_clicked(self):
-        new_description, ok = QInputDialog.getText(None, 'Editing task', 'Task description:', text=self.task.description)
+            publish_task = asyncio.create_task(
+                self.publish(TaskWidgetEvent(id=task.id, event=EventType.delete))
+            )
+            await publish_task
+
+    async def _update_task_clicked(self, task: Task):
+        new_description, ok = QInputDialog.getText(
+            None, "Editing task", "Task description:", text=task.description
+        )
         if ok and new_description:
-            notify_task = asyncio.create_task(PubSub.notify(TaskWidgetEvent(
-                id=self.task.id,
-                event=EventType.update,
-                task=Task(**{**self.task.__dict__, "description": new_description})
-            )))
-            await notify_task
-
-    async def _mark_done_clicked(self):
-        notify_task = asyncio.create_task(PubSub.notify(TaskWidgetEvent(
-            id=self.task.id,
-            event=EventType.status,
-            task=Task(**{**self.task.__dict__, "status": TaskStatus.done.value})
-        )))
-        await notify_task
-
-    async def _mark_in_progress_clicked(self):
-        notify_task = asyncio.create_task(PubSub.notify(TaskWidgetEvent(
-            id=self.task.id,
-            event=EventType.status,
-            task=Task(**{**self.task.__dict__, "status": TaskStatus.in_progress.value})
-        )))
-        await notify_task
-
-    def _format_content(self) -> str:
-        return f"{self.task.status}: {self.task.description}"
-
-    def _draw_content(self):
-        task_content_widget = QWidget()
-        task_content_layout = QVBoxLayout(task_content_widget)
-
-        self.label = QLabel(self._format_content())
-        self.label.setWordWrap(True)
-        task_content_layout.addWidget(self.label)
-        task_content_layout.addStretch()
-        return task_content_widget
-
-    def _draw_buttons(self):
-        task_buttons_widget = QWidget()
-        task_buttons_widget.setFixedWidth(140)
-        task_buttons_layout = QVBoxLayout(task_buttons_widget)
-        task_buttons_layout.setSpacing(0)
-        update_button = QPushButton("Edit")
-        task_buttons_layout.addWidget(update_button)
-        update_button.clicked.connect(lambda: asyncio.create_task(self._update_task_clicked()))
-        in_progress_button = QPushButton("In progress")
-        task_buttons_layout.addWidget(in_progress_button)
-        in_progress_button.clicked.connect(lambda: asyncio.create_task(self._mark_in_progress_clicked()))
-        done_button = QPushButton("Done")
-        task_buttons_layout.addWidget(done_button)
-        done_button.clicked.connect(lambda: asyncio.create_task(self._mark_done_clicked()))
-        delete_button = QPushButton("Delete")
-        task_buttons_layout.addWidget(delete_button)
-        delete_button.clicked.connect(lambda: asyncio.create_task(self._delete_task_clicked()))
-        task_buttons_layout.addStretch()
-        return task_buttons_widget
-       
-    def draw(self):
-        self.task_outer_layout = QHBoxLayout(self)
-        self.task_outer_layout.addWidget(self._draw_content())
-        self.task_outer_layout.addWidget(self._draw_buttons())
-    
-    def remove(self):
-        self.task_outer_layout.removeWidget(self)
-        self.deleteLater()
-    
-    def apply_changes(self, task: Task):
-        self.task = task
-        self.label.setText(self._format_content())
-
- 
+            publish_task = asyncio.create_task(
+                self.publish(
+                    TaskWidgetEvent(
+                        id=task.id,
+                        event=EventType.update,
+                        task=replace(task, description=new_description),
+                    )
+                )
+            )
+            await publish_task
+
+    async def _change_status_clicked(self, task: Task, status: str):
+        publish_task = asyncio.create_task(
+            self.publish(
+                TaskWidgetEvent(
+                    id=task.id,
+                    event=EventType.status,
+                    task=replace(task, status=status),
+                )
+            )
+        )
+        await publish_task
+
 
 class PyQtInputOutput(IOutput, IInput, IPubSubSubscriber):
-    def __init__(self):
-        self.task_mapping: dict[int, TaskWidget] = {}
+    def __init__(self, *, refresh_interval: float = 1.0, event_queue_size: int = 256):
         self.application = QApplication(sys.argv)
+        self.model = TaskListModel()
+        self.bus = EventBus(max_size=event_queue_size, on_error=self._batch_failed)
+        self.bus_task: asyncio.Task | None = None
+        # Checks for changes made by other processes.
+        self.refresh_timer = QTimer()
+        self.refresh_timer.setInterval(int(refresh_interval * 1000))
+        self.refresh_timer.timeout.connect(self._refresh_timeout)
+        self.refreshing: asyncio.Task | None = None
+        # id -> task as stored, for tasks shown with a change that isn't saved yet
+        self.unconfirmed: dict[int, Task] = {}
+        self.list_name: str | None = None
         self.window = self._draw_window()
 
     def _create_task_clicked(self):
-        title, ok = QInputDialog.getText(None, 'Creating new task', 'New task:')
+        title, ok = QInputDialog.getText(None, "Creating new task", "New task:")
         if ok and title:
-            handler_task = asyncio.create_task(self.__add_handler(title))
-
-    def _add_task(self, task: Task, idx: int):
-        widget = TaskWidget(task=task)
-        self.task_mapping[task.id] = widget
-        self.inner_task_list_layout.addWidget(widget)
+            handler_task = asyncio.create_task(self._add_task(title))
+
+    async def _add_task(self, title: str):
+        handler_task = asyncio.create_task(self.__add_handler(title))
+        await handler_task
+        # The count next to the list name.
+        handler_task = asyncio.create_task(self.__lists_handler(False))
+        await handler_task
+
+    def _list_activated(self, index: int):
+        name = self.list_combobox.itemData(index) or self.list_combobox.itemText(index)
+        if name != self.list_name:
+            handler_task = asyncio.create_task(self._open_list(name.strip()))
+
+    async def _open_list(self, name: str):
+        # Queued events and refreshes belong to the list shown now.
+        join_task = asyncio.create_task(self.bus.join())
+        await join_task
+        if self.refreshing and not self.refreshing.done():
+            await self.refreshing
+
+        select_task = asyncio.create_task(self.__select_list_handler(name))
+        if await select_task:
+            self.list_name = name
+            self.unconfirmed.clear()
+            handler_task = asyncio.create_task(self.__list_handler(None))
+            await handler_task
+
+        # Also drops a rejected name typed into the list selector.
+        handler_task = asyncio.create_task(self.__lists_handler(False))
+        await handler_task
 
     def _draw_top_controls(self):
         top_buttons_widget = QWidget()
@@ -152,76 +407,113 @@ class PyQtInputOutput(IOutput, IInput, IPubSubSubscriber):
         create_button.clicked.connect(self._create_task_clicked)
 
         filter_combobox = QComboBox()
-        filter_combobox.addItems(["All", "Planned", "In Progress", "Done"])
+        filters = {
+            "All": None,
+            "Planned": TaskStatus.planned.value,
+            "In Progress": TaskStatus.in_progress.value,
+            "Done": TaskStatus.done.value,
+        }
+        filter_combobox.addItems(list(filters))
+        filter_combobox.currentTextChanged.connect(
+            lambda text: self.model.set_filter(filters[text])
+        )
+
+        # Type a new name to create a list.
+        self.list_combobox = QComboBox()
+        self.list_combobox.setEditable(True)
+        self.list_combobox.setMinimumWidth(180)
+        self.list_combobox.activated.connect(self._list_activated)
 
         top_buttons_layout.setContentsMargins(10, 0, 0, 0)
         top_buttons_layout.setSpacing(0)
         top_buttons_layout.addWidget(create_button)
         top_buttons_layout.addStretch()
+        top_buttons_layout.addWidget(self.list_combobox)
         top_buttons_layout.addWidget(filter_combobox)
 
         return top_buttons_widget
-    
+
     def _draw_window(self):
         window = QWidget()
+        window.setWindowTitle("Task Manager")
+        window.resize(640, 720)
         window_layout = QVBoxLayout(window)
 
-        task_list_area = QWidget(window)
-        task_list_area.setWindowTitle("Task Manager")
-        task_list_area.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Minimum)
-
-        self.task_list_layout = QVBoxLayout(task_list_area)
-        self.task_list_layout.setContentsMargins(0, 0, 0, 0)
-        self.task_list_layout.setSpacing(0)
-
-        inner_task_list_area = QWidget(window)
-        inner_task_list_area.setWindowTitle("Task Manager")
-        inner_task_list_area.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Minimum)
-
-        self.inner_task_list_layout = QVBoxLayout(inner_task_list_area)
-        self.inner_task_list_layout.setContentsMargins(0, 0, 0, 0)
-        self.inner_task_list_layout.setSpacing(0)
-
-        self.task_list_layout.addWidget(inner_task_list_area)
-        self.task_list_layout.addStretch()
-
-        task_list_scroll_area = QScrollArea()
-        task_list_scroll_area.setWidgetResizable(True)
-        task_list_scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        task_list_scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-
-        task_list_scroll_area.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        task_list_scroll_area.setWidget(task_list_area)
+        self.task_list_view = QListView()
+        self.task_list_view.setModel(self.model)
+        self.task_list_view.setItemDelegate(
+            TaskDelegate(self._publish, self.task_list_view)
+        )
+        self.task_list_view.setUniformItemSizes(True)
+        self.task_list_view.setSelectionMode(
+            QAbstractItemView.SelectionMode.NoSelection
+        )
+        self.task_list_view.setVerticalScrollMode(
+            QAbstractItemView.ScrollMode.ScrollPerPixel
+        )
+        self.task_list_view.setHorizontalScrollBarPolicy(
+            Qt.ScrollBarPolicy.ScrollBarAlwaysOff
+        )
+        self.task_list_view.setVerticalScrollBarPolicy(
+            Qt.ScrollBarPolicy.ScrollBarAlwaysOn
+        )
+        self.task_list_view.setSizePolicy(
+            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
+        )
 
         top_buttons_widget = self._draw_top_controls()
 
         window_layout.setContentsMargins(0, 0, 0, 0)
         window_layout.setSpacing(0)
         window_layout.addWidget(top_buttons_widget)
-        window_layout.addWidget(task_list_scroll_area)
+        window_layout.addWidget(self.task_list_view)
 
         return window
 
     # output
     async def tasks_list(self, tasks_list: list[tuple[int, Task]]):
-        [self._add_task(idx=task[1].id, task=task[1]) for task in tasks_list]
+        self.model.set_tasks([task for _, task in tasks_list])
 
     async def task_added_success(self, id: int, task: Task):
-        self._add_task(idx=task.id, task=task)
+        self.model.add(task)
 
     async def task_status_updated_success(self, id: int, task: Task):
-        self.task_mapping[task.id].apply_changes(task)
+        self._confirm(task)
 
     async def task_updated_success(self, id: int, task: Task):
-        self.task_mapping[task.id].apply_changes(task)
+        self._confirm(task)
 
     async def task_deleted_success(self, id: int):
-        self.task_mapping[id].remove()
+        self.unconfirmed.pop(id, None)
+        self.model.remove(id)
+
+    async def tasks_changed(self, changes: TaskChanges):
+        for task in changes.added:
+            self.model.add(task)
+        for task in changes.updated:
+            if task.id in self.unconfirmed:
+                # Shown with our own change, which is restored if it fails.
+                self.unconfirmed[task.id] = task
+            else:
+                self.model.update(task)
+        for idx in changes.deleted:
+            self.unconfirmed.pop(idx, None)
+            self.model.remove(idx)
+
+    async def task_lists(self, counts: dict[str, dict[str, int]], current: str | None):
+        self.list_name = current
+        self.list_combobox.blockSignals(True)
+        self.list_combobox.clear()
+        for name, statuses in counts.items():
+            self.list_combobox.addItem(f"{name} ({sum(statuses.values())})", name)
+        if current in counts:
+            self.list_combobox.setCurrentIndex(list(counts).index(current))
+        self.list_combobox.blockSignals(False)
 
     async def error_task_not_found(self, index: int):
         pass
 
-    async def error_task_status_not_found(self, key: str): 
+    async def error_task_status_not_found(self, key: str):
         pass
 
     async def error_index_type(self, index: str):
@@ -235,20 +527,33 @@ class PyQtInputOutput(IOutput, IInput, IPubSubSubscriber):
 
     # input
     async def start(self):
-        PubSub.subscribers.append(self)
+        self.bus.subscribers.append(self)
+        self.bus_task = asyncio.create_task(self.bus.run())
         await asyncio.create_task(self.__list_handler(None))
+        await asyncio.create_task(self.__lists_handler(False))
         self.window.show()
+        self.refresh_timer.start()
         # sys.exit(self.application.exec())
         pass
 
-
     def set_add_handler(
         self, callback: Callable[[str], CoroutineType[Any, Any, None]]
     ) -> None:
         self.__add_handler = callback
 
     def set_list_handler(
-        self, callback: Callable[[TaskStatus | None], CoroutineType[Any, Any, None]]
+        self,
+        callback: Callable[
+            [
+                str | None,
+                int | None,
+                int | None,
+                str | None,
+                float | None,
+                float | None,
+            ],
+            CoroutineType[Any, Any, None],
+        ],
     ) -> None:
         self.__list_handler = callback
 
@@ -267,28 +572,135 @@ class PyQtInputOutput(IOutput, IInput, IPubSubSubscriber):
     ) -> None:
         self.__delete_handler = callback
 
+    def set_search_handler(
+        self, callback: Callable[[str], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__search_handler = callback
+
+    def set_refresh_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__refresh_handler = callback
+
+    def _refresh_timeout(self):
+        # Polls don't pile up when one takes longer than the interval.
+        if self.refreshing and not self.refreshing.done():
+            return
+        self.refreshing = asyncio.create_task(self.__refresh_handler())
+
+    def set_select_list_handler(
+        self, callback: Callable[[str | None], CoroutineType[Any, Any, bool]]
+    ) -> None:
+        self.__select_list_handler = callback
+
+    def set_lists_handler(
+        self, callback: Callable[[bool], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__lists_handler = callback
+
+    def set_begin_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__begin_handler = callback
+
+    def set_commit_handler(
+        self, callback: Callable[[], CoroutineType[Any, Any, None]]
+    ) -> None:
+        self.__commit_handler = callback
+
     def set_error_handler(
         self, callback: Callable[[str], CoroutineType[Any, Any, None]]
     ) -> None:
         self.__error_handler = callback
 
-    # pubsubsubscriber
-    async def notify(self, event: TaskWidgetEvent):
+    def _waiting(self, idx: int) -> bool:
+        """Whether a change of the task is still in the event queue."""
+        return (idx, EventType.update) in self.bus.pending or (
+            idx,
+            EventType.status,
+        ) in self.bus.pending
+
+    def _confirm(self, task: Task):
+        if self._waiting(task.id):
+            # Keep showing the newer change, this is now the stored version.
+            self.unconfirmed[task.id] = replace(task)
+            return
+        self.unconfirmed.pop(task.id, None)
+        self.model.update(task)
+
+    async def _publish(self, event: TaskWidgetEvent):
+        """Show the changed task right away, before it is saved.
+
+        The success output confirms the change. If the batch with the event
+        ends without confirming it, the stored version is shown again.
+        """
+        shown = self.model.get(event.id)
+        if event.task and shown:
+            # A copy, TaskManager changes the stored task in place.
+            self.unconfirmed.setdefault(event.id, replace(shown))
+            self.model.update(event.task)
+
+        publish_task = asyncio.create_task(self.bus.publish(event))
+        await publish_task
+
+    async def _handle(self, event: TaskWidgetEvent):
         match event.event:
             case EventType.delete:
                 handler_task = asyncio.create_task(self.__delete_handler(event.id))
                 await handler_task
             case EventType.update:
                 if event.task:
-                    handler_task = asyncio.create_task(self.__update_handler(event.id, event.task.description))
+                    handler_task = asyncio.create_task(
+                        self.__update_handler(event.id, event.task.description)
+                    )
                     await handler_task
                 else:
-                    handler_task = asyncio.create_task(self.__error_handler("Update message is missing task information."))
+                    handler_task = asyncio.create_task(
+                        self.__error_handler(
+                            "Update message is missing task information."
+                        )
+                    )
                     await handler_task
             case EventType.status:
                 if event.task:
-                    handler_task = asyncio.create_task(self.__status_handler(event.id, event.task.status))
+                    handler_task = asyncio.create_task(
+                        self.__status_handler(event.id, event.task.status)
+                    )
                     await handler_task
                 else:
-                    handler_task = asyncio.create_task(self.__error_handler("Status message is missing task information."))
+                    handler_task = asyncio.create_task(
+                        self.__error_handler(
+                            "Status message is missing task information."
+                        )
+                    )
                     await handler_task
+
+    async def _batch_failed(self, exc: Exception):
+        # The changes of the batch are shown as stored again by notify.
+        error_task = asyncio.create_task(
+            self.__error_handler(f"Saving changes failed: {exc}")
+        )
+        await error_task
+
+    # pubsubsubscriber
+    async def notify(self, events: list[TaskWidgetEvent]):
+        """Save a batch of events in one storage transaction."""
+        begin_task = asyncio.create_task(self.__begin_handler())
+        await begin_task
+        try:
+            for event in events:
+                handler_task = asyncio.create_task(self._handle(event))
+                await handler_task
+        finally:
+            commit_task = asyncio.create_task(self.__commit_handler())
+            await commit_task
+
+            for event in events:
+                if self._waiting(event.id):
+                    continue
+                stored = self.unconfirmed.pop(event.id, None)
+                if stored and self.model.get(event.id):
+                    self.model.update(stored)
+
+        handler_task = asyncio.create_task(self.__lists_handler(False))
+        await handler_task
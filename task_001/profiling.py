@@ -0,0 +1,143 @@
+"""
+Timing of a task-cli call.
+
+Turned on with `--profile` (or `profile = yes` in config.ini). Storage and
+output calls and the TaskManager handlers are then timed through proxies,
+and steps inside them (argument parsing, JSON decoding, ...) through `phase`.
+Events without a duration (e.g. file reads skipped by the JSON cache) are
+summed up through `count`. While it is off nothing is wrapped, `phase`
+returns a shared no-op context and `count` does nothing.
+
+`--profile-output FILE` additionally writes cProfile stats, readable with
+`python3 -m pstats FILE`.
+"""
+
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from functools import wraps
+import inspect
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, TextIO
+
+
+class Profiler:
+    def __init__(self):
+        # name -> wall time of every call, in seconds
+        self.timings: dict[str, list[float]] = {}
+        # name -> number of times it happened
+        self.counters: dict[str, int] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.timings.setdefault(name, []).append(seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name: str, function: Callable) -> Callable:
+        """Wrap a coroutine or async generator function."""
+        if inspect.isasyncgenfunction(function):
+
+            @wraps(function)
+            async def timed_generator(*args, **kwargs) -> AsyncIterator:
+                generator = function(*args, **kwargs)
+                # Only the time spent inside the generator, not in the consumer.
+                elapsed = 0.0
+                try:
+                    while True:
+                        started = time.perf_counter()
+                        try:
+                            item = await generator.__anext__()
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            elapsed += time.perf_counter() - started
+                        yield item
+                finally:
+                    await generator.aclose()
+                    self.record(name, elapsed)
+
+            return timed_generator
+
+        @wraps(function)
+        async def timed_coroutine(*args, **kwargs) -> Any:
+            with self.phase(name):
+                return await function(*args, **kwargs)
+
+        return timed_coroutine
+
+    def wrap(self, target: Any, label: str) -> Any:
+        return TimedProxy(target, label, self)
+
+    def report(self, file: TextIO = sys.stderr) -> None:
+        rows = sorted(self.timings.items(), key=lambda item: sum(item[1]), reverse=True)
+        width = max([len(name) for name, _ in rows] + [len("operation")])
+
+        print(
+            f"{'operation':<{width}}  {'calls':>6}  {'total ms':>10}  {'mean ms':>10}",
+            file=file,
+        )
+        for name, seconds in rows:
+            total = sum(seconds) * 1000
+            print(
+                f"{name:<{width}}  {len(seconds):>6}  {total:>10.3f}  {total / len(seconds):>10.3f}",
+                file=file,
+            )
+
+        if self.counters:
+            width = max([len(name) for name in self.counters] + [len("counter")])
+            print(f"\n{'counter':<{width}}  {'count':>6}", file=file)
+            for name, amount in sorted(self.counters.items()):
+                print(f"{name:<{width}}  {amount:>6}", file=file)
+
+
+class TimedProxy:
+    """Times the async methods of `target` as `<label>.<method>`.
+
+    Callbacks given to `set_*_handler` are timed as `handler.<name>`.
+    """
+
+    def __init__(self, target: Any, label: str, profiler: Profiler):
+        self._target = target
+        self._label = label
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+
+        if name.startswith("set_") and name.endswith("_handler"):
+            handler = name.removeprefix("set_").removesuffix("_handler")
+            set_handler = value
+
+            def value(callback: Callable) -> None:
+                set_handler(self._profiler.timed(f"handler.{handler}", callback))
+
+        elif inspect.iscoroutinefunction(value) or inspect.isasyncgenfunction(value):
+            value = self._profiler.timed(f"{self._label}.{name}", value)
+        else:
+            return value
+
+        # Wrapped once per method.
+        setattr(self, name, value)
+        return value
+
+
+active: Profiler | None = None
+
+_off = nullcontext()
+
+
+def phase(name: str) -> AbstractContextManager:
+    return active.phase(name) if active else _off
+
+
+def count(name: str, amount: int = 1) -> None:
+    if active:
+        active.count(name, amount)
@@ -0,0 +1,382 @@
+"""
+Memory-mapped binary storage.
+
+uncategorized.tasks:
+    header: magic b"TASKBIN1", counter: uint64
+    records, one per id (record of id N is at header + (N - 1) * record size):
+        id: uint64
+        status: uint8 (0 for deleted or never used ids)
+        createdAt: float64
+        updatedAt: float64
+        description offset: uint64
+        description length: uint32
+
+uncategorized.heap:
+    UTF-8 descriptions, appended one after another. Editing a description
+    appends the new text, the old bytes are left unused.
+    Synced before the record that points at them.
+
+Changes are made under uncategorized.tasks.lock. The mapping is shared, so
+other processes see changed records right away; the counter is read from
+the header before every operation to see added ones.
+
+Convert an existing JSON list (run from the repository root):
+
+python3 -m task_001.storage.binary task_001/data/uncategorized.json
+"""
+
+import argparse
+import asyncio
+import mmap
+import os
+from pathlib import Path
+import struct
+from typing import AsyncIterator, Callable, TypeVar
+
+from .istorage import IStorage
+from .json_stream import TaskStreamReader
+from .locking import FileLock
+from ..models.task import BaseTask, Task, TaskNotFound, TaskStatus
+
+MAGIC = b"TASKBIN1"
+HEADER = struct.Struct("<8sQ")
+RECORD = struct.Struct("<Q B 7x d d Q I 4x")
+# Position of the status byte inside a record.
+STATUS_OFFSET = 8
+# Records are added in batches, so the file is not remapped on every add.
+GROWTH = 1024
+
+status_codes = {
+    TaskStatus.planned.value: 1,
+    TaskStatus.in_progress.value: 2,
+    TaskStatus.done.value: 3,
+}
+statuses = {code: status for status, code in status_codes.items()}
+
+T = TypeVar("T")
+
+
+class BinaryStorage(IStorage):
+    def __init__(self, *, file_location: str = "data/uncategorized.tasks"):
+        self.file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+        )
+        self.heap_path = self.file_path.with_suffix(".heap")
+
+        self.counter = 0
+        # msync every change, turned off while converting and during a batch.
+        self.sync = True
+        self._records_fd: int | None = None
+        self._heap_fd: int | None = None
+        self._map: mmap.mmap | None = None
+        self.lock = FileLock(self.file_path.with_name(f"{self.file_path.name}.lock"))
+        # Batches nest and end with the outermost commit.
+        self._batch_depth = 0
+
+    def _open(self) -> mmap.mmap:
+        if self._map:
+            return self._map
+
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._records_fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._heap_fd = os.open(
+            self.heap_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644
+        )
+
+        if os.fstat(self._records_fd).st_size < HEADER.size:
+            os.ftruncate(self._records_fd, HEADER.size + GROWTH * RECORD.size)
+            os.pwrite(self._records_fd, HEADER.pack(MAGIC, 0), 0)
+
+        self._map = mmap.mmap(self._records_fd, 0)
+        magic, self.counter = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.file_path} is not a task file.")
+        return self._map
+
+    def _refresh(self) -> mmap.mmap:
+        """Take up the tasks other processes added."""
+        mm = self._open()
+        _, counter = HEADER.unpack_from(mm, 0)
+        if counter != self.counter:
+            self.counter = counter
+            if counter > self._capacity():
+                # Grown by another process.
+                self._remap()
+        return self._open()
+
+    def _capacity(self) -> int:
+        return (len(self._open()) - HEADER.size) // RECORD.size
+
+    def _remap(self) -> None:
+        if not self._map or self._records_fd is None:
+            raise RuntimeError("Storage is not open.")
+
+        self._map.close()
+        self._map = mmap.mmap(self._records_fd, 0)
+
+    def _grow(self, capacity: int) -> None:
+        if self._records_fd is None:
+            raise RuntimeError("Storage is not open.")
+
+        # Never shrinks a file another process has grown further.
+        size = HEADER.size + capacity * RECORD.size
+        if size > os.fstat(self._records_fd).st_size:
+            os.ftruncate(self._records_fd, size)
+        self._remap()
+
+    def _offset(self, idx: int) -> int:
+        return HEADER.size + (idx - 1) * RECORD.size
+
+    def _flush(self, offset: int, size: int) -> None:
+        if not self._map or not self.sync:
+            return
+        start = offset - offset % mmap.PAGESIZE
+        self._map.flush(start, offset + size - start)
+
+    def _write_description(self, description: str) -> tuple[int, int]:
+        if self._heap_fd is None:
+            raise RuntimeError("Storage is not open.")
+
+        data = memoryview(description.encode("utf-8"))
+        offset = os.lseek(self._heap_fd, 0, os.SEEK_END)
+        written = 0
+        while written < len(data):
+            # The heap is opened with O_APPEND, the rest goes after what is written.
+            written += os.write(self._heap_fd, data[written:])
+        if self.sync:
+            # On disk before the record that points at it.
+            os.fsync(self._heap_fd)
+        return offset, len(data)
+
+    def _read_description(self, offset: int, length: int) -> str:
+        if self._heap_fd is None:
+            raise RuntimeError("Storage is not open.")
+        return os.pread(self._heap_fd, length, offset).decode("utf-8")
+
+    def _read(self, idx: int) -> Task:
+        mm = self._open()
+        if not 1 <= idx <= self.counter:
+            raise TaskNotFound()
+
+        record_id, code, created_at, updated_at, offset, length = RECORD.unpack_from(
+            mm, self._offset(idx)
+        )
+        if not code:
+            raise TaskNotFound()
+
+        return Task(
+            id=record_id,
+            description=self._read_description(offset, length),
+            status=statuses[code],
+            createdAt=created_at,
+            updatedAt=updated_at,
+        )
+
+    def _write(self, idx: int, task: BaseTask, description: tuple[int, int]) -> None:
+        mm = self._open()
+        offset = self._offset(idx)
+        RECORD.pack_into(
+            mm,
+            offset,
+            idx,
+            status_codes[task.status],
+            task.createdAt,
+            task.updatedAt,
+            *description,
+        )
+        self._flush(offset, RECORD.size)
+
+    def _set_counter(self, counter: int) -> None:
+        mm = self._open()
+        self.counter = counter
+        HEADER.pack_into(mm, 0, MAGIC, counter)
+        self._flush(0, HEADER.size)
+
+    def _status_column(self) -> bytes:
+        mm = self._open()
+        start = HEADER.size + STATUS_OFFSET
+        return mm[start : start + self.counter * RECORD.size : RECORD.size]
+
+    async def load(self) -> dict[str, Task]:
+        self._refresh()
+        return {
+            str(idx): self._read(idx)
+            for idx, code in enumerate(self._status_column(), start=1)
+            if code
+        }
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        if status and status not in status_codes:
+            return
+
+        self._refresh()
+        code = status_codes[status] if status else None
+        first = max(after or 0, 0) + 1
+        for idx, record_code in enumerate(
+            self._status_column()[first - 1 :], start=first
+        ):
+            if record_code and (code is None or record_code == code):
+                yield self._read(idx)
+
+    async def get_by_idx(self, idx: int) -> Task:
+        self._refresh()
+        return self._read(idx)
+
+    async def _locked(self, change: Callable[[], T]) -> T:
+        """Run `change` on the latest counter, with no other process changing the file."""
+        if self._batch_depth:
+            self._refresh()
+            return change()
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            self._refresh()
+            return change()
+        finally:
+            self.lock.release()
+
+    def _update(self, idx: int, task: Task) -> None:
+        mm = self._open()
+        if not 1 <= idx <= self.counter:
+            raise TaskNotFound()
+
+        _, code, _, _, offset, length = RECORD.unpack_from(mm, self._offset(idx))
+        if not code:
+            raise TaskNotFound()
+
+        if self._read_description(offset, length) != task.description:
+            offset, length = self._write_description(task.description)
+        self._write(idx, task, (offset, length))
+
+    async def update_by_idx(self, idx: int, task: Task) -> None:
+        update_task = asyncio.create_task(self._locked(lambda: self._update(idx, task)))
+        await update_task
+
+    def _delete(self, idx: int) -> None:
+        mm = self._open()
+        if not 1 <= idx <= self.counter or not mm[self._offset(idx) + STATUS_OFFSET]:
+            raise TaskNotFound()
+
+        mm[self._offset(idx) + STATUS_OFFSET] = 0
+        self._flush(self._offset(idx), RECORD.size)
+
+    async def delete_by_idx(self, idx: int) -> None:
+        delete_task = asyncio.create_task(self._locked(lambda: self._delete(idx)))
+        await delete_task
+
+    def _add(self, task: BaseTask) -> tuple[int, Task]:
+        self._open()
+        idx = self.counter + 1
+        if idx > self._capacity():
+            self._grow(self._capacity() + GROWTH)
+
+        self._write(idx, task, self._write_description(task.description))
+        self._set_counter(idx)
+        return idx, Task(
+            id=idx,
+            description=task.description,
+            status=task.status,
+            createdAt=task.createdAt,
+            updatedAt=task.updatedAt,
+        )
+
+    async def add(self, task: BaseTask) -> tuple[int, Task]:
+        add_task = asyncio.create_task(self._locked(lambda: self._add(task)))
+        return await add_task
+
+    async def begin(self) -> None:
+        if self._batch_depth:
+            self._batch_depth += 1
+            return
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        self._batch_depth = 1
+        self.sync = False
+
+    async def commit(self) -> None:
+        if self._batch_depth > 1:
+            self._batch_depth -= 1
+            return
+
+        self.sync = True
+        if self._heap_fd is not None:
+            os.fsync(self._heap_fd)
+        if self._map:
+            self._map.flush()
+        if self._batch_depth:
+            self._batch_depth = 0
+            self.lock.release()
+
+    async def unload(self) -> None:
+        # Ends a batch however deeply nested.
+        self._batch_depth = min(self._batch_depth, 1)
+        await self.commit()
+        self.close()
+        self.lock.close()
+
+    def close(self) -> None:
+        if self._map:
+            self._map.close()
+            self._map = None
+        for fd in (self._records_fd, self._heap_fd):
+            if fd is not None:
+                os.close(fd)
+        self._records_fd = self._heap_fd = None
+
+
+def convert_json(json_path: Path, file_path: Path) -> int:
+    """Write the tasks of a JSONStorage file into a new binary store."""
+    heap_path = file_path.with_suffix(".heap")
+    for path in (file_path, heap_path):
+        if path.exists():
+            raise FileExistsError(path)
+
+    storage = BinaryStorage(file_location=str(file_path.absolute()))
+    storage.sync = False
+    storage._open()
+    converted = 0
+    with open(json_path, "r", encoding="utf-8") as f:
+        reader = TaskStreamReader(f)
+        for _, task in reader:
+            idx = task["id"]
+            if idx > storage._capacity():
+                storage._grow(max(idx, storage._capacity() * 2))
+            storage._write(
+                idx,
+                BaseTask(
+                    description=task["description"],
+                    status=task["status"],
+                    createdAt=task["createdAt"],
+                    updatedAt=task["updatedAt"],
+                ),
+                storage._write_description(task["description"]),
+            )
+            storage.counter = max(storage.counter, idx)
+            converted += 1
+
+    counter = max(storage.counter, reader.counter)
+    if counter > storage._capacity():
+        storage._grow(counter)
+    storage._set_counter(counter)
+    if storage._map:
+        storage._map.flush()
+    storage.close()
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a JSON task list to the binary format."
+    )
+    parser.add_argument("json_file", type=Path)
+    parser.add_argument("binary_file", type=Path, nargs="?")
+    args = parser.parse_args()
+
+    binary_file = args.binary_file or args.json_file.with_suffix(".tasks")
+    print(
+        f"Converted {convert_json(args.json_file, binary_file)} tasks to {binary_file}"
+    )
@@ -0,0 +1,36 @@
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Any
+
+# Read once at import: os.umask can only be read by setting it, which races
+# with files created by other threads meanwhile.
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def atomic_write_json(path: Path, data: Any, **kwargs) -> None:
+    """Write `data` as JSON next to `path` and atomically move it into place.
+
+    Readers either see the previous file or the new one, never a partial write.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        # mkstemp creates the file with 0600, keep the mode a plain open would give.
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,33 +1,141 @@
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import asdict
+from typing import AsyncIterator, Iterable
+
 from ..models.task import BaseTask, Task, TaskNotFound
-from ..storage.istorage import IStorage
+from ..storage.istorage import IStorage, TIME_FIELDS
 
 
 class InMemoryStorage(IStorage):
     def __init__(self):
+        self.counter = 0
         self.tasks: dict[str, Task] = {}
+        # status -> ids of the tasks in that status
+        self.status_index: dict[str, set[str]] = {}
+        # id -> status the task is filed under in status_index. Tasks are
+        # changed in place before update_by_idx, so it can't be read back
+        # from the task itself.
+        self._indexed_status: dict[str, str] = {}
+        # field -> (time, id) of every task, sorted. Built by the first time
+        # query and kept up to date from then on, empty until then.
+        self.time_index: dict[str, list[tuple[float, int]]] = {}
+        # id -> times the task is filed under in time_index, in TIME_FIELDS order.
+        self._indexed_times: dict[str, tuple[float, ...]] = {}
+
+    def _index(self, key: str, task: Task) -> None:
+        self._unindex(key)
+        self.status_index.setdefault(task.status, set()).add(key)
+        self._indexed_status[key] = task.status
+
+        if self.time_index:
+            times = tuple(getattr(task, field) for field in TIME_FIELDS)
+            for field, time in zip(TIME_FIELDS, times):
+                insort(self.time_index[field], (time, int(key)))
+            self._indexed_times[key] = times
+
+    def _unindex(self, key: str) -> None:
+        status = self._indexed_status.pop(key, None)
+        if status is not None:
+            self.status_index[status].discard(key)
+
+        times = self._indexed_times.pop(key, None)
+        if times is not None:
+            for field, time in zip(TIME_FIELDS, times):
+                entries = self.time_index[field]
+                position = bisect_left(entries, (time, int(key)))
+                if position < len(entries) and entries[position] == (time, int(key)):
+                    del entries[position]
+
+    def _reindex(self) -> None:
+        self.status_index = {}
+        self._indexed_status = {}
+        self.time_index = {}
+        self._indexed_times = {}
+        for key, task in self.tasks.items():
+            self._index(key, task)
+
+    def _build_time_index(self) -> None:
+        self._indexed_times = {
+            key: tuple(getattr(task, field) for field in TIME_FIELDS)
+            for key, task in self.tasks.items()
+        }
+        self.time_index = {
+            field: sorted(
+                (times[position], int(key))
+                for key, times in self._indexed_times.items()
+            )
+            for position, field in enumerate(TIME_FIELDS)
+        }
 
-    async def load(self, counter: int = 0, tasks: dict[str, Task] | None = None) -> dict[str, Task]:
+    async def load(
+        self, counter: int = 0, tasks: dict[str, Task] | None = None
+    ) -> dict[str, Task]:
         if tasks != None:
             self.counter = counter
             self.tasks = tasks
+            self._reindex()
 
         return self.tasks
 
+    def _keys(self, status: str | None, after: int | None) -> Iterable[str]:
+        if status:
+            keys = sorted(self.status_index.get(status, ()), key=int)
+            if after is not None:
+                keys = keys[bisect_right(keys, after, key=int) :]
+            return keys
+
+        if after is not None:
+            # Ids come from the counter, so the next page starts right after `after`.
+            return (str(idx) for idx in range(after + 1, self.counter + 1))
+
+        return list(self.tasks)
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        for key in self._keys(status, after):
+            task = self.tasks.get(key)
+            if task:
+                yield task
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        if not self.time_index:
+            self._build_time_index()
+
+        entries = self.time_index[field]
+        # (time,) sorts before every (time, id).
+        start = bisect_left(entries, (since,)) if since is not None else 0
+        end = bisect_left(entries, (until,)) if until is not None else len(entries)
+        for _, idx in entries[start:end]:
+            task = self.tasks.get(str(idx))
+            if task and (not status or task.status == status):
+                yield task
+
     async def update_by_idx(self, idx: int, task: Task) -> None:
         try:
             self.tasks[str(idx)] = task
+            self._index(str(idx), task)
         except KeyError:
             raise TaskNotFound()
 
     async def delete_by_idx(self, idx: int) -> None:
         try:
             del self.tasks[str(idx)]
+            self._unindex(str(idx))
         except KeyError:
             raise TaskNotFound()
 
     async def add(self, task: BaseTask) -> tuple[int, Task]:
         self.counter += 1
-        self.tasks[str(self.counter)] = Task(**task.__dict__, id=self.counter)
+        self.tasks[str(self.counter)] = Task(**asdict(task), id=self.counter)
+        self._index(str(self.counter), self.tasks[str(self.counter)])
         return self.counter, self.tasks[str(self.counter)]
 
     async def get_by_idx(self, idx: int) -> Task:
@@ -1,7 +1,36 @@
 from abc import ABC, abstractmethod
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator
 
 from ..models.task import BaseTask, Task
 
+# Task times that can be queried with iter_tasks_by_time.
+TIME_FIELDS = ("createdAt", "updatedAt")
+
+
+@dataclass
+class TaskChanges:
+    added: list[Task] = field(default_factory=list)
+    updated: list[Task] = field(default_factory=list)
+    deleted: list[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.deleted)
+
+
+def diff_tasks(previous: dict[str, Task], current: dict[str, Task]) -> TaskChanges:
+    changes = TaskChanges()
+    for key, task in current.items():
+        old = previous.get(key)
+        if old is None:
+            changes.added.append(task)
+        elif old != task:
+            changes.updated.append(task)
+    changes.deleted = [int(key) for key in previous.keys() - current.keys()]
+    return changes
+
 
 class IStorage(ABC):
     @abstractmethod
@@ -18,3 +47,66 @@ class IStorage(ABC):
 
     @abstractmethod
     async def add(self, task: BaseTask) -> tuple[int, Task]: ...
+
+    async def add_many(self, tasks: AsyncIterable[BaseTask]) -> int:
+        """Add every task, written once at the end. Returns the number added."""
+        added = 0
+        begin_task = asyncio.create_task(self.begin())
+        await begin_task
+        try:
+            async for task in tasks:
+                add_task = asyncio.create_task(self.add(task))
+                await add_task
+                added += 1
+        finally:
+            commit_task = asyncio.create_task(self.commit())
+            await commit_task
+        return added
+
+    async def begin(self) -> None:
+        """Start a batch: changes until `commit` may be written only then.
+
+        Batches nest, only the commit of the outermost one writes.
+        """
+
+    async def commit(self) -> None:
+        """Write the changes made since `begin`."""
+
+    async def unload(self) -> None:
+        """Close files and free memory. The storage is loaded again on next use."""
+
+    async def poll_changes(self) -> TaskChanges | None:
+        """Changes made by other processes since the last call, if the storage can tell."""
+        return None
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        """Yield tasks in id order, starting after the id `after`."""
+        load_task = asyncio.create_task(self.load())
+        tasks = await load_task
+        for task in list(tasks.values()):
+            if (not status or task.status == status) and (
+                after is None or task.id > after
+            ):
+                yield task
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        """Yield tasks with `since` <= `field` < `until` in `field` order, ties in id order."""
+        tasks = []
+        async with aclosing(self.iter_tasks(status)) as tasks_iterator:
+            async for task in tasks_iterator:
+                time = getattr(task, field)
+                if (since is None or time >= since) and (until is None or time < until):
+                    tasks.append(task)
+
+        tasks.sort(key=lambda task: (getattr(task, field), task.id))
+        for task in tasks:
+            yield task
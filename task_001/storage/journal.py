@@ -0,0 +1,413 @@
+"""
+Append-only journal storage.
+
+Files next to `file_location`:
+
+uncategorized.json            snapshot, same structure as JSONStorage plus
+                              "generation": int
+uncategorized.json.journal.N  one JSON record per line:
+                              {"op": "add" | "update", "id": int, "task": {...}}
+                              {"op": "delete", "id": int}
+
+The snapshot contains every record from journals with a generation lower than
+its own. Journals with the same or a higher generation are replayed on top of
+it in order.
+
+Changes are appended under uncategorized.json.lock. Before each operation the
+records other processes appended since are replayed, and everything is read
+again once another process has started a new generation.
+"""
+
+import asyncio
+from dataclasses import asdict
+import json
+import os
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TextIO, TypeVar
+
+from .files import atomic_write_json
+from .in_memory import InMemoryStorage
+from .istorage import IStorage
+from .locking import FileLock
+from ..models.task import BaseTask, Task, TaskNotFound
+
+T = TypeVar("T")
+
+
+class JournalStorage(IStorage):
+    def __init__(
+        self,
+        *,
+        file_location: str = "data/uncategorized.json",
+        compact_threshold: int = 1000,
+        cache: InMemoryStorage | None = None,
+    ):
+        self.file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+        )
+        self.compact_threshold = compact_threshold
+        self.cache = cache or InMemoryStorage()
+
+        self.loaded = False
+        self.generation = 0
+        self.journal_records = 0
+        self._journal: TextIO | None = None
+        # Bytes of the current journal this process has read or written.
+        self._journal_size = 0
+        self._compaction: asyncio.Future | None = None
+        self.lock = FileLock(self.file_path.with_name(f"{self.file_path.name}.lock"))
+        # Between begin and commit the lock is held, so nobody else appends.
+        # Batches nest and end with the outermost commit.
+        self._batch_depth = 0
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.file_path.with_name(f"{self.file_path.name}.journal.{generation}")
+
+    def _journal_generations(self) -> list[int]:
+        prefix = f"{self.file_path.name}.journal."
+        generations = []
+        for path in self.file_path.parent.glob(f"{prefix}*"):
+            suffix = path.name[len(prefix) :]
+            if suffix.isdigit():
+                generations.append(int(suffix))
+        return sorted(generations)
+
+    def _snapshot_inode(self) -> int | None:
+        try:
+            return os.stat(self.file_path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _read_snapshot(self) -> tuple[int, int, dict[str, Task]]:
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data = json.load(f) or {}
+        except FileNotFoundError:
+            data = {}
+
+        return (
+            data.get("generation", 0),
+            data.get("counter", 0),
+            {str(task["id"]): Task(**task) for task in data.get("tasks", {}).values()},
+        )
+
+    def _records(self, lines: Iterable[str | bytes]) -> Iterable[dict]:
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A torn line from an interrupted append.
+                continue
+
+    def _replay(
+        self, generation: int, counter: int, tasks: dict[str, Task]
+    ) -> tuple[int, int]:
+        records = 0
+        with open(self._journal_path(generation), "r", encoding="utf-8") as f:
+            for record in self._records(f):
+                records += 1
+                key = str(record["id"])
+                match record["op"]:
+                    case "add" | "update":
+                        tasks[key] = Task(**record["task"])
+                        counter = max(counter, record["id"])
+                    case "delete":
+                        tasks.pop(key, None)
+        return counter, records
+
+    def _compacted_elsewhere(self) -> bool:
+        """Whether another process started a new generation since the last load."""
+        if not self._journal:
+            return False
+        try:
+            current = os.stat(self._journal_path(self.generation))
+        except FileNotFoundError:
+            return True
+        return (
+            current.st_ino != os.fstat(self._journal.fileno()).st_ino
+            or self._journal_path(self.generation + 1).exists()
+        )
+
+    async def _catch_up(self) -> None:
+        """Replay the records other processes appended to the current journal."""
+        path = self._journal_path(self.generation)
+        if os.stat(path).st_size <= self._journal_size:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(self._journal_size)
+            data = f.read()
+        # A line still being written is read on the next call.
+        end = data.rfind(b"\n") + 1
+        self._journal_size += end
+
+        for record in self._records(data[:end].splitlines()):
+            self.journal_records += 1
+            match record["op"]:
+                case "add" | "update":
+                    update_task = asyncio.create_task(
+                        self.cache.update_by_idx(record["id"], Task(**record["task"]))
+                    )
+                    await update_task
+                    self.cache.counter = max(self.cache.counter, record["id"])
+                case "delete":
+                    try:
+                        delete_task = asyncio.create_task(
+                            self.cache.delete_by_idx(record["id"])
+                        )
+                        await delete_task
+                    except TaskNotFound:
+                        pass
+
+    def _ends_with_newline(self, path: Path) -> bool:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    async def load(self) -> dict[str, Task]:
+        if self.loaded and not self._batch_depth:
+            if self._compacted_elsewhere():
+                self._journal.close()
+                self._journal = None
+                self.loaded = False
+            else:
+                catch_up_task = asyncio.create_task(self._catch_up())
+                await catch_up_task
+
+        if self.loaded:
+            return await self.cache.load()
+
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        snapshot_inode = self._snapshot_inode()
+        generation, counter, tasks = self._read_snapshot()
+
+        journal_generations = self._journal_generations()
+        replayed = [g for g in journal_generations if g >= generation]
+        if (
+            replayed != list(range(generation, generation + len(replayed)))
+            and self._snapshot_inode() != snapshot_inode
+        ):
+            # A compaction wrote a newer snapshot and removed journals after
+            # the snapshot was read.
+            return await self.load()
+
+        self.journal_records = 0
+        try:
+            for journal_generation in journal_generations:
+                if journal_generation < generation:
+                    # Already folded into the snapshot by a compaction that did not
+                    # get to clean up after itself.
+                    try:
+                        os.remove(self._journal_path(journal_generation))
+                    except FileNotFoundError:
+                        pass
+                    continue
+                counter, records = self._replay(journal_generation, counter, tasks)
+                self.journal_records += records
+                generation = journal_generation
+        except FileNotFoundError:
+            # Removed by another process's compaction, its snapshot has it now.
+            return await self.load()
+
+        self.generation = generation
+        self._journal = open(self._journal_path(self.generation), "a", encoding="utf-8")
+        if self._journal.tell() and not self._ends_with_newline(
+            self._journal_path(self.generation)
+        ):
+            self._journal.write("\n")
+            self._journal.flush()
+        self._journal_size = self._journal.tell()
+        self.loaded = True
+
+        load_task = asyncio.create_task(self.cache.load(counter, tasks))
+        return await load_task
+
+    async def _append(self, record: dict) -> None:
+        if not self._journal:
+            raise RuntimeError("Journal is not open.")
+
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        self._journal_size = self._journal.tell()
+        self.journal_records += 1
+
+        if self.journal_records > self.compact_threshold and not self._compaction:
+            self._start_compaction()
+
+    def _start_compaction(self) -> None:
+        if not self._journal:
+            return
+
+        # Only the dict is copied on the loop, the tasks are serialized in the
+        # worker thread. A task changed meanwhile may be written with the
+        # change, which its record in the new journal repeats on replay.
+        tasks = dict(self.cache.tasks)
+        counter = self.cache.counter
+        stale_generations = [
+            generation
+            for generation in self._journal_generations()
+            if generation <= self.generation
+        ]
+
+        # New records go to the next generation while the snapshot is written.
+        self._journal.close()
+        self.generation += 1
+        self.journal_records = 0
+        self._journal = open(self._journal_path(self.generation), "a", encoding="utf-8")
+        self._journal_size = self._journal.tell()
+
+        self._compaction = asyncio.ensure_future(
+            asyncio.to_thread(
+                self._write_snapshot, self.generation, counter, tasks, stale_generations
+            )
+        )
+        self._compaction.add_done_callback(self._compaction_done)
+
+    def _write_snapshot(
+        self,
+        generation: int,
+        counter: int,
+        tasks: dict[str, Task],
+        stale_generations: list[int],
+    ) -> None:
+        snapshot = {
+            "generation": generation,
+            "counter": counter,
+            "tasks": {key: asdict(task) for key, task in tasks.items()},
+        }
+        atomic_write_json(self.file_path, snapshot, indent=2)
+        for generation in stale_generations:
+            try:
+                os.remove(self._journal_path(generation))
+            except FileNotFoundError:
+                pass
+
+    def _compaction_done(self, future: asyncio.Future) -> None:
+        self._compaction = None
+        # The journals stay in place on failure and are replayed on the next load.
+        if not future.cancelled() and future.exception():
+            asyncio.get_running_loop().call_exception_handler(
+                {
+                    "message": f"Compacting {self.file_path} failed",
+                    "exception": future.exception(),
+                    "future": future,
+                }
+            )
+
+    async def _locked(self, change: Callable[[], Awaitable[T]]) -> T:
+        """Apply `change` on top of every record appended so far."""
+        if self._batch_depth:
+            change_task = asyncio.create_task(change())
+            return await change_task
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            load_task = asyncio.create_task(self.load())
+            await load_task
+            change_task = asyncio.create_task(change())
+            return await change_task
+        finally:
+            self.lock.release()
+
+    async def begin(self) -> None:
+        if self._batch_depth:
+            self._batch_depth += 1
+            return
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            load_task = asyncio.create_task(self.load())
+            await load_task
+        except BaseException:
+            self.lock.release()
+            raise
+        self._batch_depth = 1
+
+    async def commit(self) -> None:
+        if self._batch_depth != 1:
+            self._batch_depth = max(self._batch_depth - 1, 0)
+            return
+
+        self._batch_depth = 0
+        self.lock.release()
+
+    async def unload(self) -> None:
+        # Ends a batch however deeply nested.
+        self._batch_depth = min(self._batch_depth, 1)
+        commit_task = asyncio.create_task(self.commit())
+        await commit_task
+        if self._compaction:
+            # Failures are left to the next load, see _compaction_done.
+            await asyncio.wait([self._compaction])
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+        self.lock.close()
+        self.loaded = False
+        await self.cache.load(0, {})
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        async for task in self.cache.iter_tasks(status, after=after):
+            yield task
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        async for task in self.cache.iter_tasks_by_time(
+            field, status, since=since, until=until
+        ):
+            yield task
+
+    async def get_by_idx(self, idx: int) -> Task:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        get_task = asyncio.create_task(self.cache.get_by_idx(idx))
+        return await get_task
+
+    async def update_by_idx(self, idx: int, task: Task) -> None:
+        async def change() -> None:
+            update_task = asyncio.create_task(self.cache.update_by_idx(idx, task))
+            await update_task
+            append_task = asyncio.create_task(
+                self._append({"op": "update", "id": idx, "task": asdict(task)})
+            )
+            await append_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        await locked_task
+
+    async def delete_by_idx(self, idx: int) -> None:
+        async def change() -> None:
+            delete_task = asyncio.create_task(self.cache.delete_by_idx(idx))
+            await delete_task
+            append_task = asyncio.create_task(self._append({"op": "delete", "id": idx}))
+            await append_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        await locked_task
+
+    async def add(self, task: BaseTask) -> tuple[int, Task]:
+        async def change() -> tuple[int, Task]:
+            add_task = asyncio.create_task(self.cache.add(task))
+            idx, new_task = await add_task
+            append_task = asyncio.create_task(
+                self._append({"op": "add", "id": idx, "task": asdict(new_task)})
+            )
+            await append_task
+            return idx, new_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        return await locked_task
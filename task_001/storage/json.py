@@ -11,55 +11,172 @@ JSON file structure:
 """
 
 import asyncio
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 import json
 import os
 from pathlib import Path
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    TextIO,
+    TypeVar,
+)
 
+from .files import atomic_write_json
 from .in_memory import InMemoryStorage
-from .istorage import IStorage
-from ..models.task import BaseTask, Task
+from .istorage import IStorage, TaskChanges, diff_tasks
+from .json_stream import TaskStreamReader
+from .locking import FileLock
+from .write_queue import WriteQueue
+from ..models.task import BaseTask, Task, TaskConflict, TaskNotFound
+from ..profiling import count, phase
+
+T = TypeVar("T")
+
+
+@dataclass
+class LoadStats:
+    loads: int = 0
+    skipped_loads: int = 0
+    streamed_reads: int = 0
+
+    def add(self, name: str) -> None:
+        """Count one of the fields here and, with --profile, as json.<name>."""
+        setattr(self, name, getattr(self, name) + 1)
+        count(f"json.{name}")
 
 
 class JSONStorage(IStorage):
     def __init__(
-        self, *, file_location: str = "data/uncategorized.json", cache=InMemoryStorage()
+        self,
+        *,
+        file_location: str = "data/uncategorized.json",
+        cache: InMemoryStorage | None = None,
+        validate_cache: bool = True,
+        flush_window: float = 0.005,
+        lazy_load: bool = False,
+        offload_io: bool = False,
     ):
         self.failed_to_load = False
         self.file_path = (
             Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
         )
 
-        self.cache = cache
+        self.cache = cache or InMemoryStorage()
+        self.validate_cache = validate_cache
+        self.lazy_load = lazy_load
+        # Read and write the file in a worker thread, so the event loop (and
+        # the GUI running on it) isn't blocked.
+        self.offload_io = offload_io
+        self.stats = LoadStats()
+        self._signature: tuple[int, int, int] | None = None
+        self.write_queue = WriteQueue(self._dump, window=flush_window)
+        self.lock = FileLock(self.file_path.with_name(f"{self.file_path.name}.lock"))
+        # id -> updatedAt of the task when get_by_idx handed it out
+        self._read_versions: dict[int, float] = {}
+        # Between begin and commit the lock is held and nothing is written.
+        # Batches nest, e.g. an import in a batch, and end with the outermost.
+        self._batch_depth = 0
+
+    def _file_signature(self, stat: os.stat_result) -> tuple[int, int, int]:
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _is_cache_valid(self) -> bool:
+        if not self.validate_cache or self._signature is None:
+            return False
+        try:
+            return self._signature == self._file_signature(os.stat(self.file_path))
+        except FileNotFoundError:
+            return False
+
+    def _to_task(self, task: dict) -> Task:
+        return Task(
+            id=task["id"],
+            description=task["description"],
+            status=task["status"],
+            createdAt=task["createdAt"],
+            updatedAt=task["updatedAt"],
+        )
+
+    def _read(self, f: TextIO) -> tuple[int, dict[str, Task]]:
+        if self.lazy_load:
+            with phase("json.stream decode"):
+                reader = TaskStreamReader(f)
+                tasks = {str(task["id"]): self._to_task(task) for _, task in reader}
+            return reader.counter, tasks
+
+        with phase("json.decode"):
+            data = json.load(f) or {"counter": 0, "tasks": {}}
+        with phase("json.build tasks"):
+            return data["counter"], {
+                str(task["id"]): self._to_task(task) for task in data["tasks"].values()
+            }
+
+    def _stream(self) -> Iterator[dict]:
+        """Decode one task at a time without touching the cache."""
+        self.stats.add("streamed_reads")
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for _, task in TaskStreamReader(f):
+                yield task
+
+    def _find(self, idx: int) -> dict | None:
+        for task in self._stream():
+            if task["id"] == idx:
+                return task
+        return None
+
+    def _should_stream(self) -> bool:
+        return (
+            self.lazy_load
+            and not self._batch_depth
+            and not self.write_queue.busy
+            and not self._is_cache_valid()
+            and self.file_path.exists()
+        )
 
     async def _dump(self):
         load_task = asyncio.create_task(self.cache.load())
         store_task = asyncio.create_task(self.store(await load_task))
         await store_task
 
+    async def _io(self, function: Callable[..., T], *args) -> T:
+        if self.offload_io:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
+
+    def _read_file(self) -> tuple[tuple[int, int, int], int, dict[str, Task]]:
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            signature = self._file_signature(os.fstat(f.fileno()))
+            counter, tasks = self._read(f)
+        return signature, counter, tasks
+
     async def load(self) -> dict[str, Task]:
+        if self.write_queue.busy or self._batch_depth:
+            # The cache holds changes that are not on disk yet. In a batch the
+            # lock keeps other processes from writing, so the file is unchanged.
+            return await self.cache.load()
+
+        if self._is_cache_valid():
+            self.stats.add("skipped_loads")
+            return await self.cache.load()
+
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                data = json.load(f) or {
-                    "counter": 0,
-                    "tasks": {}
-                }
-                load_task = asyncio.create_task(
-                    self.cache.load(
-                        data["counter"],
-                        {
-                            str(task["id"]): Task(
-                                id=task["id"],
-                                description=task["description"],
-                                status=task["status"],
-                                createdAt=task["createdAt"],
-                                updatedAt=task["updatedAt"],
-                            )
-                            for task in data["tasks"].values()
-                        }
-                    )
-                )
-                return await load_task
+            cached_signature = self._signature
+            read_task = asyncio.create_task(self._io(self._read_file))
+            signature, counter, tasks = await read_task
+
+            if self.write_queue.busy or self._signature != cached_signature:
+                # The cache was changed while the file was read.
+                return await self.cache.load()
+
+            load_task = asyncio.create_task(self.cache.load(counter, tasks))
+            tasks = await load_task
+            self.stats.add("loads")
+            self._signature = signature
+            return tasks
         except FileNotFoundError as exc:
             if not self.failed_to_load:
                 self.failed_to_load = True
@@ -70,38 +187,204 @@ class JSONStorage(IStorage):
             else:
                 raise exc
 
+    def _write_file(
+        self, counter: int, tasks: list[tuple[str, Task]]
+    ) -> tuple[int, int, int]:
+        with phase("json.serialize tasks"):
+            data = {
+                "counter": counter,
+                "tasks": {task[0]: asdict(task[1]) for task in tasks},
+            }
+        with phase("json.dump"):
+            atomic_write_json(self.file_path, data, indent=2)
+        return self._file_signature(os.stat(self.file_path))
+
     async def store(self, tasks: dict[str, Task]):
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump({
-                "counter": self.cache.counter,
-                "tasks": {task[0]: asdict(task[1]) for task in tasks.items()}
-            }, f, indent=2)
+        # Copied on the loop, the dict may change while a worker thread writes.
+        write_task = asyncio.create_task(
+            self._io(self._write_file, self.cache.counter, list(tasks.items()))
+        )
+        self._signature = await write_task
+
+    async def poll_changes(self) -> TaskChanges | None:
+        # Nothing to compare with before the first load, and our own changes
+        # are not reported.
+        if self._signature is None or self.write_queue.busy or self._batch_depth:
+            return None
+
+        try:
+            if self._file_signature(os.stat(self.file_path)) == self._signature:
+                return None
+        except FileNotFoundError:
+            return None
+
+        previous = dict(self.cache.tasks)
+        load_task = asyncio.create_task(self.load())
+        tasks = await load_task
+        return diff_tasks(previous, tasks)
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        if self._should_stream():
+            for task in self._stream():
+                if (not status or task["status"] == status) and (
+                    after is None or task["id"] > after
+                ):
+                    yield self._to_task(task)
+            return
+
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        async for task in self.cache.iter_tasks(status, after=after):
+            yield task
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        if self._should_stream():
+            # Only the matching tasks are held, to be sorted.
+            async for task in super().iter_tasks_by_time(
+                field, status, since=since, until=until
+            ):
+                yield task
+            return
 
-    async def get_by_idx(self, idx: int) -> Task:
         load_task = asyncio.create_task(self.load())
         await load_task
-        get_task = asyncio.create_task(self.cache.get_by_idx(idx))
-        return await get_task
+        async for task in self.cache.iter_tasks_by_time(
+            field, status, since=since, until=until
+        ):
+            yield task
+
+    async def _locked(self, change: Callable[[], Awaitable[T]]) -> T:
+        """Apply `change` to the latest file contents and wait until it is written.
+
+        The lock is held from before the file is read until the write that
+        includes the change, so no other process can write in between.
+        """
+        if self._batch_depth:
+            change_task = asyncio.create_task(change())
+            return await change_task
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            load_task = asyncio.create_task(self.load())
+            await load_task
+            change_task = asyncio.create_task(change())
+            result = await change_task
+            flush_task = asyncio.create_task(self.write_queue.flush())
+            await flush_task
+            return result
+        finally:
+            self.lock.release()
+
+    async def begin(self) -> None:
+        if self._batch_depth:
+            self._batch_depth += 1
+            return
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            load_task = asyncio.create_task(self.load())
+            await load_task
+        except BaseException:
+            self.lock.release()
+            raise
+        self._batch_depth = 1
+
+    async def commit(self) -> None:
+        if self._batch_depth != 1:
+            self._batch_depth = max(self._batch_depth - 1, 0)
+            return
+
+        try:
+            flush_task = asyncio.create_task(self.write_queue.flush())
+            await flush_task
+        finally:
+            self._batch_depth = 0
+            self.lock.release()
+
+    async def unload(self) -> None:
+        # Ends a batch however deeply nested.
+        self._batch_depth = min(self._batch_depth, 1)
+        commit_task = asyncio.create_task(self.commit())
+        await commit_task
+        self.lock.close()
+        self._signature = None
+        await self.cache.load(0, {})
+
+    async def get_by_idx(self, idx: int) -> Task:
+        if self._should_stream():
+            find_task = asyncio.create_task(self._io(self._find, idx))
+            data = await find_task
+            if not data:
+                raise TaskNotFound()
+            task = self._to_task(data)
+        else:
+            load_task = asyncio.create_task(self.load())
+            await load_task
+            get_task = asyncio.create_task(self.cache.get_by_idx(idx))
+            task = await get_task
+
+        self._read_versions[idx] = task.updatedAt
+        return task
 
     async def update_by_idx(self, idx: int, task: Task) -> None:
-        update_task = asyncio.create_task(self.cache.update_by_idx(idx, task))
+        async def change():
+            current = self.cache.tasks.get(str(idx))
+            if not current:
+                raise TaskNotFound()
+
+            read_version = self._read_versions.pop(idx, None)
+            # `current is task` when nobody reloaded the cache since the read.
+            if (
+                current is not task
+                and read_version is not None
+                and current.updatedAt != read_version
+            ):
+                raise TaskConflict()
+
+            update_task = asyncio.create_task(self.cache.update_by_idx(idx, task))
+            await update_task
+
+        update_task = asyncio.create_task(self._locked(change))
         await update_task
-        dump_task = asyncio.create_task(self._dump())
-        await dump_task
 
     async def delete_by_idx(self, idx: int) -> None:
-        load_task = asyncio.create_task(self.load())
-        await load_task
-        delete_task = asyncio.create_task(self.cache.delete_by_idx(idx))
+        delete_task = asyncio.create_task(
+            self._locked(lambda: self.cache.delete_by_idx(idx))
+        )
         await delete_task
-        store_task = asyncio.create_task(self._dump())
-        await store_task
 
     async def add(self, task: BaseTask) -> tuple[int, Task]:
-        load_task = asyncio.create_task(self.load())
-        await load_task
-        add_task = asyncio.create_task(self.cache.add(task))
-        res = await add_task
-        store_task = asyncio.create_task(self._dump())
-        await store_task
-        return res
+        add_task = asyncio.create_task(self._locked(lambda: self.cache.add(task)))
+        return await add_task
+
+    async def add_many(self, tasks: AsyncIterable[BaseTask]) -> int:
+        """Add every task in one batch, the file is written once."""
+        added = 0
+
+        async def change() -> None:
+            nonlocal added
+            async for task in tasks:
+                await self.cache.add(task)
+                added += 1
+
+        begin_task = asyncio.create_task(self.begin())
+        await begin_task
+        try:
+            # One change for all of them, a task per row halves the import speed.
+            add_task = asyncio.create_task(self._locked(change))
+            await add_task
+        finally:
+            commit_task = asyncio.create_task(self.commit())
+            await commit_task
+        return added
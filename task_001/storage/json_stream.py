@@ -0,0 +1,102 @@
+"""
+Incremental reader for the JSONStorage file.
+
+Only one task entry is decoded at a time, so the memory used while reading
+does not depend on the size of the file.
+"""
+
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+WHITESPACE = re.compile(r"\s*")
+
+decoder = json.JSONDecoder()
+
+
+class TaskStreamReader:
+    def __init__(self, file: TextIO, *, chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+
+        self.counter = 0
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            match = WHITESPACE.match(self._buffer, self._pos)
+            self._pos = match.end() if match else self._pos
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise json.JSONDecodeError(
+                    "Unexpected end of file", self._buffer, self._pos
+                )
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number that ends the buffer may continue in the next chunk.
+            if end == len(self._buffer) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _members(self) -> Iterator[str]:
+        """Yield the keys of an object, leaving the reader at each value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        # A new file holds an empty list.
+        if self._peek() == "[":
+            return
+
+        for key in self._members():
+            if key == "tasks":
+                for task_key in self._members():
+                    yield task_key, self._value()
+            elif key == "counter":
+                self.counter = self._value()
+            else:
+                self._value()
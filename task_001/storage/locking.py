@@ -0,0 +1,57 @@
+import asyncio
+import fcntl
+import os
+from pathlib import Path
+
+
+class FileLock:
+    """Exclusive lock shared by every process that uses the same file.
+
+    Coroutines of one process share the lock: it is taken by the first
+    `acquire` and given back by the last `release`.
+    """
+
+    def __init__(self, path: Path, *, poll_interval: float = 0.002):
+        self.path = path
+        self.poll_interval = poll_interval
+
+        self.contended = 0
+        self._fd: int | None = None
+        self._holders = 0
+        # Only one coroutine of this process polls for the lock.
+        self._waiting = asyncio.Lock()
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _try_lock(self) -> bool:
+        try:
+            fcntl.flock(self._open(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    async def acquire(self) -> None:
+        if self._holders:
+            self._holders += 1
+            return
+
+        async with self._waiting:
+            if not self._holders:
+                while not self._try_lock():
+                    self.contended += 1
+                    await asyncio.sleep(self.poll_interval)
+            self._holders += 1
+
+    def release(self) -> None:
+        self._holders -= 1
+        if not self._holders and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        if not self._holders and self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
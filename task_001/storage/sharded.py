@@ -0,0 +1,341 @@
+"""
+JSON storage split across several files.
+
+uncategorized.shards.json    {"counter": int, "shards": int}
+uncategorized.shard-N.json   {"tasks": {...}} with every task whose id % shards == N,
+                             tasks have the same structure as in JSONStorage
+
+Shards are read concurrently and a change rewrites only the shard that owns
+the task. Changes are made under uncategorized.json.lock, on top of the
+shards and the counter as other processes left them.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from enum import Enum
+from functools import partial
+import json
+import os
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from .files import atomic_write_json
+from .in_memory import InMemoryStorage
+from .istorage import IStorage
+from .locking import FileLock
+from .write_queue import WriteQueue
+from ..models.task import BaseTask, Task
+
+Signature = tuple[int, int, int]
+T = TypeVar("T")
+
+
+class ShardExecutor(Enum):
+    thread = "thread"
+    process = "process"
+
+
+def _signature(stat: os.stat_result) -> Signature:
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _read_shard(path: Path) -> tuple[Signature | None, dict[str, Task]]:
+    # Runs in a worker thread or process.
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            signature = _signature(os.fstat(f.fileno()))
+            data = json.load(f)
+    except FileNotFoundError:
+        return None, {}
+
+    return signature, {str(task["id"]): Task(**task) for task in data["tasks"].values()}
+
+
+def _write_shard(path: Path, tasks: dict[str, Task]) -> Signature:
+    # Runs in a worker thread.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(
+        path, {"tasks": {key: asdict(task) for key, task in tasks.items()}}, indent=2
+    )
+    return _signature(os.stat(path))
+
+
+class ShardedJSONStorage(IStorage):
+    def __init__(
+        self,
+        *,
+        file_location: str = "data/uncategorized.json",
+        shards: int = 8,
+        executor: ShardExecutor = ShardExecutor.thread,
+        flush_window: float = 0.005,
+        cache: InMemoryStorage | None = None,
+    ):
+        file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+        )
+        self.meta_path = file_path.with_suffix(".shards.json")
+        self.shard_paths = [
+            file_path.with_suffix(f".shard-{shard}.json") for shard in range(shards)
+        ]
+
+        self.shards = shards
+        self.executor_type = executor
+        self.cache = cache or InMemoryStorage()
+
+        self.loaded = False
+        self.shard_tasks: list[dict[str, Task]] = [{} for _ in range(shards)]
+        self._signatures: list[Signature | None] = [None] * shards
+        self._executor: Executor | None = None
+
+        self.write_queues = [
+            WriteQueue(partial(self._store_shard, shard), window=flush_window)
+            for shard in range(shards)
+        ]
+        self.meta_queue = WriteQueue(self._store_meta, window=flush_window)
+        self.lock = FileLock(file_path.with_name(f"{file_path.name}.lock"))
+        # Shards changed since begin, written on commit. Between begin and
+        # commit the lock is held. Batches nest and end with the outermost.
+        self._dirty: set[int] | None = None
+        self._batch_depth = 0
+
+    def _shard(self, idx: int) -> int:
+        return idx % self.shards
+
+    @property
+    def executor(self) -> Executor:
+        if not self._executor:
+            match self.executor_type:
+                case ShardExecutor.process:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=min(self.shards, os.cpu_count() or 1)
+                    )
+                case _:
+                    self._executor = ThreadPoolExecutor(max_workers=self.shards)
+        return self._executor
+
+    def _stat(self, path: Path) -> Signature | None:
+        try:
+            return _signature(os.stat(path))
+        except FileNotFoundError:
+            return None
+
+    def _read_meta(self) -> int:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return 0
+
+        if meta["shards"] != self.shards:
+            raise ValueError(
+                f"{self.meta_path} is split into {meta['shards']} shards, {self.shards} configured."
+            )
+        return meta["counter"]
+
+    async def load(self) -> dict[str, Task]:
+        if self.meta_queue.busy or any(queue.busy for queue in self.write_queues):
+            # The cache holds changes that are not on disk yet.
+            return await self.cache.load()
+
+        changed = [
+            shard
+            for shard in range(self.shards)
+            if not self.loaded
+            or self._stat(self.shard_paths[shard]) != self._signatures[shard]
+        ]
+        if not changed:
+            return await self.cache.load()
+
+        cached_signatures = list(self._signatures)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    self.executor, _read_shard, self.shard_paths[shard]
+                )
+                for shard in changed
+            ]
+        )
+        if (
+            self.meta_queue.busy
+            or any(queue.busy for queue in self.write_queues)
+            or self._signatures != cached_signatures
+        ):
+            # The cache was changed or read again while the shards were read.
+            return await self.cache.load()
+
+        for shard, (signature, tasks) in zip(changed, results):
+            self._signatures[shard] = signature
+            self.shard_tasks[shard] = tasks
+        self.loaded = True
+
+        tasks = {}
+        for shard_tasks in self.shard_tasks:
+            tasks.update(shard_tasks)
+        load_task = asyncio.create_task(
+            self.cache.load(
+                max(self._read_meta(), self.cache.counter),
+                dict(sorted(tasks.items(), key=lambda task: int(task[0]))),
+            )
+        )
+        return await load_task
+
+    async def _store_shard(self, shard: int) -> None:
+        # Copied on the loop, the shard may change while a worker thread writes.
+        write_task = asyncio.create_task(
+            asyncio.to_thread(
+                _write_shard, self.shard_paths[shard], dict(self.shard_tasks[shard])
+            )
+        )
+        self._signatures[shard] = await write_task
+
+    def _write_meta(self, counter: int) -> None:
+        self.meta_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.meta_path, {"counter": counter, "shards": self.shards})
+
+    async def _store_meta(self) -> None:
+        write_task = asyncio.create_task(
+            asyncio.to_thread(self._write_meta, self.cache.counter)
+        )
+        await write_task
+
+    async def _flush(self, shard: int, *, meta: bool = False) -> None:
+        if self._dirty is not None:
+            self._dirty.add(shard)
+            return
+
+        flushes = [self.write_queues[shard].flush()]
+        if meta:
+            flushes.append(self.meta_queue.flush())
+        await asyncio.gather(*flushes)
+
+    async def _reload(self) -> None:
+        """Read the shards and the counter other processes changed."""
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        self.cache.counter = max(self.cache.counter, self._read_meta())
+
+    async def _locked(self, change: Callable[[], Awaitable[T]]) -> T:
+        """Apply `change` to the latest shards and wait until it is written."""
+        if self._dirty is not None:
+            change_task = asyncio.create_task(change())
+            return await change_task
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            reload_task = asyncio.create_task(self._reload())
+            await reload_task
+            change_task = asyncio.create_task(change())
+            return await change_task
+        finally:
+            self.lock.release()
+
+    async def begin(self) -> None:
+        if self._batch_depth:
+            self._batch_depth += 1
+            return
+
+        lock_task = asyncio.create_task(self.lock.acquire())
+        await lock_task
+        try:
+            reload_task = asyncio.create_task(self._reload())
+            await reload_task
+        except BaseException:
+            self.lock.release()
+            raise
+        self._dirty = set()
+        self._batch_depth = 1
+
+    async def commit(self) -> None:
+        if self._batch_depth != 1:
+            self._batch_depth = max(self._batch_depth - 1, 0)
+            return
+
+        self._batch_depth = 0
+        dirty, self._dirty = self._dirty, None
+        try:
+            if dirty:
+                await asyncio.gather(
+                    self.meta_queue.flush(),
+                    *[self.write_queues[shard].flush() for shard in dirty],
+                )
+        finally:
+            self.lock.release()
+
+    async def unload(self) -> None:
+        # Ends a batch however deeply nested.
+        self._batch_depth = min(self._batch_depth, 1)
+        commit_task = asyncio.create_task(self.commit())
+        await commit_task
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        self.lock.close()
+        self.loaded = False
+        self.shard_tasks = [{} for _ in range(self.shards)]
+        await self.cache.load(0, {})
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        async for task in self.cache.iter_tasks(status, after=after):
+            yield task
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        async for task in self.cache.iter_tasks_by_time(
+            field, status, since=since, until=until
+        ):
+            yield task
+
+    async def get_by_idx(self, idx: int) -> Task:
+        load_task = asyncio.create_task(self.load())
+        await load_task
+        get_task = asyncio.create_task(self.cache.get_by_idx(idx))
+        return await get_task
+
+    async def update_by_idx(self, idx: int, task: Task) -> None:
+        async def change() -> None:
+            update_task = asyncio.create_task(self.cache.update_by_idx(idx, task))
+            await update_task
+            self.shard_tasks[self._shard(idx)][str(idx)] = task
+            flush_task = asyncio.create_task(self._flush(self._shard(idx)))
+            await flush_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        await locked_task
+
+    async def delete_by_idx(self, idx: int) -> None:
+        async def change() -> None:
+            delete_task = asyncio.create_task(self.cache.delete_by_idx(idx))
+            await delete_task
+            self.shard_tasks[self._shard(idx)].pop(str(idx), None)
+            flush_task = asyncio.create_task(self._flush(self._shard(idx)))
+            await flush_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        await locked_task
+
+    async def add(self, task: BaseTask) -> tuple[int, Task]:
+        async def change() -> tuple[int, Task]:
+            add_task = asyncio.create_task(self.cache.add(task))
+            idx, new_task = await add_task
+            self.shard_tasks[self._shard(idx)][str(idx)] = new_task
+            flush_task = asyncio.create_task(self._flush(self._shard(idx), meta=True))
+            await flush_task
+            return idx, new_task
+
+        locked_task = asyncio.create_task(self._locked(change))
+        return await locked_task
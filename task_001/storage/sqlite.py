@@ -0,0 +1,193 @@
+import asyncio
+import os
+from pathlib import Path
+import sqlite3
+from typing import AsyncIterable, AsyncIterator
+
+from .istorage import IStorage, TIME_FIELDS
+from ..models.task import BaseTask, Task, TaskNotFound
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    createdAt REAL NOT NULL,
+    updatedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_created_at ON tasks (createdAt);
+CREATE INDEX IF NOT EXISTS tasks_updated_at ON tasks (updatedAt);
+CREATE INDEX IF NOT EXISTS tasks_status_created_at ON tasks (status, createdAt);
+CREATE INDEX IF NOT EXISTS tasks_status_updated_at ON tasks (status, updatedAt);
+"""
+
+COLUMNS = "id, description, status, createdAt, updatedAt"
+INSERT = (
+    "INSERT INTO tasks (description, status, createdAt, updatedAt) VALUES (?, ?, ?, ?)"
+)
+# Rows per executemany in add_many.
+CHUNK_SIZE = 1000
+
+
+class SQLiteStorage(IStorage):
+    def __init__(self, *, file_location: str = "data/uncategorized.sqlite3"):
+        self.file_path = (
+            Path(os.path.dirname(os.path.realpath(__file__))) / "../" / file_location
+        )
+        self._connection: sqlite3.Connection | None = None
+        # Between begin and commit changes stay in one open transaction.
+        # Batches nest and end with the outermost commit.
+        self._batch_depth = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.file_path)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def _change(self, query: str, parameters: tuple) -> sqlite3.Cursor:
+        if self._batch_depth:
+            return self.connection.execute(query, parameters)
+        with self.connection as connection:
+            return connection.execute(query, parameters)
+
+    async def begin(self) -> None:
+        self._batch_depth += 1
+
+    async def commit(self) -> None:
+        if self._batch_depth > 1:
+            self._batch_depth -= 1
+            return
+
+        self._batch_depth = 0
+        self.connection.commit()
+
+    async def unload(self) -> None:
+        if self._connection:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+        self._batch_depth = 0
+
+    def _to_task(self, row: sqlite3.Row) -> Task:
+        return Task(**dict(row))
+
+    async def load(self) -> dict[str, Task]:
+        rows = self.connection.execute(f"SELECT {COLUMNS} FROM tasks ORDER BY id")
+        return {str(row["id"]): self._to_task(row) for row in rows}
+
+    def _select(
+        self,
+        status: str | None,
+        after: int | None,
+        *,
+        order: str = "id",
+        since: float | None = None,
+        until: float | None = None,
+    ) -> sqlite3.Cursor:
+        """`since` and `until` bound the time column `order`."""
+        conditions = []
+        parameters: list[str | int | float] = []
+        if status:
+            conditions.append("status = ?")
+            parameters.append(status)
+        if after is not None:
+            conditions.append("id > ?")
+            parameters.append(after)
+        if since is not None:
+            conditions.append(f"{order} >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append(f"{order} < ?")
+            parameters.append(until)
+
+        query = f"SELECT {COLUMNS} FROM tasks"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # The time indexes hold the id too, so this ordering is read off them.
+        query += f" ORDER BY {order}, id" if order != "id" else " ORDER BY id"
+        return self.connection.execute(query, parameters)
+
+    async def iter_tasks(
+        self, status: str | None = None, *, after: int | None = None
+    ) -> AsyncIterator[Task]:
+        for row in self._select(status, after):
+            yield self._to_task(row)
+
+    async def iter_tasks_by_time(
+        self,
+        field: str = "updatedAt",
+        status: str | None = None,
+        *,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> AsyncIterator[Task]:
+        if field not in TIME_FIELDS:
+            raise ValueError(f"Unknown time field {field}.")
+
+        for row in self._select(status, None, order=field, since=since, until=until):
+            yield self._to_task(row)
+
+    async def get_by_idx(self, idx: int) -> Task:
+        row = self.connection.execute(
+            f"SELECT {COLUMNS} FROM tasks WHERE id = ?", (idx,)
+        ).fetchone()
+        if not row:
+            raise TaskNotFound()
+        return self._to_task(row)
+
+    async def update_by_idx(self, idx: int, task: Task) -> None:
+        cursor = self._change(
+            "UPDATE tasks SET description = ?, status = ?, createdAt = ?, updatedAt = ? WHERE id = ?",
+            (task.description, task.status, task.createdAt, task.updatedAt, idx),
+        )
+        if not cursor.rowcount:
+            raise TaskNotFound()
+
+    async def delete_by_idx(self, idx: int) -> None:
+        cursor = self._change("DELETE FROM tasks WHERE id = ?", (idx,))
+        if not cursor.rowcount:
+            raise TaskNotFound()
+
+    async def add(self, task: BaseTask) -> tuple[int, Task]:
+        cursor = self._change(
+            INSERT, (task.description, task.status, task.createdAt, task.updatedAt)
+        )
+        idx = cursor.lastrowid
+        if idx is None:
+            raise sqlite3.DatabaseError("Failed to insert task.")
+        return idx, Task(
+            id=idx,
+            description=task.description,
+            status=task.status,
+            createdAt=task.createdAt,
+            updatedAt=task.updatedAt,
+        )
+
+    async def _insert_chunks(self, tasks: AsyncIterable[BaseTask]) -> int:
+        added = 0
+        rows = []
+        async for task in tasks:
+            rows.append((task.description, task.status, task.createdAt, task.updatedAt))
+            if len(rows) >= CHUNK_SIZE:
+                self.connection.executemany(INSERT, rows)
+                added += len(rows)
+                rows = []
+        if rows:
+            self.connection.executemany(INSERT, rows)
+            added += len(rows)
+        return added
+
+    async def add_many(self, tasks: AsyncIterable[BaseTask]) -> int:
+        """Insert in chunks, all in one transaction."""
+        if self._batch_depth:
+            insert_task = asyncio.create_task(self._insert_chunks(tasks))
+            return await insert_task
+
+        with self.connection:
+            insert_task = asyncio.create_task(self._insert_chunks(tasks))
+            return await insert_task
@@ -0,0 +1,57 @@
+import asyncio
+from types import CoroutineType
+from typing import Any, Callable
+
+
+class WriteQueue:
+    """Single writer that coalesces flush requests made within `window` seconds.
+
+    `write` must persist the state as it is at the moment it is called, so one
+    call covers every change made before it started.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[], CoroutineType[Any, Any, None]],
+        *,
+        window: float = 0.005
+    ):
+        self.write = write
+        self.window = window
+
+        self.requests = 0
+        self.writes = 0
+        self._pending: asyncio.Future | None = None
+        self._writer: asyncio.Task | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._writer is not None
+
+    async def flush(self) -> None:
+        """Wait until a write that started after this call has finished."""
+        self.requests += 1
+        if not self._pending:
+            self._pending = asyncio.get_running_loop().create_future()
+        pending = self._pending
+
+        if not self._writer:
+            self._writer = asyncio.create_task(self._run())
+
+        await asyncio.shield(pending)
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                await asyncio.sleep(self.window)
+                batch, self._pending = self._pending, None
+                try:
+                    write_task = asyncio.create_task(self.write())
+                    await write_task
+                except Exception as exc:
+                    batch.set_exception(exc)
+                else:
+                    batch.set_result(None)
+                self.writes += 1
+        finally:
+            self._writer = None
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from ..models.task import Task, TaskStatus
+from ..output.events import EventBus, EventType, IPubSubSubscriber, TaskWidgetEvent
+
+
+class FailingOnce(IPubSubSubscriber):
+    def __init__(self):
+        self.batches: list[list[int]] = []
+
+    async def notify(self, events: list[TaskWidgetEvent]):
+        self.batches.append([event.id for event in events])
+        if len(self.batches) == 1:
+            raise OSError("No space left on device")
+
+
+def status_event(idx: int) -> TaskWidgetEvent:
+    return TaskWidgetEvent(
+        idx,
+        EventType.status,
+        Task(idx, f"Task {idx}", TaskStatus.done.value, 1.0, 1.0),
+    )
+
+
+class EventBusTest(unittest.TestCase):
+    async def _publish_after_failure(
+        self,
+    ) -> tuple[FailingOnce, list[Exception], EventBus]:
+        errors: list[Exception] = []
+
+        async def on_error(exc: Exception):
+            errors.append(exc)
+
+        bus = EventBus(on_error=on_error)
+        subscriber = FailingOnce()
+        bus.subscribers.append(subscriber)
+        bus_task = asyncio.create_task(bus.run())
+
+        await bus.publish(status_event(1))
+        await asyncio.wait_for(bus.join(), 1)
+        await bus.publish(status_event(2))
+        await asyncio.wait_for(bus.join(), 1)
+
+        self.assertFalse(bus_task.done())
+        bus_task.cancel()
+        return subscriber, errors, bus
+
+    def test_batch_after_a_failed_one(self):
+        subscriber, errors, bus = asyncio.run(self._publish_after_failure())
+
+        self.assertEqual(subscriber.batches, [[1], [2]])
+        self.assertEqual([type(exc) for exc in errors], [OSError])
+        self.assertEqual(bus.metrics()["failed_batches"], 1)
+        self.assertEqual(bus.metrics()["handled"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..storage.files import UMASK, atomic_write_json
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def test_new_file_mode_follows_umask(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "tasks.json"
+            atomic_write_json(path, {})
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~UMASK)
+
+    def test_existing_file_keeps_its_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "tasks.json"
+            atomic_write_json(path, {})
+            os.chmod(path, 0o640)
+            atomic_write_json(path, {"counter": 1})
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+
+if __name__ == "__main__":
+    unittest.main()
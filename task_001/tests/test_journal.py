@@ -0,0 +1,78 @@
+import asyncio
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..models.task import BaseTask, TaskStatus
+from ..storage.journal import JournalStorage
+
+
+class JournalCompactionTest(unittest.TestCase):
+    async def _change_and_reload(self, file_location: str) -> tuple[dict, dict]:
+        storage = JournalStorage(file_location=file_location, compact_threshold=10)
+        for idx in range(1, 101):
+            await storage.add(
+                BaseTask(f"Task {idx}", TaskStatus.planned.value, 1.0, 1.0)
+            )
+            if idx % 3 == 0:
+                task = await storage.get_by_idx(idx - 1)
+                task.status = TaskStatus.done.value
+                await storage.update_by_idx(idx - 1, task)
+            if idx % 7 == 0:
+                await storage.delete_by_idx(idx - 2)
+            # Lets compactions run while tasks keep changing.
+            await asyncio.sleep(0)
+        expected = dict(await storage.load())
+        await storage.unload()
+
+        storage = JournalStorage(file_location=file_location)
+        reloaded = dict(await storage.load())
+        await storage.unload()
+        return expected, reloaded
+
+    def test_reload_after_compactions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            expected, reloaded = asyncio.run(
+                self._change_and_reload(str(Path(directory) / "tasks.json"))
+            )
+        self.assertEqual(reloaded, expected)
+        self.assertEqual(len(reloaded), 86)
+
+    async def _load_during_compaction(self, file_location: str) -> tuple[dict, dict]:
+        storage = JournalStorage(file_location=file_location)
+        for idx in range(1, 4):
+            await storage.add(
+                BaseTask(f"Task {idx}", TaskStatus.planned.value, 1.0, 1.0)
+            )
+        expected = dict(await storage.load())
+        await storage.unload()
+
+        reader = JournalStorage(file_location=file_location)
+        read_snapshot = reader._read_snapshot
+        compactions = []
+
+        def compacted_after_read():
+            snapshot = read_snapshot()
+            if not compactions:
+                # What another process's compaction does meanwhile.
+                compactions.append(1)
+                reader._journal_path(1).touch()
+                reader._write_snapshot(1, 3, expected, [0])
+            return snapshot
+
+        reader._read_snapshot = compacted_after_read
+        loaded = dict(await reader.load())
+        await reader.unload()
+        return expected, loaded
+
+    def test_load_during_compaction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            expected, loaded = asyncio.run(
+                self._load_during_compaction(str(Path(directory) / "tasks.json"))
+            )
+        self.assertEqual(loaded, expected)
+        self.assertEqual(len(loaded), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..models.task import BaseTask, TaskStatus
+from ..storage.json import JSONStorage
+
+
+def new_task(description: str) -> BaseTask:
+    return BaseTask(
+        description=description,
+        status=TaskStatus.planned.value,
+        createdAt=1.0,
+        updatedAt=1.0,
+    )
+
+
+class JSONBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.directory.name) / "tasks.json"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def _run_batch(self, storage: JSONStorage) -> None:
+        await storage.begin()
+        await storage.add(new_task("a"))
+        await storage.add(new_task("b"))
+        task = await storage.get_by_idx(1)
+        task.status = TaskStatus.done.value
+        await storage.update_by_idx(1, task)
+        await storage.add(new_task("c"))
+        await storage.commit()
+
+    def _assert_stored(self) -> None:
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["counter"], 3)
+        self.assertEqual(
+            {
+                idx: (task["description"], task["status"])
+                for idx, task in data["tasks"].items()
+            },
+            {"1": ("a", "done"), "2": ("b", "todo"), "3": ("c", "todo")},
+        )
+
+    def test_batch_without_validated_cache(self):
+        asyncio.run(
+            self._run_batch(
+                JSONStorage(file_location=str(self.file_path), validate_cache=False)
+            )
+        )
+        self._assert_stored()
+
+    def test_batch_with_lazy_load(self):
+        storage = JSONStorage(
+            file_location=str(self.file_path), validate_cache=False, lazy_load=True
+        )
+        asyncio.run(self._run_batch(storage))
+        self._assert_stored()
+
+    async def _import_in_batch(self, storage: JSONStorage) -> None:
+        async def imported():
+            yield new_task("b")
+            yield new_task("c")
+
+        await storage.begin()
+        await storage.add(new_task("a"))
+        await storage.add_many(imported())
+        # The import is part of the batch: nothing written, the lock still held.
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            self.assertFalse(json.load(f))
+        self.assertTrue(storage.lock._holders)
+
+        task = await storage.get_by_idx(1)
+        task.status = TaskStatus.done.value
+        await storage.update_by_idx(1, task)
+        await storage.commit()
+        self.assertFalse(storage.lock._holders)
+        await storage.unload()
+
+    def test_import_in_batch(self):
+        asyncio.run(
+            self._import_in_batch(JSONStorage(file_location=str(self.file_path)))
+        )
+        self._assert_stored()
+
+
+if __name__ == "__main__":
+    unittest.main()
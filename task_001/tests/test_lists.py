@@ -0,0 +1,101 @@
+import asyncio
+from pathlib import Path
+import subprocess
+import tempfile
+import unittest
+
+from ..core.lists import ListCatalog, TaskLists
+from ..core.search import SearchIndex
+from ..models.task import BaseTask, TaskStatus
+from ..storage.sqlite import SQLiteStorage
+
+
+def new_task(description: str) -> BaseTask:
+    return BaseTask(
+        description=description,
+        status=TaskStatus.planned.value,
+        createdAt=1.0,
+        updatedAt=1.0,
+    )
+
+
+class TaskListsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def task_lists(self, max_open: int | None = 8) -> TaskLists:
+        return TaskLists(
+            open_storage=lambda name: SQLiteStorage(
+                file_location=str(self.path / f"{name}.sqlite3")
+            ),
+            open_search_index=lambda name: SearchIndex(),
+            catalog=ListCatalog(
+                file_location=str(self.path / "lists.catalog.json"), flush_window=60
+            ),
+            max_open=max_open,
+        )
+
+    async def _counts(self) -> list[dict[str, dict[str, int]]]:
+        lists = self.task_lists()
+        work = lists.open("work")
+        await work.storage.add(new_task("a"))
+        await work.storage.add(new_task("b"))
+        lists.open("empty")
+
+        counts = [await lists.counts()]
+
+        # Counts come from the catalog, not from the storages.
+        await lists.catalog.count("work", {"todo": -1, "done": 1})
+        self.assertTrue(lists.catalog.marker_path.exists())
+        counts.append(await lists.counts())
+        await lists.close()
+        self.assertFalse(lists.catalog.marker_path.exists())
+        counts.append(await self.task_lists().counts())
+
+        # A process that ended before adding its changes to the catalog.
+        process = subprocess.Popen(["true"])
+        process.wait()
+        marker = self.path / f"lists.catalog.json.{process.pid}.pending"
+        marker.touch()
+        counts.append(await self.task_lists().counts())
+        self.assertFalse(marker.exists())
+
+        for task_list in lists.lists.values():
+            await task_list.storage.unload()
+        return counts
+
+    def test_counts(self):
+        counted, pending, flushed, recounted = asyncio.run(self._counts())
+
+        self.assertEqual(
+            counted, {"empty": {}, "uncategorized": {}, "work": {"todo": 2}}
+        )
+        self.assertEqual(pending["work"], {"todo": 1, "done": 1})
+        self.assertEqual(flushed["work"], {"todo": 1, "done": 1})
+        self.assertEqual(recounted["work"], {"todo": 2})
+
+    async def _trim(self, lists: TaskLists) -> None:
+        for name in ["a", "b", "c", "a"]:
+            await lists.open(name).storage.load()
+        await lists.trim()
+        for task_list in lists.lists.values():
+            await task_list.storage.unload()
+
+    def test_trim_least_recently_used(self):
+        lists = self.task_lists(max_open=2)
+        asyncio.run(self._trim(lists))
+
+        self.assertEqual(list(lists.lists), ["c", "a"])
+        self.assertEqual(lists.evictions, 1)
+
+    def test_invalid_name(self):
+        with self.assertRaises(ValueError):
+            self.task_lists().open("../work")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Pages of tasks in id order, as `task-cli list [STATUS] --after N --limit M` shows them."""
+
+import asyncio
+from contextlib import redirect_stdout
+import io
+from pathlib import Path
+import tempfile
+from typing import Callable
+import unittest
+
+from ..core.tasks import TaskManager
+from ..input.cli import CLIInput
+from ..models.task import BaseTask, TaskStatus
+from ..output.cli import CLIOutput
+from ..storage.binary import BinaryStorage
+from ..storage.in_memory import InMemoryStorage
+from ..storage.istorage import IStorage
+from ..storage.journal import JournalStorage
+from ..storage.json import JSONStorage
+from ..storage.sharded import ShardedJSONStorage
+from ..storage.sqlite import SQLiteStorage
+
+statuses = [
+    TaskStatus.planned.value,
+    TaskStatus.in_progress.value,
+    TaskStatus.done.value,
+]
+
+
+def storage_factories(directory: Path) -> dict[str, Callable[[], IStorage]]:
+    return {
+        "memory": InMemoryStorage,
+        "json": lambda: JSONStorage(file_location=str(directory / "tasks.json")),
+        "journal": lambda: JournalStorage(
+            file_location=str(directory / "journal.json")
+        ),
+        "sharded": lambda: ShardedJSONStorage(
+            file_location=str(directory / "sharded.json"), shards=3
+        ),
+        "sqlite": lambda: SQLiteStorage(file_location=str(directory / "tasks.sqlite3")),
+        "binary": lambda: BinaryStorage(file_location=str(directory / "tasks.tasks")),
+    }
+
+
+async def fill(storage: IStorage, tasks: int = 20) -> None:
+    """Tasks 1..`tasks` with statuses in turn, without 5 and 6."""
+    for idx in range(1, tasks + 1):
+        await storage.add(
+            BaseTask(f"Task {idx}", statuses[idx % 3], float(idx), float(idx))
+        )
+    await storage.delete_by_idx(5)
+    await storage.delete_by_idx(6)
+
+
+async def ids(storage: IStorage, status: str | None = None, after: int | None = None):
+    return [task.id async for task in storage.iter_tasks(status, after=after)]
+
+
+class StoragePagingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def _pages(self, storage: IStorage) -> None:
+        await fill(storage)
+        remaining = [idx for idx in range(1, 21) if idx not in (5, 6)]
+        done = [idx for idx in remaining if statuses[idx % 3] == TaskStatus.done.value]
+
+        self.assertEqual(await ids(storage), remaining)
+        self.assertEqual(await ids(storage, after=4), remaining[4:])
+        self.assertEqual(await ids(storage, after=20), [])
+        self.assertEqual(await ids(storage, TaskStatus.done.value), done)
+        self.assertEqual(
+            await ids(storage, TaskStatus.done.value, after=8),
+            [idx for idx in done if idx > 8],
+        )
+
+        # TaskManager changes the stored task in place before the update.
+        task = await storage.get_by_idx(8)
+        task.status = TaskStatus.planned.value
+        await storage.update_by_idx(8, task)
+        self.assertNotIn(8, await ids(storage, TaskStatus.done.value))
+        self.assertIn(8, await ids(storage, TaskStatus.planned.value, after=7))
+
+        await storage.unload()
+
+    def test_storages(self):
+        for name, factory in storage_factories(Path(self.directory.name)).items():
+            with self.subTest(storage=name):
+                asyncio.run(self._pages(factory()))
+
+    async def _lazy_pages(self, file_location: str) -> None:
+        storage = JSONStorage(file_location=file_location)
+        await fill(storage)
+        await storage.unload()
+
+        storage = JSONStorage(file_location=file_location, lazy_load=True)
+        # Read from the file, one task at a time.
+        self.assertTrue(storage._should_stream())
+        self.assertEqual(await ids(storage, after=15), [16, 17, 18, 19, 20])
+        self.assertEqual(
+            await ids(storage, TaskStatus.planned.value, after=10), [12, 15, 18]
+        )
+        self.assertEqual(storage.stats.loads, 0)
+        await storage.unload()
+
+    def test_lazy_json(self):
+        asyncio.run(self._lazy_pages(str(Path(self.directory.name) / "tasks.json")))
+
+
+class ListCommandPagingTest(unittest.TestCase):
+    async def _list(self, *commands: list[str]) -> list[list[str]]:
+        storage = InMemoryStorage()
+        await fill(storage)
+        input_manager = CLIInput()
+        TaskManager(
+            storage_manager=storage,
+            output_manager=CLIOutput(),
+            input_manager=input_manager,
+        )
+
+        outputs = []
+        for argv in commands:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                await input_manager.run(argv)
+            outputs.append(output.getvalue().splitlines())
+        return outputs
+
+    def test_limit_and_after(self):
+        first, second, last, done, nothing = asyncio.run(
+            self._list(
+                ["list", "--limit", "3"],
+                ["list", "--limit", "3", "--after", "3"],
+                ["list", "--after", "18"],
+                ["list", "done", "--limit", "2", "--after", "3"],
+                ["list", "--limit", "0"],
+            )
+        )
+        self.assertEqual(
+            first,
+            ["1 - In progress - Task 1", "2 - Done - Task 2", "3 - Planned - Task 3"],
+        )
+        self.assertEqual(
+            second,
+            [
+                "4 - In progress - Task 4",
+                "7 - In progress - Task 7",
+                "8 - Done - Task 8",
+            ],
+        )
+        self.assertEqual(last, ["19 - In progress - Task 19", "20 - Done - Task 20"])
+        self.assertEqual(done, ["8 - Done - Task 8", "11 - Done - Task 11"])
+        self.assertEqual(nothing, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import asyncio
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..core.search import SearchIndex
+from ..models.task import BaseTask, TaskStatus
+from ..storage.in_memory import InMemoryStorage
+
+
+class SharedSearchIndexTest(unittest.TestCase):
+    """A loaded index, like the daemon's, and another process changing the same files."""
+
+    async def _search(self, file_location: str) -> list[list[int]]:
+        storage = InMemoryStorage()
+        for description in ["buy milk", "buy bread", "walk dog"]:
+            await storage.add(BaseTask(description, TaskStatus.planned.value, 1.0, 1.0))
+
+        loaded = SearchIndex(file_location=file_location)
+        other = SearchIndex(file_location=file_location, compact_threshold=2)
+        results = [await loaded.search(storage, "buy")]
+
+        other.index(4, "buy eggs")
+        other.remove(1)
+        results.append(await loaded.search(storage, "buy"))
+
+        # Compacts the log into the index file.
+        await other.search(storage, "buy")
+        other.index(5, "buy tea")
+        results.append(await loaded.search(storage, "buy"))
+
+        other.clear()
+        results.append(await loaded.search(storage, "buy"))
+        return results
+
+    def test_changes_of_another_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = asyncio.run(
+                self._search(str(Path(directory) / "tasks.json.index"))
+            )
+        self.assertEqual(results, [[1, 2], [2, 4], [2, 4, 5], [1, 2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
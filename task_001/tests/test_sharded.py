@@ -0,0 +1,118 @@
+import asyncio
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..models.task import BaseTask, TaskStatus
+from ..storage.sharded import ShardExecutor, ShardedJSONStorage
+
+
+def new_task(description: str) -> BaseTask:
+    return BaseTask(
+        description=description,
+        status=TaskStatus.planned.value,
+        createdAt=1.0,
+        updatedAt=1.0,
+    )
+
+
+class ShardedJSONStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_location = str(Path(self.directory.name) / "tasks.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def storage(self, **kwargs) -> ShardedJSONStorage:
+        return ShardedJSONStorage(
+            file_location=self.file_location, shards=3, flush_window=0, **kwargs
+        )
+
+    def shard_ids(self, storage: ShardedJSONStorage) -> list[list[int]]:
+        shards = []
+        for path in storage.shard_paths:
+            with open(path, "r", encoding="utf-8") as f:
+                shards.append(sorted(int(idx) for idx in json.load(f)["tasks"]))
+        return shards
+
+    async def _add(self, storage: ShardedJSONStorage, tasks: int) -> None:
+        for idx in range(1, tasks + 1):
+            await storage.add(new_task(f"Task {idx}"))
+        await storage.unload()
+
+    async def _descriptions(self, storage: ShardedJSONStorage) -> dict[str, str]:
+        tasks = await storage.load()
+        descriptions = {key: task.description for key, task in tasks.items()}
+        await storage.unload()
+        return descriptions
+
+    def test_tasks_by_shard(self):
+        storage = self.storage()
+        asyncio.run(self._add(storage, 7))
+
+        self.assertEqual(self.shard_ids(storage), [[3, 6], [1, 4, 7], [2, 5]])
+        with open(storage.meta_path, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"counter": 7, "shards": 3})
+        self.assertEqual(
+            asyncio.run(self._descriptions(self.storage())),
+            {str(idx): f"Task {idx}" for idx in range(1, 8)},
+        )
+
+    async def _change_one(self, storage: ShardedJSONStorage):
+        await storage.load()
+        before = list(storage._signatures)
+        task = await storage.get_by_idx(4)
+        task.status = TaskStatus.done.value
+        await storage.update_by_idx(4, task)
+        await storage.delete_by_idx(7)
+        after = list(storage._signatures)
+        await storage.unload()
+        return before, after
+
+    def test_change_rewrites_its_shard(self):
+        asyncio.run(self._add(self.storage(), 7))
+        storage = self.storage()
+        before, after = asyncio.run(self._change_one(storage))
+
+        self.assertEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertEqual(after[2], before[2])
+        self.assertEqual(self.shard_ids(storage), [[3, 6], [1, 4], [2, 5]])
+
+    def test_shard_count_mismatch(self):
+        asyncio.run(self._add(self.storage(), 2))
+        storage = ShardedJSONStorage(file_location=self.file_location, shards=4)
+        with self.assertRaises(ValueError):
+            asyncio.run(storage.load())
+
+    async def _batch(self, storage: ShardedJSONStorage) -> None:
+        await storage.begin()
+        await storage.add(new_task("a"))
+        await storage.add(new_task("b"))
+        # Nothing written before the commit.
+        self.assertFalse(storage.meta_path.exists())
+        self.assertFalse(any(path.exists() for path in storage.shard_paths))
+        await storage.commit()
+        await storage.unload()
+
+    def test_batch(self):
+        storage = self.storage()
+        asyncio.run(self._batch(storage))
+        self.assertEqual(
+            asyncio.run(self._descriptions(self.storage())), {"1": "a", "2": "b"}
+        )
+
+    def test_process_executor(self):
+        asyncio.run(self._add(self.storage(), 5))
+        self.assertEqual(
+            asyncio.run(
+                self._descriptions(self.storage(executor=ShardExecutor.process))
+            ),
+            {str(idx): f"Task {idx}" for idx in range(1, 6)},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
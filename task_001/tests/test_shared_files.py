@@ -0,0 +1,111 @@
+"""Two storages on the same files, like the daemon and a command run in-process."""
+
+import asyncio
+from pathlib import Path
+import tempfile
+import unittest
+
+from ..models.task import BaseTask, TaskStatus
+from ..storage.binary import BinaryStorage
+from ..storage.istorage import IStorage
+from ..storage.journal import JournalStorage
+from ..storage.sharded import ShardedJSONStorage
+
+
+def new_task(description: str) -> BaseTask:
+    return BaseTask(description, TaskStatus.planned.value, 1.0, 1.0)
+
+
+class SharedFilesTest(unittest.TestCase):
+    async def _interleave(self, first: IStorage, second: IStorage) -> None:
+        self.assertEqual((await first.add(new_task("a")))[0], 1)
+
+        async def imported():
+            for description in ["b", "c"]:
+                yield new_task(description)
+
+        self.assertEqual(await second.add_many(imported()), 2)
+        self.assertEqual((await first.add(new_task("d")))[0], 4)
+
+        task = await second.get_by_idx(4)
+        task.status = TaskStatus.done.value
+        await second.update_by_idx(4, task)
+        await first.delete_by_idx(2)
+
+        for storage in (first, second):
+            tasks = await storage.load()
+            self.assertEqual(
+                {idx: (task.description, task.status) for idx, task in tasks.items()},
+                {"1": ("a", "todo"), "3": ("c", "todo"), "4": ("d", "done")},
+            )
+        for storage in (first, second):
+            await storage.unload()
+
+    def test_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_location = str(Path(directory) / "tasks.json")
+            asyncio.run(
+                self._interleave(
+                    JournalStorage(file_location=file_location),
+                    JournalStorage(file_location=file_location),
+                )
+            )
+
+    def test_journal_compacted_by_the_other(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_location = str(Path(directory) / "tasks.json")
+
+            # The second one compacts after every record.
+            asyncio.run(
+                self._interleave(
+                    JournalStorage(file_location=file_location),
+                    JournalStorage(file_location=file_location, compact_threshold=0),
+                )
+            )
+
+    def test_binary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_location = str(Path(directory) / "tasks.tasks")
+            asyncio.run(
+                self._interleave(
+                    BinaryStorage(file_location=file_location),
+                    BinaryStorage(file_location=file_location),
+                )
+            )
+
+    def test_sharded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_location = str(Path(directory) / "tasks.json")
+            asyncio.run(
+                self._interleave(
+                    ShardedJSONStorage(file_location=file_location, shards=3),
+                    ShardedJSONStorage(file_location=file_location, shards=3),
+                )
+            )
+
+    async def _add_concurrently(self, file_location: str) -> None:
+        first, second = [
+            ShardedJSONStorage(file_location=file_location, shards=3) for _ in range(2)
+        ]
+        added = await asyncio.gather(
+            *[
+                storage.add(new_task(f"Task {number}"))
+                for number in range(5)
+                for storage in (first, second)
+            ]
+        )
+        self.assertEqual(sorted(idx for idx, _ in added), list(range(1, 11)))
+        await first.unload()
+        await second.unload()
+
+        storage = ShardedJSONStorage(file_location=file_location, shards=3)
+        self.assertEqual(len(await storage.load()), 10)
+        await storage.unload()
+
+    def test_sharded_concurrent_adds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(self._add_concurrently(str(Path(directory) / "tasks.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+from pathlib import Path
+import sqlite3
+import tempfile
+import unittest
+
+from ..models.task import BaseTask, TaskNotFound, TaskStatus
+from ..storage.sqlite import SQLiteStorage
+
+
+def new_task(description: str) -> BaseTask:
+    return BaseTask(
+        description=description,
+        status=TaskStatus.planned.value,
+        createdAt=1.0,
+        updatedAt=1.0,
+    )
+
+
+class SQLiteStorageTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_location = str(Path(self.directory.name) / "tasks.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def stored(self) -> dict[int, tuple[str, str]]:
+        connection = sqlite3.connect(Path(self.file_location))
+        try:
+            rows = connection.execute(
+                "SELECT id, description, status FROM tasks ORDER BY id"
+            ).fetchall()
+        finally:
+            connection.close()
+        return {idx: (description, status) for idx, description, status in rows}
+
+    async def _crud(self, storage: SQLiteStorage) -> None:
+        self.assertEqual(
+            await storage.add(new_task("a")), (1, await storage.get_by_idx(1))
+        )
+        await storage.add(new_task("b"))
+        task = await storage.get_by_idx(1)
+        task.status = TaskStatus.done.value
+        await storage.update_by_idx(1, task)
+        await storage.delete_by_idx(2)
+
+        with self.assertRaises(TaskNotFound):
+            await storage.get_by_idx(2)
+        with self.assertRaises(TaskNotFound):
+            await storage.update_by_idx(2, task)
+        with self.assertRaises(TaskNotFound):
+            await storage.delete_by_idx(2)
+        await storage.unload()
+
+    def test_crud(self):
+        asyncio.run(self._crud(SQLiteStorage(file_location=self.file_location)))
+        self.assertEqual(self.stored(), {1: ("a", "done")})
+
+    async def _batch(self, storage: SQLiteStorage) -> None:
+        async def imported():
+            yield new_task("b")
+            yield new_task("c")
+
+        await storage.begin()
+        await storage.add(new_task("a"))
+        self.assertEqual(await storage.add_many(imported()), 2)
+        # The import is part of the batch: still one open transaction.
+        self.assertTrue(storage.connection.in_transaction)
+        self.assertEqual(self.stored(), {})
+
+        task = await storage.get_by_idx(1)
+        task.status = TaskStatus.done.value
+        await storage.update_by_idx(1, task)
+        await storage.commit()
+        self.assertFalse(storage.connection.in_transaction)
+        await storage.unload()
+
+    def test_batch(self):
+        asyncio.run(self._batch(SQLiteStorage(file_location=self.file_location)))
+        self.assertEqual(
+            self.stored(), {1: ("a", "done"), 2: ("b", "todo"), 3: ("c", "todo")}
+        )
+
+    async def _import(self, storage: SQLiteStorage) -> int:
+        async def imported():
+            for idx in range(2500):
+                yield new_task(f"Task {idx}")
+
+        added = await storage.add_many(imported())
+        await storage.unload()
+        return added
+
+    def test_import_in_chunks(self):
+        self.assertEqual(
+            asyncio.run(self._import(SQLiteStorage(file_location=self.file_location))),
+            2500,
+        )
+        self.assertEqual(len(self.stored()), 2500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Tasks by creation or update time, as `task-cli list --since ... --until ...` shows them."""
+
+import asyncio
+from contextlib import redirect_stdout
+import io
+from pathlib import Path
+import tempfile
+import unittest
+
+from .test_paging import storage_factories
+from ..core.tasks import TaskManager
+from ..input.cli import CLIInput
+from ..models.task import BaseTask, TaskStatus
+from ..output.cli import CLIOutput
+from ..storage.in_memory import InMemoryStorage
+from ..storage.istorage import IStorage
+
+statuses = [TaskStatus.planned.value, TaskStatus.done.value]
+
+
+async def fill(storage: IStorage) -> None:
+    """Tasks 1..12, created at their id and updated at id % 4, so updates tie."""
+    for idx in range(1, 13):
+        await storage.add(
+            BaseTask(f"Task {idx}", statuses[idx % 2], float(idx), float(idx % 4))
+        )
+
+
+async def ids(storage: IStorage, field: str, status: str | None = None, **bounds):
+    return [
+        task.id async for task in storage.iter_tasks_by_time(field, status, **bounds)
+    ]
+
+
+class StorageTimeRangeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def _ranges(self, storage: IStorage) -> None:
+        await fill(storage)
+
+        # Ties in id order.
+        self.assertEqual(
+            await ids(storage, "updatedAt", since=1, until=3), [1, 5, 9, 2, 6, 10]
+        )
+        self.assertEqual(await ids(storage, "updatedAt", until=1), [4, 8, 12])
+        self.assertEqual(await ids(storage, "createdAt", since=10), [10, 11, 12])
+        self.assertEqual(
+            await ids(storage, "updatedAt", TaskStatus.done.value, since=2),
+            [3, 7, 11],
+        )
+        # Same as reading every task.
+        for field in ["createdAt", "updatedAt"]:
+            self.assertEqual(
+                await ids(storage, field, since=1.5, until=11),
+                [
+                    task.id
+                    async for task in IStorage.iter_tasks_by_time(
+                        storage, field, since=1.5, until=11
+                    )
+                ],
+            )
+
+        # The index is built by now. TaskManager changes the stored task in
+        # place before the update.
+        task = await storage.get_by_idx(5)
+        task.updatedAt = 100.0
+        await storage.update_by_idx(5, task)
+        await storage.delete_by_idx(9)
+        self.assertEqual(
+            await ids(storage, "updatedAt", since=1, until=3), [1, 2, 6, 10]
+        )
+        self.assertEqual(await ids(storage, "updatedAt", since=50), [5])
+
+        idx, _ = await storage.add(
+            BaseTask("Task 13", TaskStatus.planned.value, 13.0, 1.0)
+        )
+        self.assertEqual(await ids(storage, "updatedAt", since=1, until=2), [1, idx])
+
+        await storage.unload()
+
+    def test_storages(self):
+        for name, factory in storage_factories(Path(self.directory.name)).items():
+            with self.subTest(storage=name):
+                asyncio.run(self._ranges(factory()))
+
+    async def _in_memory_index(self) -> InMemoryStorage:
+        storage = InMemoryStorage()
+        await fill(storage)
+        await ids(storage, "updatedAt")
+        for idx in [3, 7]:
+            task = await storage.get_by_idx(idx)
+            task.createdAt += 0.5
+            task.updatedAt = 0.0
+            await storage.update_by_idx(idx, task)
+        await storage.delete_by_idx(4)
+        return storage
+
+    def test_in_memory_index_stays_sorted(self):
+        storage = asyncio.run(self._in_memory_index())
+        for field in ["createdAt", "updatedAt"]:
+            entries = storage.time_index[field]
+            self.assertEqual(entries, sorted(entries))
+            self.assertEqual(
+                entries,
+                sorted(
+                    (getattr(task, field), task.id) for task in storage.tasks.values()
+                ),
+            )
+
+
+class ListCommandTimeRangeTest(unittest.TestCase):
+    async def _list(self, *commands: list[str]) -> list[list[str]]:
+        storage = InMemoryStorage()
+        await fill(storage)
+        input_manager = CLIInput()
+        TaskManager(
+            storage_manager=storage,
+            output_manager=CLIOutput(),
+            input_manager=input_manager,
+        )
+
+        outputs = []
+        for argv in commands:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                await input_manager.run(argv)
+            outputs.append(output.getvalue().splitlines())
+        return outputs
+
+    def test_since_and_until(self):
+        updated, created, done, limited, paged = asyncio.run(
+            self._list(
+                ["list", "--since", "3", "--until", "4"],
+                ["list", "--sort", "created", "--since", "11"],
+                ["list", "done", "--until", "1"],
+                ["list", "--sort", "updated", "--limit", "2"],
+                ["list", "--since", "1", "--after", "3"],
+            )
+        )
+        self.assertEqual(
+            updated,
+            ["3 - Done - Task 3", "7 - Done - Task 7", "11 - Done - Task 11"],
+        )
+        self.assertEqual(created, ["11 - Done - Task 11", "12 - Planned - Task 12"])
+        self.assertEqual(done, [])
+        self.assertEqual(limited, ["4 - Planned - Task 4", "8 - Planned - Task 8"])
+        self.assertEqual(
+            paged,
+            ["Error: --after pages in id order, use --since with --sort instead."],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()